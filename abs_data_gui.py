@@ -6,11 +6,211 @@ Beautiful, user-friendly interface for running data collection scripts.
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
-import subprocess
+import time
+import logging
+import contextlib
 import json
 import os
 from datetime import datetime
 import queue
+from collections import deque
+from abs_io import open_data_file, find_existing_variant
+import fetch_abs_data_auto
+import fix_abs_csv
+from abs_data_store import SeriesIndex, SERIES_FIELDS
+
+# Files written by fetch_abs_data_auto.py
+CHECKPOINT_FILE = "abs_fetch_checkpoint.json"
+SUMMARY_FILE = "abs_fetch_summary.json"
+
+# Activity log configuration
+LOG_MAX_LINES = 5000  # Oldest lines are dropped beyond this
+LOG_LEVELS = ["info", "success", "warning", "error", "checkpoint"]
+
+# Explorer tab configuration
+EXPLORER_LABELS = {
+    "region_description": "Region",
+    "data_item_description": "Data Item",
+    "age_description": "Age",
+    "sex_description": "Sex",
+    "adjustment_type_description": "Adjustment"
+}
+EXPLORER_VISIBLE_ROWS = 15
+
+# Live metrics row, filled from the fetcher's progress events
+METRICS_LABELS = {
+    "rate": "Requests/s:",
+    "latency": "Latency p50/p95/p99:",
+    "wait": "Rate-limit wait:",
+    "received": "Received:",
+    "eta": "ETA:"
+}
+
+# UI update loop configuration
+POLL_INTERVAL_MIN_MS = 50  # Polling interval while messages are arriving
+POLL_INTERVAL_MAX_MS = 500  # Polling backs off to this while a process is quiet
+POLL_FRAME_BUDGET_MS = 15  # Max time spent handling log messages per tick
+POLL_MAX_MESSAGES = 500  # Max log messages handled per tick
+
+class LogView:
+    """
+    Ring-buffered view over the activity log text widget.
+    
+    Lines are queued with append() and inserted in a single batch by flush(),
+    which the UI loop calls once per tick. Each level is a text tag, so
+    colouring is applied by the insert itself and levels are filtered by
+    eliding their tag rather than re-rendering the log.
+    """
+    
+    def __init__(self, text_widget, max_lines=LOG_MAX_LINES):
+        self.text = text_widget
+        self.max_lines = max_lines
+        self.pending = deque(maxlen=max_lines)
+        self.line_count = 0
+    
+    def append(self, line, level="info"):
+        """Queue a line for the next flush."""
+        self.pending.append((line, level))
+    
+    def flush(self):
+        """Insert all pending lines at once and trim the log to max_lines."""
+        if not self.pending:
+            return
+        
+        # Only follow the end of the log if the user hasn't scrolled up
+        at_bottom = self.text.yview()[1] >= 0.999
+        
+        chunks = []
+        for line, level in self.pending:
+            chunks.extend((line, level))
+            self.line_count += line.count("\n")
+        self.pending.clear()
+        self.text.insert(tk.END, *chunks)
+        
+        excess = self.line_count - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.line_count -= excess
+        
+        if at_bottom:
+            self.text.see(tk.END)
+    
+    def set_level_visible(self, level, visible):
+        """Show or hide all lines of one level."""
+        self.text.tag_config(level, elide=not visible)
+    
+    def clear(self):
+        """Remove every line, including any not yet flushed."""
+        self.pending.clear()
+        self.text.delete("1.0", tk.END)
+        self.line_count = 0
+
+class VirtualTable:
+    """
+    Treeview that only holds the rows currently on screen.
+
+    Row data stays in the caller's column sequences; scrolling refills a fixed
+    set of Treeview items, so memory and redraw cost don't grow with the data.
+    """
+    
+    def __init__(self, parent, headings, visible_rows=EXPLORER_VISIBLE_ROWS):
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+        
+        self.tree = ttk.Treeview(self.frame, columns=headings, show="headings",
+                                 height=visible_rows, selectmode="none")
+        for heading in headings:
+            self.tree.heading(heading, text=heading)
+            self.tree.column(heading, width=150, anchor=tk.W)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.on_scroll)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        self.visible_rows = visible_rows
+        self.columns = ()
+        self.row_count = 0
+        self.first_row = 0
+        self.items = [self.tree.insert("", tk.END, values=()) for _ in range(visible_rows)]
+        
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", self.on_mousewheel)
+        self.tree.bind("<Button-5>", self.on_mousewheel)
+        self.render()
+    
+    def set_columns(self, *columns):
+        """Show new data, given as one sequence per heading."""
+        self.columns = columns
+        self.row_count = len(columns[0]) if columns else 0
+        self.first_row = 0
+        self.render()
+    
+    def render(self):
+        """Fill the on-screen items from first_row onwards."""
+        for offset, item in enumerate(self.items):
+            row = self.first_row + offset
+            if row < self.row_count:
+                self.tree.item(item, values=tuple(column[row] for column in self.columns))
+            else:
+                self.tree.item(item, values=())
+        
+        if self.row_count:
+            last_row = min(self.first_row + self.visible_rows, self.row_count)
+            self.scrollbar.set(self.first_row / self.row_count, last_row / self.row_count)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def scroll_to(self, first_row):
+        """Scroll so first_row is the top visible row."""
+        first_row = max(0, min(first_row, self.row_count - self.visible_rows))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.render()
+    
+    def on_scroll(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.first_row + int(args[1]) * step)
+    
+    def on_mousewheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first_row - 3)
+        else:
+            self.scroll_to(self.first_row + 3)
+        return "break"
+
+class QueueLogHandler(logging.Handler):
+    """Logging handler forwarding formatted records to the GUI's log queue."""
+    
+    def __init__(self, log_queue):
+        super().__init__()
+        self.log_queue = log_queue
+        self.setFormatter(logging.Formatter(fetch_abs_data_auto.LOG_FORMAT))
+    
+    def emit(self, record):
+        try:
+            self.log_queue.put(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+class QueueLineWriter:
+    """File-like object sending each printed line to the GUI's log queue."""
+    
+    def __init__(self, log_queue):
+        self.log_queue = log_queue
+    
+    def write(self, text):
+        for line in text.splitlines():
+            if line.strip():
+                self.log_queue.put(line.strip())
+        return len(text)
+    
+    def flush(self):
+        pass
 
 class ABSDataFetcherGUI:
     def __init__(self, root):
@@ -22,10 +222,27 @@ class ABSDataFetcherGUI:
         # Queue for thread-safe communication
         self.log_queue = queue.Queue()
         self.progress_queue = queue.Queue()
+        self.status_queue = queue.Queue()
+        self.explorer_queue = queue.Queue()
         
         # State variables
         self.is_running = False
-        self.current_process = None
+        self.current_runner = None
+        self.worker_thread = None
+        self.closing = False
+        
+        # Status panel loading state (see update_status_panel)
+        self.status_thread = None
+        self.status_cache = None
+        self.status_refresh_pending = False
+        
+        # Explorer tab state (index loads lazily, see load_series_index)
+        self.series_index = None
+        self.index_thread = None
+        
+        # UI update loop state (see check_queues)
+        self.polling = False
+        self.poll_interval = POLL_INTERVAL_MIN_MS
         
         # Session statistics
         self.session_fetched = 0
@@ -43,7 +260,7 @@ class ABSDataFetcherGUI:
         
         self.setup_ui()
         self.update_status_panel()
-        self.check_queues()
+        self.schedule_poll()
         
     def setup_ui(self):
         """Setup the main UI layout."""
@@ -136,7 +353,7 @@ class ABSDataFetcherGUI:
         self.total_records_label.grid(row=1, column=1, sticky=tk.W)
         
         ttk.Label(status_frame, text="Completed:", font=("Helvetica", 9, "bold")).grid(row=2, column=0, sticky=tk.W, padx=(0, 5))
-        self.completed_label = ttk.Label(status_frame, text="0 / 1620", font=("Helvetica", 9))
+        self.completed_label = ttk.Label(status_frame, text="0", font=("Helvetica", 9))
         self.completed_label.grid(row=2, column=1, sticky=tk.W)
         
         ttk.Label(status_frame, text="This Session:", font=("Helvetica", 9, "bold")).grid(row=3, column=0, sticky=tk.W, padx=(0, 5))
@@ -205,7 +422,22 @@ class ABSDataFetcherGUI:
             cursor="hand2",
             state=tk.DISABLED
         )
-        self.stop_button.grid(row=0, column=2)
+        self.stop_button.grid(row=0, column=2, padx=(0, 10))
+        
+        self.pause_button = tk.Button(
+            button_frame,
+            text="⏸️ Pause",
+            command=self.toggle_pause,
+            bg=self.bg_color,
+            fg="black",
+            font=("Helvetica", 11, "bold"),
+            padx=20,
+            pady=10,
+            relief=tk.RAISED,
+            cursor="hand2",
+            state=tk.DISABLED
+        )
+        self.pause_button.grid(row=0, column=3)
         
         # Progress bar
         progress_frame = ttk.Frame(control_frame)
@@ -225,9 +457,24 @@ class ABSDataFetcherGUI:
         self.progress_label = ttk.Label(progress_frame, text="0%", font=("Helvetica", 9))
         self.progress_label.grid(row=0, column=1)
         
-        # ===== LOG PANEL =====
-        log_frame = ttk.LabelFrame(main_frame, text="📝 Activity Log", padding="10")
-        log_frame.grid(row=4, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        # Live metrics from the fetcher's request timings
+        metrics_frame = ttk.Frame(control_frame)
+        metrics_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        self.metrics_labels = {}
+        for column, (name, title) in enumerate(METRICS_LABELS.items()):
+            ttk.Label(metrics_frame, text=title, font=("Helvetica", 9, "bold")).grid(
+                row=0, column=column * 2, sticky=tk.W, padx=(0 if column == 0 else 15, 5))
+            label = ttk.Label(metrics_frame, text="-", font=("Helvetica", 9))
+            label.grid(row=0, column=column * 2 + 1, sticky=tk.W)
+            self.metrics_labels[name] = label
+        
+        # ===== LOG / EXPLORER TABS =====
+        self.notebook = ttk.Notebook(main_frame)
+        self.notebook.grid(row=4, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        
+        log_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(log_frame, text="📝 Activity Log")
         log_frame.columnconfigure(0, weight=1)
         log_frame.rowconfigure(0, weight=1)
         
@@ -250,9 +497,32 @@ class ABSDataFetcherGUI:
         self.log_text.tag_config("error", foreground="#F44336", font=("Courier", 9, "bold"))
         self.log_text.tag_config("checkpoint", foreground="#9C27B0", font=("Courier", 9, "bold"))
         
+        self.log_view = LogView(self.log_text)
+        
+        log_controls = ttk.Frame(log_frame)
+        log_controls.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        log_controls.columnconfigure(len(LOG_LEVELS), weight=1)
+        
+        # Level filters
+        self.log_level_vars = {}
+        for column, level in enumerate(LOG_LEVELS):
+            level_var = tk.BooleanVar(value=True)
+            self.log_level_vars[level] = level_var
+            ttk.Checkbutton(
+                log_controls,
+                text=level.capitalize(),
+                variable=level_var,
+                command=lambda level=level: self.log_view.set_level_visible(level, self.log_level_vars[level].get())
+            ).grid(row=0, column=column, sticky=tk.W, padx=(0, 5))
+        
         # Clear log button
-        clear_button = ttk.Button(log_frame, text="Clear Log", command=self.clear_log)
-        clear_button.grid(row=1, column=0, sticky=tk.E, pady=(5, 0))
+        clear_button = ttk.Button(log_controls, text="Clear Log", command=self.clear_log)
+        clear_button.grid(row=0, column=len(LOG_LEVELS), sticky=tk.E)
+        
+        explorer_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(explorer_frame, text="🔎 Explorer")
+        self.setup_explorer(explorer_frame)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # ===== FOOTER =====
         footer_frame = ttk.Frame(main_frame)
@@ -279,92 +549,227 @@ class ABSDataFetcherGUI:
         # Load saved API key (must be after log_text is created)
         self.load_api_key()
         
+    def setup_explorer(self, parent):
+        """Setup the data explorer tab."""
+        parent.columnconfigure(0, weight=1)
+        parent.rowconfigure(3, weight=1)
+        
+        filters_frame = ttk.Frame(parent)
+        filters_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        
+        self.explorer_vars = {}
+        self.explorer_boxes = {}
+        for column, field in enumerate(SERIES_FIELDS):
+            filters_frame.columnconfigure(column, weight=1)
+            ttk.Label(filters_frame, text=EXPLORER_LABELS[field], font=("Helvetica", 9, "bold")).grid(
+                row=0, column=column, sticky=tk.W)
+            
+            field_var = tk.StringVar()
+            box = ttk.Combobox(filters_frame, textvariable=field_var, state="readonly", width=18)
+            box.grid(row=1, column=column, sticky=(tk.W, tk.E), padx=(0, 5))
+            box.bind("<<ComboboxSelected>>", lambda event: self.show_series())
+            self.explorer_vars[field] = field_var
+            self.explorer_boxes[field] = box
+        
+        reload_button = ttk.Button(filters_frame, text="🔄 Reload", command=self.load_series_index)
+        reload_button.grid(row=1, column=len(SERIES_FIELDS), sticky=tk.E)
+        
+        self.explorer_status_label = ttk.Label(parent, text="Open this tab to load the local dataset",
+                                               font=("Helvetica", 9), foreground="#666")
+        self.explorer_status_label.grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        
+        self.series_lookup_label = ttk.Label(parent, text="", font=("Helvetica", 9))
+        self.series_lookup_label.grid(row=2, column=0, sticky=tk.W, pady=(0, 5))
+        
+        self.series_table = VirtualTable(parent, ("Month", "Value"))
+        self.series_table.frame.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    
+    def on_tab_changed(self, event):
+        """Load the explorer index the first time its tab is shown."""
+        if self.explorer_visible() and self.series_index is None:
+            self.load_series_index()
+    
+    def explorer_visible(self):
+        return self.notebook.index(self.notebook.select()) == 1
+    
+    def load_series_index(self):
+        """Build the series index from the local dataset on a background thread."""
+        if self.index_thread is not None and self.index_thread.is_alive():
+            return
+        self.explorer_status_label.config(text="Loading local dataset...")
+        self.index_thread = threading.Thread(target=self._load_index_thread, daemon=True)
+        self.index_thread.start()
+        self.schedule_poll()
+    
+    def _load_index_thread(self):
+        """Thread worker building the series index."""
+        try:
+            self.explorer_queue.put(("ok", SeriesIndex.load()))
+        except Exception as e:
+            self.explorer_queue.put(("error", e))
+    
+    def apply_series_index(self, index):
+        """Fill the explorer filters from a freshly loaded index."""
+        self.series_index = index
+        if index.source_file is None:
+            self.explorer_status_label.config(text="No _FIXED.csv dataset found - fetch data first")
+            return
+        
+        for field in SERIES_FIELDS:
+            values = index.values_for(field)
+            self.explorer_boxes[field].config(values=values)
+            if self.explorer_vars[field].get() not in values:
+                self.explorer_vars[field].set(values[0] if values else "")
+        
+        self.explorer_status_label.config(
+            text=f"{index.record_count:,} records in {len(index.series):,} series from "
+                 f"{os.path.basename(index.source_file)} (indexed in {index.load_seconds:.1f}s)")
+        self.show_series()
+    
+    def show_series(self):
+        """Look up the selected series and show it in the table."""
+        if self.series_index is None:
+            return
+        key = [self.explorer_vars[field].get() for field in SERIES_FIELDS]
+        
+        start = time.perf_counter()
+        months, values = self.series_index.lookup(*key)
+        lookup_ms = (time.perf_counter() - start) * 1000
+        
+        self.series_table.set_columns(months, values)
+        if months:
+            self.series_lookup_label.config(
+                text=f"{len(months):,} observations, {months[0]} to {months[-1]} (lookup {lookup_ms:.3f} ms)")
+        else:
+            self.series_lookup_label.config(text="No observations for this combination")
+    
     def update_status_panel(self):
-        """Update the status panel with checkpoint information."""
-        checkpoint_file = "abs_fetch_checkpoint.json"
+        """Refresh the status panel from the checkpoint on a background thread."""
+        if self.status_thread is not None and self.status_thread.is_alive():
+            # Re-read once the current load finishes, the files may have changed since it started
+            self.status_refresh_pending = True
+            return
         
-        if os.path.exists(checkpoint_file):
-            try:
-                with open(checkpoint_file, 'r') as f:
-                    checkpoint = json.load(f)
-                
-                # Update labels
-                last_run = checkpoint.get('last_run')
-                if last_run:
-                    try:
-                        dt = datetime.fromisoformat(last_run)
-                        self.last_run_label.config(text=dt.strftime("%Y-%m-%d %H:%M"))
-                        
-                        # Calculate freshness
-                        days_ago = (datetime.now() - dt).days
-                        if days_ago == 0:
-                            freshness_text = "Today"
-                            freshness_color = self.success_color
-                        elif days_ago == 1:
-                            freshness_text = "Yesterday"
-                            freshness_color = self.success_color
-                        elif days_ago < 7:
-                            freshness_text = f"{days_ago} days ago"
-                            freshness_color = self.success_color
-                        elif days_ago < 30:
-                            freshness_text = f"{days_ago} days ago"
-                            freshness_color = self.warning_color
-                        else:
-                            freshness_text = f"{days_ago} days ago (Needs refresh)"
-                            freshness_color = self.error_color
-                        
-                        self.freshness_label.config(text=freshness_text, foreground=freshness_color)
-                    except:
-                        self.last_run_label.config(text="Unknown")
-                else:
-                    self.last_run_label.config(text="Never")
-                
-                # Total records
-                total_records = checkpoint.get('total_records', 0)
-                self.total_records_label.config(text=f"{total_records:,}")
-                
-                # Completed combinations
-                completed = len(checkpoint.get('completed_combinations', {}))
-                self.completed_label.config(text=f"{completed} / 1620")
-                
-                # Latest month
-                latest_months = []
-                for combo_data in checkpoint.get('completed_combinations', {}).values():
-                    latest_month = combo_data.get('latest_month')
-                    if latest_month:
-                        latest_months.append(latest_month)
-                
-                if latest_months:
-                    latest = max(latest_months)
-                    self.latest_month_label.config(text=latest)
-                else:
-                    self.latest_month_label.config(text="Unknown")
-                
-                self.log_message("Status updated from checkpoint", "info")
-                
-            except Exception as e:
-                self.log_message(f"Error reading checkpoint: {e}", "error")
-                self.last_run_label.config(text="Error")
-                self.freshness_label.config(text="Error")
+        self.status_refresh_pending = False
+        self.status_thread = threading.Thread(target=self._load_status_thread, daemon=True)
+        self.status_thread.start()
+        self.schedule_poll()
+    
+    def _load_status_thread(self):
+        """Thread worker reading the status figures for the status panel."""
+        try:
+            self.status_queue.put(("ok", self.read_status()))
+        except Exception as e:
+            self.status_queue.put(("error", e))
+    
+    def read_status(self):
+        """
+        Read the status panel figures, or None if there is no checkpoint yet.
+        
+        Results are cached by the checkpoint's mtime and size. The fetcher's
+        small summary file is used when it is at least as new as the
+        checkpoint; only older checkpoints are parsed in full.
+        """
+        checkpoint_file = find_existing_variant(CHECKPOINT_FILE)
+        if checkpoint_file is None:
+            return None
+        
+        stat = os.stat(checkpoint_file)
+        cache_key = (checkpoint_file, stat.st_mtime_ns, stat.st_size)
+        if self.status_cache is not None and self.status_cache[0] == cache_key:
+            return self.status_cache[1]
+        
+        if os.path.exists(SUMMARY_FILE) and os.path.getmtime(SUMMARY_FILE) >= stat.st_mtime:
+            with open(SUMMARY_FILE, 'r') as f:
+                status = json.load(f)
         else:
+            with open_data_file(checkpoint_file, 'r') as f:
+                checkpoint = json.load(f)
+            
+            combinations = checkpoint.get('completed_combinations', {})
+            latest_months = [c.get('latest_month') for c in combinations.values() if c.get('latest_month')]
+            status = {
+                "last_run": checkpoint.get('last_run'),
+                "total_records": checkpoint.get('total_records', 0),
+                "completed": len(combinations),
+                "latest_month": max(latest_months) if latest_months else None,
+                "total_combinations": checkpoint.get('summary', {}).get('total_combinations')
+            }
+        
+        self.status_cache = (cache_key, status)
+        return status
+    
+    def apply_status(self, status):
+        """Update the status panel labels from read_status() figures."""
+        if status is None:
             self.last_run_label.config(text="Never")
             self.total_records_label.config(text="0")
-            self.completed_label.config(text="0 / 1620")
+            self.completed_label.config(text="0")
             self.freshness_label.config(text="No data yet")
             self.latest_month_label.config(text="N/A")
             self.log_message("No checkpoint found. Ready for first run.", "info")
+            return
+        
+        # Update labels
+        last_run = status.get('last_run')
+        if last_run:
+            try:
+                dt = datetime.fromisoformat(last_run)
+                self.last_run_label.config(text=dt.strftime("%Y-%m-%d %H:%M"))
+                
+                # Calculate freshness
+                days_ago = (datetime.now() - dt).days
+                if days_ago == 0:
+                    freshness_text = "Today"
+                    freshness_color = self.success_color
+                elif days_ago == 1:
+                    freshness_text = "Yesterday"
+                    freshness_color = self.success_color
+                elif days_ago < 7:
+                    freshness_text = f"{days_ago} days ago"
+                    freshness_color = self.success_color
+                elif days_ago < 30:
+                    freshness_text = f"{days_ago} days ago"
+                    freshness_color = self.warning_color
+                else:
+                    freshness_text = f"{days_ago} days ago (Needs refresh)"
+                    freshness_color = self.error_color
+                
+                self.freshness_label.config(text=freshness_text, foreground=freshness_color)
+            except:
+                self.last_run_label.config(text="Unknown")
+        else:
+            self.last_run_label.config(text="Never")
+        
+        # Total records
+        total_records = status.get('total_records', 0)
+        self.total_records_label.config(text=f"{total_records:,}")
+        
+        # Completed combinations, out of the fetcher's planned total when known
+        completed = status.get('completed', 0)
+        total_combinations = status.get('total_combinations')
+        if total_combinations:
+            self.completed_label.config(text=f"{completed} / {total_combinations}")
+        else:
+            self.completed_label.config(text=f"{completed}")
+        
+        # Latest month
+        self.latest_month_label.config(text=status.get('latest_month') or "Unknown")
+        
+        self.log_message("Status updated from checkpoint", "info")
     
     def log_message(self, message, level="info"):
         """Add a message to the log with timestamp and color."""
         timestamp = datetime.now().strftime("%H:%M:%S")
         formatted_message = f"[{timestamp}] {message}\n"
         
-        self.log_text.insert(tk.END, formatted_message, level)
-        self.log_text.see(tk.END)
+        # Inserted in a batch on the next UI tick (see check_queues)
+        self.log_view.append(formatted_message, level)
+        self.schedule_poll()
     
     def clear_log(self):
         """Clear the log text area."""
-        self.log_text.delete(1.0, tk.END)
+        self.log_view.clear()
         self.log_message("Log cleared", "info")
     
     def update_session_stats(self):
@@ -484,10 +889,16 @@ Getting Your API Key
 
 ⏹️ Stop (Red Button)
    • Safely stops current operation
-   • Progress is automatically saved to checkpoint
+   • Stops before the next request, even during a rate-limit wait
+   • Progress and all data fetched so far are saved
    • Can resume by clicking "Fetch Data" again
    • Only active when a process is running
 
+⏸️ Pause / ▶️ Resume
+   • Pauses the fetch before its next request
+   • Click again to carry on from where it paused
+   • Only active while fetching
+
 ═══════════════════════════════════════════════════
 
 📊 STATUS PANEL FIELDS
@@ -502,7 +913,7 @@ Total Records
 
 Completed
    • Progress: X / 1620 combinations
-   • 1620 = total possible data combinations
+   • 1620 = total possible data combinations with the default grid
 
 This Session
    • ✅ Fetched: Successful data requests
@@ -637,6 +1048,8 @@ See documentation files:
         self.fetch_button.config(state=state)
         self.refresh_button.config(state=state)
         self.stop_button.config(state=tk.NORMAL if running else tk.DISABLED)
+        pausable = running and self.current_runner is not None
+        self.pause_button.config(state=tk.NORMAL if pausable else tk.DISABLED, text="⏸️ Pause")
     
     def run_fetch(self):
         """Run the data fetch script in a separate thread."""
@@ -650,6 +1063,9 @@ See documentation files:
             messagebox.showerror("No API Key", "Please enter and save your API key before fetching data.")
             return
         
+        # The runner is created here so Stop and Pause work as soon as the thread starts
+        self.current_runner = fetch_abs_data_auto.FetchRunner(api_key, event_sink=self.progress_queue.put)
+        
         self.is_running = True
         self.set_buttons_state(running=True)
         self.progress_var.set(0)
@@ -660,54 +1076,35 @@ See documentation files:
         self.session_failed = 0
         self.session_not_available = 0
         self.update_session_stats()
+        self.reset_metrics()
         
         self.log_message("Starting data fetch...", "info")
         
-        thread = threading.Thread(target=self._run_fetch_thread, daemon=True)
-        thread.start()
+        self.worker_thread = threading.Thread(target=self._run_fetch_thread, daemon=True)
+        self.worker_thread.start()
+        self.schedule_poll()
     
     def _run_fetch_thread(self):
-        """Thread worker for running fetch script."""
+        """Thread worker running the fetch in-process."""
+        fetch_abs_data_auto.setup_logging()
+        log_handler = QueueLogHandler(self.log_queue)
+        logging.getLogger().addHandler(log_handler)
         try:
-            # Get API key from the entry field
-            api_key = self.api_key_var.get().strip()
+            fetch_abs_data_auto.load_grid()
+            result_file = self.current_runner.run()
             
-            self.current_process = subprocess.Popen(
-                ['python3', 'fetch_abs_data_auto.py', '--api-key', api_key],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
-            )
-            
-            # Read output line by line
-            for line in self.current_process.stdout:
-                line = line.strip()
-                if line:
-                    self.log_queue.put(line)
-                    
-                    # Parse progress
-                    if "Progress:" in line and "[" in line and "/" in line:
-                        try:
-                            # Extract [current/total]
-                            parts = line.split("[")[1].split("]")[0]
-                            current, total = parts.split("/")
-                            progress = (int(current) / int(total)) * 100
-                            self.progress_queue.put(progress)
-                        except:
-                            pass
-            
-            self.current_process.wait()
-            
-            if self.current_process.returncode == 0:
+            if self.current_runner.cancelled:
+                self.log_queue.put("WARNING:Data fetch stopped - everything fetched so far has been saved")
+            elif result_file:
                 self.log_queue.put("SUCCESS:Data fetch completed successfully!")
-                self.progress_queue.put(100)
+                self.progress_queue.put({"event": "run_finished", "percent": 100})
             else:
-                self.log_queue.put(f"ERROR:Data fetch failed with exit code {self.current_process.returncode}")
+                self.log_queue.put("ERROR:Data fetch completed with errors")
             
         except Exception as e:
             self.log_queue.put(f"ERROR:Exception during fetch: {e}")
         finally:
+            logging.getLogger().removeHandler(log_handler)
             self.log_queue.put("DONE")
     
     def run_fix_csv(self):
@@ -721,29 +1118,24 @@ See documentation files:
         self.status_label.config(text="Fixing CSV...", foreground=self.accent_color)
         self.log_message("Starting CSV fix...", "info")
         
-        thread = threading.Thread(target=self._run_fix_csv_thread, daemon=True)
-        thread.start()
+        self.worker_thread = threading.Thread(target=self._run_fix_csv_thread, daemon=True)
+        self.worker_thread.start()
+        self.schedule_poll()
     
     def _run_fix_csv_thread(self):
-        """Thread worker for running CSV fix script."""
+        """Thread worker running the CSV fix in-process, its printed output going to the log."""
         try:
-            self.current_process = subprocess.Popen(
-                ['python3', 'fix_abs_csv.py'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            
-            output, _ = self.current_process.communicate()
+            with contextlib.redirect_stdout(QueueLineWriter(self.log_queue)):
+                input_file = fix_abs_csv.find_input_file()
+                if input_file is None:
+                    self.log_queue.put("ERROR:No ABS labour force CSV files found - fetch data first")
+                    return
+                output_file = fix_abs_csv.fix_csv(input_file)
             
-            for line in output.split('\n'):
-                if line.strip():
-                    self.log_queue.put(line.strip())
-            
-            if self.current_process.returncode == 0:
+            if output_file:
                 self.log_queue.put("SUCCESS:CSV fix completed successfully!")
             else:
-                self.log_queue.put(f"ERROR:CSV fix failed with exit code {self.current_process.returncode}")
+                self.log_queue.put("ERROR:CSV fix failed - no output written")
         
         except Exception as e:
             self.log_queue.put(f"ERROR:Exception during CSV fix: {e}")
@@ -762,10 +1154,12 @@ See documentation files:
         )
         
         if result:
-            checkpoint_file = "abs_fetch_checkpoint.json"
-            if os.path.exists(checkpoint_file):
+            checkpoint_file = find_existing_variant(CHECKPOINT_FILE)
+            if checkpoint_file:
                 try:
                     os.remove(checkpoint_file)
+                    if os.path.exists(SUMMARY_FILE):
+                        os.remove(SUMMARY_FILE)
                     self.log_message("Checkpoint deleted. Next run will fetch all data.", "warning")
                     self.update_status_panel()
                 except Exception as e:
@@ -775,97 +1169,238 @@ See documentation files:
     
     def stop_process(self):
         """Stop the currently running process."""
-        if self.current_process:
+        if self.current_runner is not None:
             result = messagebox.askyesno("Stop Process", "Are you sure you want to stop the current process?")
             if result:
-                self.current_process.terminate()
-                self.log_message("Process stopped by user", "warning")
-                self.is_running = False
-                self.set_buttons_state(running=False)
-                self.status_label.config(text="Stopped", foreground=self.warning_color)
+                # The runner stops before its next request and saves everything it has fetched
+                self.current_runner.stop()
+                self.log_message("Stopping - saving progress...", "warning")
+                self.stop_button.config(state=tk.DISABLED)
+                self.pause_button.config(state=tk.DISABLED)
+                self.status_label.config(text="Stopping...", foreground=self.warning_color)
+    
+    def on_close(self):
+        """Close the window, first stopping and flushing a running fetch."""
+        if self.closing:
+            return
+        if self.current_runner is not None:
+            if not messagebox.askyesno("Fetch Running", "A fetch is running. Stop it, save progress and exit?"):
+                return
+            self.current_runner.stop()
+            self.status_label.config(text="Saving progress...", foreground=self.warning_color)
+        self.closing = True
+        self.close_when_idle()
+    
+    def close_when_idle(self):
+        """Destroy the window once the worker has finished, checking from the Tk loop so it stays responsive."""
+        if self.worker_thread is not None and self.worker_thread.is_alive():
+            self.root.after(POLL_INTERVAL_MAX_MS, self.close_when_idle)
+            return
+        self.root.destroy()
+    
+    def toggle_pause(self):
+        """Pause or resume the running fetch."""
+        if self.current_runner is None:
+            return
+        if self.current_runner.cancel_token.paused:
+            self.current_runner.resume()
+            self.pause_button.config(text="⏸️ Pause")
+            self.status_label.config(text="Fetching data...", foreground=self.accent_color)
+        else:
+            self.current_runner.pause()
+            self.pause_button.config(text="▶️ Resume")
+            self.status_label.config(text="Paused", foreground=self.warning_color)
+    
+    def classify_log_line(self, message):
+        """Pick the log colour tag for a line of fetcher/fixer output."""
+        if "💾" in message or "Checkpoint saved" in message:
+            return "checkpoint"
+        if "🚫" in message or "⚠️" in message or " - WARNING - " in message:
+            return "warning"
+        if "❌" in message or " - ERROR - " in message:
+            return "error"
+        if "✅" in message:
+            return "success"
+        return "info"
+    
+    def handle_progress_event(self, event):
+        """Apply a typed progress event from the fetcher to the UI."""
+        if "fetched" in event:
+            self.session_fetched = event["fetched"]
+            self.session_failed = event["failed"]
+            self.session_not_available = event["not_available"]
+            self.update_session_stats()
+        
+        if "requests_per_second" in event:
+            self.update_metrics(event)
+        
+        if event.get("total"):
+            progress = (event.get("current", 0) / event["total"]) * 100
+        else:
+            progress = event.get("percent")
+        if progress is None:
+            return
+        
+        if event["event"] == "run_finished":
+            progress = 100
+        self.progress_var.set(progress)
+        
+        eta_seconds = event.get("eta_seconds")
+        if eta_seconds and event["event"] != "run_finished":
+            self.progress_label.config(text=f"{progress:.1f}% (ETA {self.format_duration(eta_seconds)})")
+        else:
+            self.progress_label.config(text=f"{progress:.1f}%")
+    
+    def update_metrics(self, event):
+        """Show the live request metrics carried by a progress event."""
+        self.metrics_labels["rate"].config(text=f"{event['requests_per_second']:.2f}")
+        
+        percentiles = [event.get(name) for name in ("latency_p50", "latency_p95", "latency_p99")]
+        if percentiles[0] is not None:
+            self.metrics_labels["latency"].config(text=" / ".join(f"{p * 1000:.0f}" for p in percentiles) + " ms")
+        
+        self.metrics_labels["wait"].config(text=self.format_duration(event.get("rate_limit_wait_seconds", 0)))
+        self.metrics_labels["received"].config(text=self.format_bytes(event.get("bytes_received", 0)))
+        
+        eta_seconds = event.get("eta_seconds")
+        if event["event"] == "run_finished":
+            self.metrics_labels["eta"].config(text="Done")
+        elif eta_seconds is not None:
+            self.metrics_labels["eta"].config(text=self.format_duration(eta_seconds))
+    
+    def reset_metrics(self):
+        """Clear the live metrics row for a new run."""
+        for label in self.metrics_labels.values():
+            label.config(text="-")
+    
+    def format_bytes(self, size):
+        """Format a byte count as e.g. '512 B', '12.3 KB' or '4.5 MB'."""
+        if size >= 1_000_000:
+            return f"{size / 1_000_000:.1f} MB"
+        if size >= 1000:
+            return f"{size / 1000:.1f} KB"
+        return f"{size} B"
+    
+    def format_duration(self, seconds):
+        """Format a duration in seconds as e.g. '1h 05m', '12m' or '40s'."""
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+        if seconds >= 60:
+            return f"{seconds // 60}m"
+        return f"{seconds}s"
+    
+    def schedule_poll(self):
+        """Start the UI update loop if it is idle."""
+        if not self.polling:
+            self.polling = True
+            self.poll_interval = POLL_INTERVAL_MIN_MS
+            self.root.after(self.poll_interval, self.check_queues)
     
     def check_queues(self):
-        """Check message queues for updates from worker threads."""
+        """
+        Check message queues for updates from worker threads.
+        
+        Log messages are handled up to a per-tick count and time budget, and
+        only the latest progress event is applied. The polling interval backs
+        off while nothing arrives, and the loop stops once no process is
+        running; schedule_poll() starts it again.
+        """
+        deadline = time.perf_counter() + POLL_FRAME_BUDGET_MS / 1000
+        handled = 0
+        
         # Check log queue
         try:
-            while True:
+            while handled < POLL_MAX_MESSAGES and time.perf_counter() < deadline:
                 message = self.log_queue.get_nowait()
+                handled += 1
                 
                 if message == "DONE":
+                    stopped = self.current_runner is not None and self.current_runner.cancelled
                     self.is_running = False
+                    self.current_runner = None
                     self.set_buttons_state(running=False)
-                    self.status_label.config(text="Ready", foreground=self.success_color)
+                    if stopped:
+                        self.status_label.config(text="Stopped", foreground=self.warning_color)
+                    else:
+                        self.status_label.config(text="Ready", foreground=self.success_color)
                     self.update_status_panel()
+                    
+                    # New data file - rebuild the explorer index now if it's on screen, otherwise when next opened
+                    self.series_index = None
+                    if self.explorer_visible():
+                        self.load_series_index()
                 elif message.startswith("SUCCESS:"):
                     self.log_message(message.replace("SUCCESS:", ""), "success")
                 elif message.startswith("ERROR:"):
                     self.log_message(message.replace("ERROR:", ""), "error")
-                elif "💾 Checkpoint saved" in message or "Checkpoint saved" in message:
-                    self.log_message(message, "checkpoint")
-                    # Extract stats from checkpoint message if present
-                    if "(" in message and "successful" in message:
-                        try:
-                            parts = message.split("(")[1].split(")")[0]
-                            if "successful" in parts:
-                                success_num = int(parts.split("successful")[0].strip())
-                                self.session_fetched = success_num
-                            if "failed" in parts:
-                                failed_num = int(parts.split("failed")[0].split(",")[-1].strip())
-                                self.session_failed = failed_num
-                            self.update_session_stats()
-                        except:
-                            pass
-                elif "🚫" in message or ("Not available in API" in message):
-                    self.session_not_available += 1
-                    self.update_session_stats()
-                    self.log_message(message, "warning")
-                elif "✅" in message and "records" in message and "latest:" in message:
-                    # This is a successful fetch message with details
-                    self.log_message(message, "success")
-                elif "ERROR" in message and "Error fetching" in message:
-                    self.session_failed += 1
-                    self.update_session_stats()
-                    self.log_message(message, "error")
-                elif "❌" in message or "Error" in message or "Failed" in message:
-                    self.log_message(message, "error")
-                elif "✅" in message or "Success" in message or "Complete" in message:
-                    self.log_message(message, "success")
-                elif "⚠️" in message or "Warning" in message:
-                    self.log_message(message, "warning")
-                elif "Progress:" in message:
-                    self.log_message(message, "info")
-                    # Update session stats from progress message
-                    if "Fetched:" in message:
-                        try:
-                            parts = message.split("Fetched:")[1].split(",")[0].strip()
-                            self.session_fetched = int(parts)
-                            if "Failed:" in message:
-                                failed_parts = message.split("Failed:")[1].split(",")[0].strip()
-                                self.session_failed = int(failed_parts)
-                            self.update_session_stats()
-                        except:
-                            pass
+                elif message.startswith("WARNING:"):
+                    self.log_message(message.replace("WARNING:", ""), "warning")
                 else:
-                    self.log_message(message, "info")
+                    # Colour only - counters and progress come from the event stream
+                    self.log_message(message, self.classify_log_line(message))
         except queue.Empty:
             pass
         
-        # Check progress queue
+        # Check progress queue - every event carries the full counters, so only the last matters
+        latest_event = None
         try:
             while True:
-                progress = self.progress_queue.get_nowait()
-                self.progress_var.set(progress)
-                self.progress_label.config(text=f"{progress:.1f}%")
+                latest_event = self.progress_queue.get_nowait()
         except queue.Empty:
             pass
+        if latest_event is not None:
+            self.handle_progress_event(latest_event)
+            handled += 1
+        
+        # Check status panel results
+        try:
+            while True:
+                result, value = self.status_queue.get_nowait()
+                handled += 1
+                if result == "ok":
+                    self.apply_status(value)
+                else:
+                    self.log_message(f"Error reading checkpoint: {value}", "error")
+                    self.last_run_label.config(text="Error")
+                    self.freshness_label.config(text="Error")
+                if self.status_refresh_pending:
+                    self.status_thread.join()
+                    self.update_status_panel()
+        except queue.Empty:
+            pass
+        
+        # Check explorer index results
+        try:
+            while True:
+                result, value = self.explorer_queue.get_nowait()
+                handled += 1
+                if result == "ok":
+                    self.apply_series_index(value)
+                else:
+                    self.explorer_status_label.config(text=f"Error loading dataset: {value}")
+        except queue.Empty:
+            pass
+        
+        self.log_view.flush()
         
         # Schedule next check
-        self.root.after(100, self.check_queues)
+        worker_alive = any(thread is not None and thread.is_alive()
+                           for thread in (self.worker_thread, self.status_thread, self.index_thread))
+        if handled:
+            self.poll_interval = POLL_INTERVAL_MIN_MS
+        elif self.is_running or worker_alive:
+            self.poll_interval = min(self.poll_interval * 2, POLL_INTERVAL_MAX_MS)
+        elif all(q.empty() for q in (self.log_queue, self.progress_queue, self.status_queue, self.explorer_queue)):
+            self.polling = False
+            return
+        self.root.after(self.poll_interval, self.check_queues)
 
 def main():
     """Main entry point."""
     root = tk.Tk()
     app = ABSDataFetcherGUI(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     
     # Center window on screen
     root.update_idletasks()
@@ -0,0 +1,140 @@
+"""
+In-memory index over the local ABS labour force dataset.
+Observations are grouped by series (region, data item, age, sex, adjustment type),
+so looking up a series is a single dictionary hit.
+"""
+
+import csv
+import glob
+import os
+import time
+from bisect import bisect_left, bisect_right
+from abs_io import open_data_file, strip_compression_suffix
+
+# Record fields identifying a series, in key order
+SERIES_FIELDS = (
+    "region_description",
+    "data_item_description",
+    "age_description",
+    "sex_description",
+    "adjustment_type_description"
+)
+
+def find_latest_dataset(prefix="abs_labour_force_ALL_DATA"):
+    """Return the most recent _FIXED.csv file (any compression) with the given prefix, or None."""
+    fixed_files = [f for f in glob.glob(f"{prefix}_*_FIXED.csv*")
+                   if strip_compression_suffix(f).endswith("_FIXED.csv")]
+    if not fixed_files:
+        return None
+    return max(fixed_files, key=os.path.getctime)
+
+class SeriesIndex:
+    """
+    Observations indexed by series key.
+
+    Each series is stored as two parallel, month-sorted lists (months and
+    values) rather than one dict per record, which keeps the index compact.
+    """
+    
+    def __init__(self):
+        self.series = {}
+        self.postings = [{} for _ in SERIES_FIELDS]
+        self.source_file = None
+        self.record_count = 0
+        self.load_seconds = 0.0
+    
+    @classmethod
+    def from_records(cls, records):
+        """Build an index from record dicts."""
+        index = cls()
+        for record in records:
+            key = tuple(record.get(field, '') for field in SERIES_FIELDS)
+            index._add(key, record.get('observation_month', ''), record.get('observation_value', ''))
+        index._sort()
+        index._build_postings()
+        return index
+    
+    @classmethod
+    def load(cls, path=None):
+        """Build an index from a _FIXED.csv file (the most recent one by default)."""
+        start = time.perf_counter()
+        index = cls()
+        index.source_file = path or find_latest_dataset()
+        if index.source_file is None:
+            return index
+        
+        with open_data_file(index.source_file, 'r', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            columns = {name: position for position, name in enumerate(header)}
+            key_columns = [columns.get(field) for field in SERIES_FIELDS]
+            month_column = columns.get('observation_month')
+            value_column = columns.get('observation_value')
+            
+            for row in reader:
+                key = tuple(row[c] if c is not None else '' for c in key_columns)
+                month = row[month_column] if month_column is not None else ''
+                value = row[value_column] if value_column is not None else ''
+                index._add(key, month, value)
+        
+        index._sort()
+        index._build_postings()
+        index.load_seconds = time.perf_counter() - start
+        return index
+    
+    def _add(self, key, month, value):
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = ([], [])
+        series[0].append(month)
+        series[1].append(value)
+        self.record_count += 1
+    
+    def _sort(self):
+        for key, (months, values) in self.series.items():
+            if any(months[i] > months[i + 1] for i in range(len(months) - 1)):
+                pairs = sorted(zip(months, values))
+                self.series[key] = ([m for m, _ in pairs], [v for _, v in pairs])
+    
+    def _build_postings(self):
+        # Per field: value -> series keys with that value, for query()
+        for key in self.series:
+            for position, value in enumerate(key):
+                self.postings[position].setdefault(value, []).append(key)
+    
+    def values_for(self, field):
+        """Sorted distinct values of one series field, e.g. all regions."""
+        position = SERIES_FIELDS.index(field)
+        return sorted({key[position] for key in self.series})
+    
+    def lookup(self, region, data_item, age, sex, adjustment_type):
+        """Return (months, values) for one series, or empty lists if absent."""
+        return self.series.get((region, data_item, age, sex, adjustment_type), ([], []))
+    
+    def query(self, filters=None, start_month=None, end_month=None):
+        """
+        Find series matching the filters, trimmed to a month range.
+
+        filters maps series fields to the values accepted for them; fields
+        left out match anything. Months are inclusive 'YYYY-MM' bounds.
+        Returns (key, months, values) tuples sorted by key, skipping series
+        with no observations in the range.
+        """
+        keys = None
+        for field, accepted in (filters or {}).items():
+            postings = self.postings[SERIES_FIELDS.index(field)]
+            matching = set()
+            for value in accepted:
+                matching.update(postings.get(value, ()))
+            keys = matching if keys is None else keys & matching
+        if keys is None:
+            keys = self.series.keys()
+        
+        results = []
+        for key in sorted(keys):
+            months, values = self.series[key]
+            start = bisect_left(months, start_month) if start_month else 0
+            end = bisect_right(months, end_month) if end_month else len(months)
+            if start < end:
+                results.append((key, months[start:end], values[start:end]))
+        return results
@@ -0,0 +1,167 @@
+"""
+Dataset plugins for the fetcher.
+
+A Dataset describes one gateway endpoint: the request parameters and the
+values to fetch for each (the grid), where the records sit in a response
+and which record fields make an observation's natural key. Every dataset
+runs through the same fetch engine in fetch_abs_data_auto.py, sharing
+its HTTP connection pool, rate limiter and checkpoint file.
+
+The labour force dataset is built in. Others are declared in
+abs_datasets.json, one object per dataset:
+
+    [{"name": "my_dataset",
+      "path": "my-dataset-statistics",
+      "params": {"region": ["AUSTRALIA", "VICTORIA"], "measure": ["..."]},
+      "response_path": "my_dataset_statistics",
+      "key_fields": ["region_description", "measure_description", "observation_month"]}]
+
+"path" is relative to GATEWAY_URL (or a full URL), and "response_path" may
+be dotted for nested responses. An optional "schema" maps fields to their
+kind ("text", "month" or "number", see abs_records.py); the key fields are
+always required. Exports (--export) write the schema's fields, so declare
+every field to export. Python code can subclass Dataset and register() it
+instead.
+"""
+
+import os
+import json
+from abs_records import RecordSchema
+
+GATEWAY_URL = "https://wovg-community.gateway.prod.api.vic.gov.au/abs/v1.0/"
+DATASETS_FILE = "abs_datasets.json"
+
+DATASETS = {}  # name -> Dataset, in registration order
+
+class Dataset:
+    """
+    One gateway dataset.
+
+    params is a list of (request parameter, values) pairs; every
+    combination of values is one request. Combination keys are prefixed
+    with the dataset name so they never clash in the shared checkpoint.
+    Records are checked against schema (by default, the key fields are
+    required and observation_month must be a month), and exports write
+    the schema's fields.
+    """
+    
+    # Run the labour force steps after saving (revision log, derived series, checks, changesets)
+    labour_force_steps = False
+    
+    def __init__(self, name, path, params, response_path, key_fields, file_stem=None, schema=None):
+        self.name = name
+        self.path = path
+        self.params = [(param, list(values)) for param, values in params]
+        self.response_path = response_path
+        self.key_fields = tuple(key_fields)
+        self.file_stem = file_stem or f"abs_{name}"
+        self.schema = schema or RecordSchema(
+            {field: "month" if field == "observation_month" else "text" for field in self.key_fields},
+            required=self.key_fields)
+    
+    @property
+    def fieldnames(self):
+        """The schema's fields, in the order exports write them."""
+        return sorted(self.schema.fields)
+    
+    @property
+    def url(self):
+        if self.path.startswith(("http://", "https://")):
+            return self.path
+        return GATEWAY_URL + self.path
+    
+    @property
+    def param_names(self):
+        return [param for param, _ in self.params]
+    
+    def param_values(self):
+        return [values for _, values in self.params]
+    
+    def combination_key(self, values):
+        return f"{self.name}:" + "_".join(values)
+    
+    def request_params(self, values):
+        return dict(zip(self.param_names, values))
+    
+    def label(self, values):
+        """Short description of a combination for the log."""
+        return "/".join(values)
+    
+    def data_file_prefix(self, shard_name=None):
+        """Data files are <prefix>_<timestamp>.csv."""
+        return f"{self.file_stem}_{shard_name}" if shard_name else f"{self.file_stem}_ALL_DATA"
+    
+    def record_key(self, record):
+        """Natural key of a record: its series and period."""
+        return tuple(record.get(field, '') for field in self.key_fields)
+    
+    def extract_records(self, data):
+        """The records in a response: at response_path, under 'data', or the response itself if it is a list."""
+        if isinstance(data, list):
+            return data
+        node = data
+        for part in self.response_path.split("."):
+            if not isinstance(node, dict) or part not in node:
+                node = None
+                break
+            node = node[part]
+        if isinstance(node, list):
+            return node
+        if isinstance(data, dict) and isinstance(data.get('data'), list):
+            return data['data']
+        return []
+
+def register(dataset):
+    DATASETS[dataset.name] = dataset
+    return dataset
+
+def load_dataset_plugins(path=None):
+    """
+    Register the datasets declared in the datasets file, if it exists.
+
+    Returns the file used, or None. Raises ValueError for an invalid file.
+    """
+    path = path or DATASETS_FILE
+    if not os.path.exists(path):
+        return None
+    
+    with open(path, 'r') as f:
+        config = json.load(f)
+    if not isinstance(config, list):
+        raise ValueError(f"{path}: expected a list of datasets")
+    
+    for position, entry in enumerate(config):
+        missing = [field for field in ("name", "path", "params", "response_path", "key_fields") if field not in entry]
+        if missing:
+            raise ValueError(f"{path}: dataset {position + 1} is missing {', '.join(missing)}")
+        params = entry["params"]
+        if not isinstance(params, dict) or not params or not all(isinstance(values, list) and values
+                                                                 for values in params.values()):
+            raise ValueError(f"{path}: '{entry['name']}' params must map each parameter to a non-empty list")
+        schema = entry.get("schema")
+        if schema is not None:
+            if not isinstance(schema, dict):
+                raise ValueError(f"{path}: '{entry['name']}' schema must map fields to kinds")
+            try:
+                schema = RecordSchema(schema, required=entry["key_fields"])
+            except ValueError as e:
+                raise ValueError(f"{path}: '{entry['name']}' {e}")
+        if entry["name"] in DATASETS:
+            raise ValueError(f"{path}: dataset name '{entry['name']}' is already taken")
+        register(Dataset(entry["name"], entry["path"],
+                         [(param, [str(value) for value in values]) for param, values in params.items()],
+                         entry["response_path"], entry["key_fields"], entry.get("file_stem"), schema))
+    return path
+
+def select_datasets(names):
+    """Datasets for a comma-separated list of names ('all' for every one). Raises ValueError for unknown names."""
+    if names.strip().lower() == "all":
+        return list(DATASETS.values())
+    selected = []
+    for name in (part.strip() for part in names.split(",")):
+        if not name:
+            continue
+        if name not in DATASETS:
+            raise ValueError(f"Unknown dataset '{name}' (available: {', '.join(DATASETS)})")
+        selected.append(DATASETS[name])
+    return selected
@@ -0,0 +1,256 @@
+"""
+Derived labour force series: month-on-month and year-on-year changes,
+rolling averages and state-versus-national ratios.
+
+Every series is laid out on one contiguous monthly axis as a row of a 2-D
+NumPy array, so each measure is a single vectorised expression over all
+series at once. Results are kept in abs_derived_series.npz between runs.
+Given the series a fetch changed, only the rows that depend on them are
+recomputed: the series themselves, plus every state ratio whose national
+series changed.
+
+NumPy is only needed for this module (pip3 install numpy). Run directly to
+rebuild the derived series from the latest dataset, optionally as CSV:
+    python3 abs_derived.py --csv abs_labour_force_DERIVED.csv
+"""
+
+import os
+import csv
+import time
+import logging
+import argparse
+from abs_io import open_data_file, atomic_write
+from abs_data_store import SeriesIndex, SERIES_FIELDS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DERIVED_FILE = "abs_derived_series.npz"
+NATIONAL_REGION = "Australia"  # Ratios are taken against this region's series
+ROLLING_WINDOW = 3  # Months in the rolling average
+
+MEASURES = ("mom_change", "yoy_change", "yoy_pct", "rolling_mean", "national_ratio")
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Derived series need the 'numpy' package (pip3 install numpy)")
+
+def month_number(month):
+    """'YYYY-MM' -> months since year 0, so consecutive months differ by 1."""
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+def month_label(number):
+    return f"{number // 12:04d}-{number % 12 + 1:02d}"
+
+def parse_values(values):
+    """Observation value strings as a float array, NaN where blank or not a number."""
+    try:
+        return np.array(values, dtype=float)
+    except ValueError:
+        parsed = np.full(len(values), np.nan)
+        for position, value in enumerate(values):
+            try:
+                parsed[position] = float(value)
+            except ValueError:
+                pass
+        return parsed
+
+def compute_measures(values, national):
+    """
+    Every measure for a block of aligned series.
+
+    values and national are (series, months) arrays; row i of national is
+    the national series matching row i of values (all NaN if there is none).
+    Gaps are NaN and any measure touching a gap is NaN.
+    """
+    measures = {name: np.full(values.shape, np.nan) for name in MEASURES}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        measures["mom_change"][:, 1:] = values[:, 1:] - values[:, :-1]
+        measures["yoy_change"][:, 12:] = values[:, 12:] - values[:, :-12]
+        measures["yoy_pct"][:, 12:] = measures["yoy_change"][:, 12:] / values[:, :-12] * 100
+        measures["national_ratio"][:] = values / national
+        
+        # Rolling mean from running sums; windows containing a gap stay NaN
+        if values.shape[1] >= ROLLING_WINDOW:
+            gaps = np.isnan(values)
+            sums = np.cumsum(np.where(gaps, 0.0, values), axis=1)
+            gap_counts = np.cumsum(gaps, axis=1)
+            sums = np.concatenate([np.zeros((len(values), 1)), sums], axis=1)
+            gap_counts = np.concatenate([np.zeros((len(values), 1)), gap_counts], axis=1)
+            window_sums = sums[:, ROLLING_WINDOW:] - sums[:, :-ROLLING_WINDOW]
+            window_gaps = gap_counts[:, ROLLING_WINDOW:] - gap_counts[:, :-ROLLING_WINDOW]
+            measures["rolling_mean"][:, ROLLING_WINDOW - 1:] = np.where(
+                window_gaps == 0, window_sums / ROLLING_WINDOW, np.nan)
+    
+    # Infinite ratios and percentages (division by zero) are as undefined as gaps
+    for measure in measures.values():
+        measure[np.isinf(measure)] = np.nan
+    return measures
+
+class DerivedSeries:
+    """
+    Aligned observation values and their derived measures.
+
+    keys[i] is the series key of row i of values and of every measure
+    array. Column j is month number start + j. source is the dataset file
+    the arrays were last brought up to date with.
+    """
+    
+    def __init__(self):
+        require_numpy()
+        self.keys = []
+        self.rows = {}
+        self.start = 0
+        self.values = np.zeros((0, 0))
+        self.measures = {name: np.zeros((0, 0)) for name in MEASURES}
+        self.source = None
+        self.update_seconds = 0.0
+    
+    @classmethod
+    def load(cls, path=DERIVED_FILE):
+        """Load saved derived series, or return an empty set if there are none."""
+        derived = cls()
+        if not os.path.exists(path):
+            return derived
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                derived.keys = [tuple(key) for key in saved["keys"].tolist()]
+                derived.start = int(saved["start"])
+                derived.values = saved["values"]
+                derived.measures = {name: saved[name] for name in MEASURES}
+                derived.source = str(saved["source"]) or None
+        except (OSError, KeyError, ValueError) as e:
+            logging.warning(f"Could not read {path}, derived series will be rebuilt: {e}")
+            return cls()
+        derived.rows = {key: row for row, key in enumerate(derived.keys)}
+        return derived
+    
+    def save(self, path=DERIVED_FILE):
+        """Write the arrays atomically (temporary file, synced, then renamed)."""
+        keys = np.array(self.keys, dtype=str).reshape(len(self.keys), len(SERIES_FIELDS))
+        with atomic_write(path, binary=True) as f:
+            np.savez(f, keys=keys, start=self.start, values=self.values,
+                     source=self.source or "", **self.measures)
+    
+    def update(self, index, changed=None):
+        """
+        Bring the derived series up to date with a SeriesIndex.
+
+        changed is the set of series keys whose observations changed since
+        the last update, or None to recompute everything. Returns the
+        number of series recomputed.
+        """
+        start_time = time.perf_counter()
+        keys = sorted(key for key, (months, _) in index.series.items() if months and months[0])
+        if not keys:
+            self.__init__()
+            return 0
+        start = min(month_number(index.series[key][0][0]) for key in keys)
+        end = max(month_number(index.series[key][0][-1]) for key in keys) + 1
+        
+        old_end = self.start + self.values.shape[1]
+        if changed is None or not self.keys or start > self.start or end < old_end:
+            # No usable previous state, or the axis shrank (the dataset was replaced)
+            affected = keys
+            self.rows = {}
+            self._realign(keys, start, end)
+        else:
+            national_changed = {key[1:] for key in changed if key[0] == NATIONAL_REGION}
+            affected = [key for key in keys
+                        if key in changed or key not in self.rows or key[1:] in national_changed]
+            self._realign(keys, start, end)
+        self.keys = keys
+        self.rows = {key: row for row, key in enumerate(keys)}
+        
+        if affected:
+            rows = np.array([self.rows[key] for key in affected])
+            for row, key in zip(rows, affected):
+                months, values = index.series[key]
+                columns = np.array([month_number(month) for month in months]) - start
+                self.values[row] = np.nan
+                self.values[row, columns] = parse_values(values)
+            
+            national_rows = [self.rows.get((NATIONAL_REGION,) + key[1:]) for key in affected]
+            national = np.full((len(affected), self.values.shape[1]), np.nan)
+            present = [position for position, row in enumerate(national_rows) if row is not None]
+            if present:
+                national[present] = self.values[[national_rows[position] for position in present]]
+            
+            for name, block in compute_measures(self.values[rows], national).items():
+                self.measures[name][rows] = block
+        
+        self.update_seconds = time.perf_counter() - start_time
+        return len(affected)
+    
+    def _realign(self, keys, start, end):
+        """Move existing rows for keys onto the axis [start, end); everything else becomes NaN."""
+        shape = (len(keys), end - start)
+        old_rows = [self.rows[key] for key in keys if key in self.rows]
+        new_rows = [row for row, key in enumerate(keys) if key in self.rows]
+        offset = self.start - start
+        width = self.values.shape[1]
+        
+        def moved(old):
+            new = np.full(shape, np.nan)
+            if old_rows:
+                new[new_rows, offset:offset + width] = old[old_rows]
+            return new
+        
+        self.values = moved(self.values)
+        self.measures = {name: moved(array) for name, array in self.measures.items()}
+        self.start = start
+    
+    def write_csv(self, path):
+        """Write one row per series and month that has an observation, with every measure."""
+        fieldnames = list(SERIES_FIELDS) + ["observation_month", "observation_value"] + list(MEASURES)
+        with open_data_file(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            rows, columns = np.nonzero(~np.isnan(self.values))
+            for row, column in zip(rows.tolist(), columns.tolist()):
+                writer.writerow(list(self.keys[row]) + [month_label(self.start + column), format_measure(self.values[row, column])]
+                                + [format_measure(self.measures[name][row, column]) for name in MEASURES])
+
+def format_measure(value):
+    return "" if np.isnan(value) else f"{value:.6g}"
+
+def update_derived_file(load_index, changed=None, previous_source=None, source=None, path=DERIVED_FILE):
+    """
+    Update the saved derived series for a dataset.
+
+    load_index is a callable returning the dataset's SeriesIndex; it isn't
+    called when nothing changed. changed is only trusted when the saved
+    series were last updated from previous_source (the dataset the changes
+    were merged into); otherwise everything is recomputed. Returns the
+    DerivedSeries and the number of series recomputed.
+    """
+    derived = DerivedSeries.load(path)
+    if derived.source is None or derived.source != previous_source:
+        changed = None
+    recomputed = derived.update(load_index(), changed) if changed is None or changed else 0
+    derived.source = source
+    derived.save(path)
+    return derived, recomputed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Rebuild the derived labour force series')
+    parser.add_argument('--dataset', help='_FIXED.csv file to derive from (default: the most recent one)')
+    parser.add_argument('--csv', help='Also write the derived series to this CSV file')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    require_numpy()
+    
+    index = SeriesIndex.load(args.dataset)
+    if index.source_file is None:
+        logging.error("No _FIXED.csv dataset found - fetch data first")
+        raise SystemExit(1)
+    
+    derived, recomputed = update_derived_file(lambda: index, source=index.source_file)
+    logging.info(f"Derived {len(MEASURES)} measures for {recomputed:,} series "
+                 f"in {derived.update_seconds * 1000:.0f} ms -> {DERIVED_FILE}")
+    if args.csv:
+        derived.write_csv(args.csv)
+        logging.info(f"Derived series written to {args.csv}")
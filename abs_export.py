@@ -0,0 +1,299 @@
+"""
+Export the dataset to several formats in one pass.
+
+Records are read once and handed to every sink in turn: CSV, JSON Lines,
+Parquet and per-region CSV extracts. Each sink holds at most
+EXPORT_BUFFER_RECORDS records before writing them out, and writes to a
+temporary file that is renamed over the real one when the export
+finishes, so readers never see a half-written file. Output names are
+stable (abs_exports/abs_labour_force.jsonl, ...), so each export replaces
+the previous one.
+
+The fetcher exports its merged records after every run when given
+--export. Run directly to export an existing dataset:
+    python3 abs_export.py --formats csv,jsonl,parquet,regions
+
+Parquet needs the 'pyarrow' package (pip3 install pyarrow).
+"""
+
+import os
+import re
+import csv
+import json
+import time
+import logging
+import argparse
+from abc import ABC, abstractmethod
+from abs_io import open_data_file, compressed_name, replace_durably, COMPRESSION_SUFFIXES
+from abs_data_store import find_latest_dataset
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_DIR = "abs_exports"
+EXPORT_PREFIX = "abs_labour_force"
+EXPORT_BUFFER_RECORDS = 10000  # Records each sink holds before writing them out
+
+class Sink(ABC):
+    """
+    One export output.
+
+    Records passed to write() are buffered and written in batches to a
+    temporary file; close() renames it into place and abort() removes it.
+    """
+    
+    def __init__(self, path, fieldnames, buffer_records=EXPORT_BUFFER_RECORDS):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.buffer_records = buffer_records
+        self.buffer = []
+        self.record_count = 0
+    
+    def write(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.buffer_records:
+            self.flush()
+    
+    def flush(self):
+        if self.buffer:
+            self.write_batch(self.buffer)
+            self.record_count += len(self.buffer)
+            self.buffer = []
+    
+    def close(self):
+        """Write what is left and move the output into place. Returns the files written."""
+        self.flush()
+        return self.finish()
+    
+    @abstractmethod
+    def write_batch(self, records):
+        """Write a batch of records to the temporary output."""
+    
+    @abstractmethod
+    def finish(self):
+        """Move the temporary output into place. Returns the files written."""
+    
+    @abstractmethod
+    def abort(self):
+        """Remove the temporary output."""
+
+class TextSink(Sink):
+    """Base for sinks writing one (optionally compressed) text file."""
+    
+    def __init__(self, path, fieldnames, compression="none", level=None, buffer_records=EXPORT_BUFFER_RECORDS):
+        super().__init__(compressed_name(path, compression), fieldnames, buffer_records)
+        self.tmp_path = self.path + ".tmp"
+        self.file = open_data_file(self.tmp_path, 'w', compression=compression, level=level, newline='')
+        self.start()
+    
+    def start(self):
+        pass
+    
+    def finish(self):
+        self.file.close()
+        replace_durably(self.tmp_path, self.path)
+        return [self.path]
+    
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+class CsvSink(TextSink):
+    suffix = ".csv"
+    
+    def start(self):
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
+        self.writer.writeheader()
+    
+    def write_batch(self, records):
+        self.writer.writerows(records)
+
+class JsonLinesSink(TextSink):
+    suffix = ".jsonl"
+    
+    def write_batch(self, records):
+        fieldnames = self.fieldnames
+        self.file.write("".join(json.dumps({field: record.get(field, '') for field in fieldnames}) + "\n"
+                                for record in records))
+
+class ParquetSink(Sink):
+    """
+    Parquet file with one row group per buffered batch.
+
+    observation_value is stored as a float column (null when blank or not
+    a number); every other field is a string column.
+    """
+    
+    suffix = ".parquet"
+    
+    def __init__(self, path, fieldnames, compression="none", level=None, buffer_records=EXPORT_BUFFER_RECORDS):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs the 'pyarrow' package (pip3 install pyarrow)")
+        # Parquet compresses internally, so the name never gets a .gz/.zst suffix
+        super().__init__(path, fieldnames, buffer_records)
+        self.tmp_path = self.path + ".tmp"
+        self.schema = pyarrow.schema([(field, pyarrow.float64() if field == 'observation_value' else pyarrow.string())
+                                      for field in fieldnames])
+        self.writer = pyarrow.parquet.ParquetWriter(self.tmp_path, self.schema,
+                                                    compression="zstd" if compression == "zstd" else "snappy")
+    
+    def write_batch(self, records):
+        columns = {}
+        for field in self.fieldnames:
+            if field == 'observation_value':
+                columns[field] = [to_float(record.get(field, '')) for record in records]
+            else:
+                columns[field] = [record.get(field, '') for record in records]
+        self.writer.write_table(pyarrow.Table.from_pydict(columns, schema=self.schema))
+    
+    def finish(self):
+        self.writer.close()
+        replace_durably(self.tmp_path, self.path)
+        return [self.path]
+    
+    def abort(self):
+        self.writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+class RegionCsvSink(Sink):
+    """One CSV extract per region (abs_labour_force_Victoria.csv, ...), opened as regions appear."""
+    
+    suffix = ".csv"
+    
+    def __init__(self, path, fieldnames, compression="none", level=None, buffer_records=EXPORT_BUFFER_RECORDS):
+        super().__init__(path, fieldnames, buffer_records)
+        self.compression = compression
+        self.level = level
+        self.regions = {}
+    
+    def region_sink(self, region):
+        sink = self.regions.get(region)
+        if sink is None:
+            base = self.path[:-len(self.suffix)]
+            name = re.sub(r"[^A-Za-z0-9]+", "_", region).strip("_") or "unknown"
+            sink = self.regions[region] = CsvSink(f"{base}_{name}{self.suffix}", self.fieldnames,
+                                                  self.compression, self.level)
+        return sink
+    
+    def write_batch(self, records):
+        by_region = {}
+        for record in records:
+            by_region.setdefault(record.get('region_description', ''), []).append(record)
+        # The batch is already bounded, so it goes straight to each region's file
+        for region, region_records in by_region.items():
+            sink = self.region_sink(region)
+            sink.write_batch(region_records)
+            sink.record_count += len(region_records)
+    
+    def finish(self):
+        written = []
+        for region in sorted(self.regions):
+            written.extend(self.regions[region].finish())
+        return written
+    
+    def abort(self):
+        for sink in self.regions.values():
+            sink.abort()
+
+SINK_TYPES = {
+    "csv": CsvSink,
+    "jsonl": JsonLinesSink,
+    "parquet": ParquetSink,
+    "regions": RegionCsvSink
+}
+
+def parse_formats(text):
+    """'csv,jsonl' -> ('csv', 'jsonl'). Raises ValueError for an unknown format."""
+    formats = tuple(part.strip().lower() for part in text.split(",") if part.strip())
+    unknown = [name for name in formats if name not in SINK_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)} (choose from {', '.join(SINK_TYPES)})")
+    return formats
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def export_records(records, fieldnames, formats, output_dir=EXPORT_DIR, compression="none", level=None,
+                   buffer_records=EXPORT_BUFFER_RECORDS, extra_sinks=None, prefix=EXPORT_PREFIX):
+    """
+    Stream records once into a sink per format, named <prefix>.<format>.
+
+    extra_sinks ({name: Sink}) are fed from the same pass, e.g. the dataset
+    file itself. If anything fails, every sink's temporary files are
+    removed and the previous exports are left in place. Returns
+    {name: [files written]}.
+    """
+    sinks = dict(extra_sinks or {})
+    try:
+        if formats:
+            os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, prefix)
+        for name in formats:
+            sink_type = SINK_TYPES[name]
+            sinks[name] = sink_type(base + sink_type.suffix, fieldnames, compression, level, buffer_records)
+        sink_list = list(sinks.values())
+        for record in records:
+            for sink in sink_list:
+                sink.write(record)
+        # Flush everything before renaming anything, so a late failure leaves no mix of old and new files
+        for sink in sink_list:
+            sink.flush()
+    except BaseException:
+        for sink in sinks.values():
+            try:
+                sink.abort()
+            except Exception as e:
+                logging.warning(f"Could not clean up {sink.path}: {e}")
+        raise
+    return {name: sink.close() for name, sink in sinks.items()}
+
+def iter_dataset(path):
+    """(fieldnames, record iterator) for a _FIXED.csv file, read as a stream."""
+    f = open_data_file(path, 'r', newline='')
+    reader = csv.DictReader(f)
+    fieldnames = reader.fieldnames or []
+    
+    def records():
+        with f:
+            for record in reader:
+                yield record
+    return fieldnames, records()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export the ABS dataset to several formats in one pass')
+    parser.add_argument('--dataset', help='_FIXED.csv file to export (default: the most recent one)')
+    parser.add_argument('--formats', default="csv,jsonl",
+                        help=f'Comma-separated formats: {", ".join(SINK_TYPES)} (default: csv,jsonl)')
+    parser.add_argument('--output-dir', default=EXPORT_DIR, help=f'Output folder (default: {EXPORT_DIR})')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES), default="none",
+                        help='Compress the CSV and JSON Lines outputs (default: none)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        formats = parse_formats(args.formats)
+    except ValueError as e:
+        parser.error(str(e))
+    dataset = args.dataset or find_latest_dataset()
+    if dataset is None:
+        logging.error("No _FIXED.csv dataset found - fetch data first")
+        raise SystemExit(1)
+    
+    start = time.perf_counter()
+    fieldnames, records = iter_dataset(dataset)
+    try:
+        written = export_records(records, fieldnames, formats, args.output_dir, args.compress)
+    except RuntimeError as e:
+        logging.error(f"❌ {e}")
+        raise SystemExit(1)
+    logging.info(f"Exported {dataset} in {time.perf_counter() - start:.2f}s:")
+    for name, files in written.items():
+        logging.info(f"   {name}: {', '.join(files)}")
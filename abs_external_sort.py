@@ -0,0 +1,111 @@
+"""
+External merge sort for record streams that don't fit in memory.
+
+Items are collected in a buffer capped at an estimated number of bytes.
+When the buffer fills it is sorted and spilled to a run file on disk (one
+JSON value per line). merged() then k-way merges the runs with
+heapq.merge and yields every item in key order. At most MERGE_FAN_IN run
+files are open at once; with more runs than that, they are merged in
+passes first, so memory stays bounded however much data goes in.
+"""
+
+import os
+import sys
+import json
+import heapq
+import shutil
+import tempfile
+
+MERGE_FAN_IN = 32  # Run files merged at once
+RUN_BUFFER_BYTES = 64 * 1024  # Read buffer per open run file
+
+def estimated_size(value):
+    """Rough in-memory size of a JSON-like value (dicts, lists, strings, numbers)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimated_size(item) for item in value.values())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimated_size(item) for item in value)
+    return size
+
+class ExternalSorter:
+    """
+    Sorts items by key(item) using at most about memory_bytes for buffered items.
+
+    Items must survive a JSON round trip (lists come back as lists, so key
+    should not depend on the difference between lists and tuples). Use as
+    a context manager, or call cleanup(), to remove the run files.
+    """
+    
+    def __init__(self, key, memory_bytes, spill_dir=None, fan_in=MERGE_FAN_IN):
+        self.key = key
+        # Read buffers for a full merge come out of the same budget
+        self.buffer_limit = max(memory_bytes - fan_in * RUN_BUFFER_BYTES, memory_bytes // 4)
+        self.fan_in = max(fan_in, 2)
+        self.spill_dir = tempfile.mkdtemp(prefix="abs_sort_", dir=spill_dir)
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.runs = []
+        self.run_count = 0
+        self.item_count = 0
+        self.spilled_bytes = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cleanup()
+    
+    def add(self, item):
+        self.buffer.append(item)
+        self.buffer_bytes += estimated_size(item)
+        self.item_count += 1
+        if self.buffer_bytes >= self.buffer_limit:
+            self.spill()
+    
+    def spill(self):
+        """Sort the buffer and write it out as a new run."""
+        if not self.buffer:
+            return
+        self.buffer.sort(key=self.key)
+        self.runs.append(self.write_run(self.buffer))
+        self.buffer = []
+        self.buffer_bytes = 0
+    
+    def write_run(self, items):
+        path = os.path.join(self.spill_dir, f"run{self.run_count:06d}.jsonl")
+        self.run_count += 1
+        with open(path, 'w', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps(item, separators=(",", ":")) + "\n")
+            self.spilled_bytes += f.tell()
+        return path
+    
+    def read_run(self, path):
+        with open(path, 'r', encoding='utf-8', buffering=RUN_BUFFER_BYTES) as f:
+            for line in f:
+                yield json.loads(line)
+    
+    def merged(self):
+        """Yield every item added so far, in key order (stable for equal keys within a run)."""
+        if not self.runs:
+            # Everything fitted in memory
+            self.buffer.sort(key=self.key)
+            for item in self.buffer:
+                yield item
+            return
+        
+        self.spill()
+        # Merge in passes until one pass can take every remaining run
+        while len(self.runs) > self.fan_in:
+            batch, self.runs = self.runs[:self.fan_in], self.runs[self.fan_in:]
+            self.runs.append(self.write_run(heapq.merge(*[self.read_run(path) for path in batch], key=self.key)))
+            for path in batch:
+                os.remove(path)
+        for item in heapq.merge(*[self.read_run(path) for path in self.runs], key=self.key):
+            yield item
+    
+    def cleanup(self):
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self.runs = []
+        self.buffer = []
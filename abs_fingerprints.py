@@ -0,0 +1,236 @@
+"""
+Run-to-run changesets from per-series fingerprints.
+
+Next to each dataset the fetcher writes a fingerprint file
+(..._FIXED_fingerprints.json) holding, for every series, a fingerprint of
+the whole series and one per month block (calendar year). Only the
+fingerprints are kept, so the file stays small next to the dataset.
+
+A diff compares series fingerprints first and block fingerprints only for
+series that differ, then reads values only for blocks that differ, from
+the two datasets' series indexes. Those are loaded from the fingerprints'
+source files the first time a value is needed, unless the caller already
+has them (the fetcher passes its in-memory index and the previous values
+of the series it changed). The result is a compact changeset: new and
+vanished series, new months, revised values and removed months.
+
+    python3 abs_fingerprints.py OLD_FIXED.csv NEW_FIXED.csv --output changes.json
+"""
+
+import os
+import json
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from abs_io import open_data_file, atomic_write, strip_compression_suffix, compression_for_path, compressed_name
+from abs_data_store import SeriesIndex, SERIES_FIELDS
+
+FINGERPRINT_SUFFIX = "_fingerprints.json"
+DIGEST_SIZE = 8  # Bytes per fingerprint
+
+def fingerprint_file(dataset_file):
+    """The fingerprint file for a dataset, in the dataset's compression."""
+    base = strip_compression_suffix(dataset_file)
+    if base.endswith(".csv"):
+        base = base[:-len(".csv")]
+    return compressed_name(base + FINGERPRINT_SUFFIX, compression_for_path(dataset_file))
+
+def block_of(month):
+    """Month block a 'YYYY-MM' month belongs to (its year)."""
+    return month[:4]
+
+def digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=DIGEST_SIZE).hexdigest()
+
+def fingerprint_series(months, values):
+    """
+    Fingerprints for one month-sorted series.
+
+    Returns (series fingerprint, {block: block fingerprint}). The series
+    fingerprint is taken over the block fingerprints.
+    """
+    blocks = {}
+    for month, value in zip(months, values):
+        block = blocks.get(block_of(month))
+        if block is None:
+            block = blocks[block_of(month)] = []
+        block.append(f"{month}={value}")
+    
+    fingerprinted = {name: digest("\n".join(block)) for name, block in blocks.items()}
+    series_fingerprint = digest("\n".join(f"{name}:{fingerprinted[name]}" for name in sorted(fingerprinted)))
+    return series_fingerprint, fingerprinted
+
+def block_values(index, key, block):
+    """{month: value} for one block of one series in a SeriesIndex ({} if it has none)."""
+    months, values = index.series.get(key, ((), ()))
+    return {month: value for month, value in zip(months, values) if block_of(month) == block}
+
+class Fingerprints:
+    """Fingerprints for every series of one dataset."""
+    
+    def __init__(self, source=None):
+        self.source = source
+        self.created = datetime.now().isoformat()
+        self.series = {}
+    
+    @classmethod
+    def build(cls, index, source=None, previous=None, changed=None):
+        """
+        Fingerprint a SeriesIndex.
+
+        With previous fingerprints and the set of series keys changed since
+        they were taken, only the changed series are hashed again; every
+        other series keeps its previous entry.
+        """
+        fingerprints = cls(source)
+        reuse = previous is not None and changed is not None
+        for key, (months, values) in index.series.items():
+            if reuse and key not in changed and key in previous.series:
+                fingerprints.series[key] = previous.series[key]
+            else:
+                fingerprints.series[key] = fingerprint_series(months, values)
+        return fingerprints
+    
+    @classmethod
+    def load(cls, path):
+        """Load a fingerprint file, or return None if it is missing or unreadable."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open_data_file(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read fingerprints from {path}: {e}")
+            return None
+        fingerprints = cls(saved.get("source"))
+        fingerprints.created = saved.get("created")
+        for entry in saved.get("series", []):
+            # Older files kept [fingerprint, {month: value}] per block
+            blocks = {name: block[0] if isinstance(block, list) else block for name, block in entry["blocks"].items()}
+            fingerprints.series[tuple(entry["key"])] = (entry["fingerprint"], blocks)
+        return fingerprints
+    
+    def save(self, path, level=None):
+        """Write the fingerprints atomically (temporary file, synced, then renamed)."""
+        document = {
+            "source": self.source,
+            "created": self.created,
+            "fields": list(SERIES_FIELDS),
+            "series": [{"key": list(key), "fingerprint": fingerprint, "blocks": blocks}
+                       for key, (fingerprint, blocks) in sorted(self.series.items())]
+        }
+        with atomic_write(path, level=level) as f:
+            json.dump(document, f, separators=(",", ":"))
+
+def diff(old, new, old_index=None, new_index=None):
+    """
+    Changeset between two Fingerprints.
+
+    Series with equal fingerprints are skipped outright, and within a
+    changed series only blocks with different fingerprints are compared.
+    Their values come from old_index and new_index (SeriesIndex objects
+    holding at least the changed series). An index that isn't given is
+    loaded from the fingerprints' source file the first time it is needed;
+    OSError is raised if that file can't be read.
+    """
+    indexes = {"old": old_index, "new": new_index}
+    
+    def index_for(side, fingerprints):
+        if indexes[side] is None:
+            if not fingerprints.source or not os.path.exists(fingerprints.source):
+                raise FileNotFoundError(f"Dataset {fingerprints.source} is needed for the changed values but is missing")
+            indexes[side] = SeriesIndex.load(fingerprints.source)
+        return indexes[side]
+    
+    changes = []
+    new_months = revised_values = removed_months = 0
+    unchanged = 0
+    
+    for key, (fingerprint, blocks) in sorted(new.series.items()):
+        previous = old.series.get(key)
+        if previous is None:
+            continue
+        if previous[0] == fingerprint:
+            unchanged += 1
+            continue
+        
+        old_blocks = previous[1]
+        change = {"series": list(key), "new_months": {}, "revised": {}, "removed_months": []}
+        for name in sorted(set(blocks) | set(old_blocks)):
+            if blocks.get(name) == old_blocks.get(name):
+                continue
+            block = block_values(index_for("new", new), key, name) if name in blocks else {}
+            old_block = block_values(index_for("old", old), key, name) if name in old_blocks else {}
+            for month, value in block.items():
+                if month not in old_block:
+                    change["new_months"][month] = value
+                elif old_block[month] != value:
+                    change["revised"][month] = [old_block[month], value]
+            change["removed_months"].extend(sorted(month for month in old_block if month not in block))
+        new_months += len(change["new_months"])
+        revised_values += len(change["revised"])
+        removed_months += len(change["removed_months"])
+        changes.append(change)
+    
+    new_series = sorted(key for key in new.series if key not in old.series)
+    vanished_series = sorted(key for key in old.series if key not in new.series)
+    return {
+        "old": old.source,
+        "new": new.source,
+        "created": datetime.now().isoformat(),
+        "fields": list(SERIES_FIELDS),
+        "summary": {
+            "series_unchanged": unchanged,
+            "series_changed": len(changes),
+            "series_new": len(new_series),
+            "series_vanished": len(vanished_series),
+            "new_months": new_months,
+            "revised_values": revised_values,
+            "removed_months": removed_months
+        },
+        "new_series": [list(key) for key in new_series],
+        "vanished_series": [list(key) for key in vanished_series],
+        "changes": changes
+    }
+
+def save_changeset(changeset, path):
+    with atomic_write(path) as f:
+        json.dump(changeset, f, indent=1)
+
+def fingerprints_for(path):
+    """Fingerprints for a dataset or fingerprint file, building them if the dataset has none yet."""
+    if strip_compression_suffix(path).endswith(FINGERPRINT_SUFFIX):
+        return Fingerprints.load(path)
+    existing = Fingerprints.load(fingerprint_file(path))
+    if existing is not None:
+        return existing
+    logging.info(f"No fingerprints for {path} - building them")
+    fingerprints = Fingerprints.build(SeriesIndex.load(path), source=path)
+    fingerprints.save(fingerprint_file(path))
+    return fingerprints
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='List what changed between two ABS datasets')
+    parser.add_argument('old', help='Older _FIXED.csv file (or its fingerprint file)')
+    parser.add_argument('new', help='Newer _FIXED.csv file (or its fingerprint file)')
+    parser.add_argument('--output', default='abs_changeset.json', help='Changeset file (default: abs_changeset.json)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    old, new = fingerprints_for(args.old), fingerprints_for(args.new)
+    if old is None or new is None:
+        logging.error("Could not read fingerprints for both files")
+        raise SystemExit(1)
+    
+    try:
+        changeset = diff(old, new)
+    except OSError as e:
+        logging.error(f"Could not read the changed values: {e}")
+        raise SystemExit(1)
+    save_changeset(changeset, args.output)
+    summary = changeset["summary"]
+    logging.info(f"{summary['series_changed']} series changed ({summary['new_months']} new months, "
+                 f"{summary['revised_values']} revised values, {summary['removed_months']} removed months), "
+                 f"{summary['series_new']} new, {summary['series_vanished']} vanished, "
+                 f"{summary['series_unchanged']} unchanged -> {args.output}")
@@ -0,0 +1,219 @@
+"""
+Shared file I/O helpers for the ABS data scripts.
+Transparent gzip/zstd compression for the CSV outputs and the checkpoint file,
+and atomic writes so a crash never leaves a torn file behind.
+
+Run directly to benchmark the codecs against an existing data file:
+    python3 abs_io.py abs_labour_force_ALL_DATA_20251114_101500_FIXED.csv
+"""
+
+import gzip
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compression name -> file suffix appended to the plain file name
+COMPRESSION_SUFFIXES = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst"
+}
+
+DEFAULT_COMPRESSION_LEVELS = {
+    "gzip": 6,
+    "zstd": 3
+}
+
+def compression_for_path(path):
+    """Work out the compression of a file from its suffix."""
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if suffix and path.endswith(suffix):
+            return compression
+    return "none"
+
+def strip_compression_suffix(path):
+    """Return the file name without any compression suffix."""
+    suffix = COMPRESSION_SUFFIXES[compression_for_path(path)]
+    return path[:-len(suffix)] if suffix else path
+
+def compressed_name(path, compression):
+    """Return the file name with the suffix for the given compression."""
+    return strip_compression_suffix(path) + COMPRESSION_SUFFIXES[compression]
+
+def find_existing_variant(path):
+    """Find an existing copy of a file in any compression, newest first."""
+    base = strip_compression_suffix(path)
+    candidates = [base + suffix for suffix in COMPRESSION_SUFFIXES.values()]
+    existing = [c for c in candidates if os.path.exists(c)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+def open_data_file(path, mode='r', compression=None, level=None, encoding='utf-8', newline=None):
+    """
+    Open a text file, transparently (de)compressing it as a stream.
+
+    The compression is taken from the file suffix unless given explicitly.
+    """
+    if mode not in ('r', 'w', 'a'):
+        raise ValueError(f"Unsupported mode: {mode}")
+    if compression is None:
+        compression = compression_for_path(path)
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    if level is None:
+        level = DEFAULT_COMPRESSION_LEVELS.get(compression)
+
+    if compression == "gzip":
+        if mode == 'r':
+            return gzip.open(path, 'rt', encoding=encoding, newline=newline)
+        return gzip.open(path, mode + 't', compresslevel=level, encoding=encoding, newline=newline)
+
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression needs the 'zstandard' package (pip3 install zstandard)")
+        if mode == 'r':
+            return zstandard.open(path, 'rt', encoding=encoding, newline=newline)
+        cctx = zstandard.ZstdCompressor(level=level)
+        return zstandard.open(path, mode + 't', cctx=cctx, encoding=encoding, newline=newline)
+
+    return open(path, mode, encoding=encoding, newline=newline)
+
+def fsync_file(path):
+    """Flush a closed file's contents to disk."""
+    # Windows won't fsync a read-only handle
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def fsync_dir(path):
+    """Flush a folder entry to disk, so a rename into it survives a crash. Not possible (or needed) on Windows."""
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def replace_durably(tmp_path, path):
+    """Sync a closed temporary file to disk, rename it over path and sync the folder."""
+    fsync_file(tmp_path)
+    os.replace(tmp_path, path)
+    fsync_dir(path)
+
+@contextlib.contextmanager
+def atomic_write(path, compression=None, level=None, encoding='utf-8', newline=None, binary=False):
+    """
+    Open a text (or, with binary=True, an uncompressed binary) file for
+    writing so it is replaced all at once.
+
+    Writes go to <path>.tmp. When the block ends it is closed, synced to
+    disk and renamed over path, and the folder is synced so the rename is
+    durable too. Readers and a crash at any point see either the old file
+    or the complete new one. If the block raises, the temporary file is
+    removed and path is left as it was.
+    """
+    if compression is None:
+        compression = compression_for_path(path)
+    tmp_path = path + ".tmp"
+    if binary:
+        if compression != "none":
+            raise ValueError("Binary atomic writes can't be compressed")
+        f = open(tmp_path, 'wb')
+    else:
+        f = open_data_file(tmp_path, 'w', compression=compression, level=level, encoding=encoding, newline=newline)
+    try:
+        yield f
+        f.close()
+        replace_durably(tmp_path, path)
+    except BaseException:
+        f.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def benchmark_compression(path, codecs=None, throughput_mbps=None):
+    """
+    Time writing and reading a file with each codec and level.
+
+    Returns a list of result dicts. When throughput_mbps is given, the
+    estimated transfer time over a network mount of that speed is included.
+    """
+    if codecs is None:
+        codecs = [("none", None)]
+        codecs += [("gzip", level) for level in (1, 6, 9)]
+        if zstandard is not None:
+            codecs += [("zstd", level) for level in (1, 3, 10, 19)]
+
+    with open_data_file(path, 'r', newline='') as f:
+        content = f.read()
+
+    results = []
+    tmp_base = strip_compression_suffix(path) + ".bench"
+    for compression, level in codecs:
+        tmp_path = compressed_name(tmp_base, compression)
+        try:
+            start = time.perf_counter()
+            with open_data_file(tmp_path, 'w', compression=compression, level=level, newline='') as f:
+                f.write(content)
+            write_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with open_data_file(tmp_path, 'r', compression=compression, newline='') as f:
+                f.read()
+            read_seconds = time.perf_counter() - start
+
+            size = os.path.getsize(tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        result = {
+            "compression": compression,
+            "level": level,
+            "bytes": size,
+            "write_seconds": write_seconds,
+            "read_seconds": read_seconds
+        }
+        if throughput_mbps:
+            result["transfer_seconds"] = size * 8 / (throughput_mbps * 1_000_000)
+        results.append(result)
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark output compression codecs')
+    parser.add_argument('file', help='CSV or checkpoint file to benchmark with')
+    parser.add_argument('--throughput-mbps', type=float,
+                        help='Network storage throughput, to estimate transfer time')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"File not found: {args.file}")
+        sys.exit(1)
+    if zstandard is None:
+        print("zstandard not installed - skipping zstd (pip3 install zstandard)")
+
+    results = benchmark_compression(args.file, throughput_mbps=args.throughput_mbps)
+    plain_size = results[0]["bytes"]
+
+    print(f"{'codec':<6} {'level':>5} {'size (MB)':>10} {'ratio':>6} {'write s':>8} {'read s':>7}"
+          + (f" {'total s':>8}" if args.throughput_mbps else ""))
+    for r in results:
+        line = (f"{r['compression']:<6} {str(r['level'] or '-'):>5} {r['bytes'] / 1_000_000:>10.2f} "
+                f"{plain_size / max(r['bytes'], 1):>6.1f} {r['write_seconds']:>8.3f} {r['read_seconds']:>7.3f}")
+        if args.throughput_mbps:
+            # A run writes the file once and reads it back on the next run
+            total = r['write_seconds'] + r['read_seconds'] + 2 * r['transfer_seconds']
+            line += f" {total:>8.3f}"
+        print(line)
@@ -0,0 +1,137 @@
+"""
+Counters, gauges and histograms for the ABS fetch job.
+Written as a Prometheus textfile (or OpenMetrics file) so node-exporter's
+textfile collector can scrape the scheduled job.
+"""
+
+import math
+from abs_io import atomic_write
+
+# Default histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+def format_value(value):
+    """Format a sample value the way the exposition format expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+               for name, value in labels]
+    pairs = ",".join(f'{name}="{value}"' for name, value in escaped)
+    return "{" + pairs + "}"
+
+class Counter:
+    """A monotonically increasing count, optionally split by labels."""
+    
+    type_name = "counter"
+    
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+    
+    def inc(self, amount=1, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+    
+    def value(self, **labels):
+        return self.values.get(tuple((name, labels[name]) for name in self.labelnames), 0)
+    
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, key, value
+
+class Gauge(Counter):
+    """A value that can be set to anything, e.g. a timestamp."""
+    
+    type_name = "gauge"
+    
+    def set(self, value, **labels):
+        self.values[tuple((name, labels[name]) for name in self.labelnames)] = value
+
+class Histogram:
+    """Observations counted into cumulative buckets, with their sum and count."""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+        self.sum += value
+        self.count += 1
+    
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield self.name + "_bucket", (("le", format_value(bound)),), cumulative
+        yield self.name + "_sum", (), self.sum
+        yield self.name + "_count", (), self.count
+
+class MetricsRegistry:
+    """The set of metrics for one process, rendered together."""
+    
+    def __init__(self):
+        self.metrics = []
+    
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+    
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+    
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, buckets))
+    
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+    
+    def render(self, openmetrics=False):
+        """
+        Render every metric in the Prometheus text format.
+
+        With openmetrics=True the OpenMetrics flavour is used instead: counter
+        families are named without the _total suffix and the file ends in # EOF.
+        """
+        lines = []
+        for metric in self.metrics:
+            family = metric.name
+            if openmetrics and metric.type_name == "counter" and family.endswith("_total"):
+                family = family[:-len("_total")]
+            lines.append(f"# HELP {family} {metric.help_text}")
+            lines.append(f"# TYPE {family} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+    
+    def write_textfile(self, path, openmetrics=False):
+        """
+        Write the metrics to path atomically.
+
+        The file is written under a temporary name in the same directory and
+        renamed over the target, so a scrape never sees a half-written file.
+        """
+        with atomic_write(path, compression="none") as f:
+            f.write(self.render(openmetrics))
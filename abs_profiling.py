@@ -0,0 +1,119 @@
+"""
+Per-phase timing and optional CPU/memory profiling for a fetch run.
+
+Phases are always timed (two clock reads each). With profiling enabled each
+phase also gets its own cProfile profile and a tracemalloc allocation report,
+written out by write_reports():
+
+    abs_profile_YYYYMMDD_HHMMSS/fetch_loop.prof             (open with snakeviz or pstats)
+    abs_profile_YYYYMMDD_HHMMSS/fetch_loop_allocations.txt
+"""
+
+import os
+import time
+import pstats
+import cProfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+PROFILE_DIR_PREFIX = "abs_profile_"
+TOP_ALLOCATIONS = 25  # Lines in each allocation report
+TRACEMALLOC_FRAMES = 10  # Stack depth recorded per allocation
+
+def take_snapshot():
+    """A tracemalloc snapshot without tracemalloc's own bookkeeping."""
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+class PhaseProfiler:
+    """
+    Times named phases and, when enabled, profiles them.
+
+    Phases may nest (merge runs inside the fetch loop). Profiles are
+    exclusive: while an inner phase runs, the outer phase's profiler is
+    paused. A phase entered many times accumulates into one profile; its
+    allocation report covers the first time it ran, since snapshotting a
+    large heap on every request would dominate the run.
+    """
+    
+    def __init__(self, enabled=False, output_dir=None):
+        self.enabled = enabled
+        self.output_dir = output_dir or PROFILE_DIR_PREFIX + datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.timings = {}
+        self.calls = {}
+        self.profiles = {}
+        self.allocation_reports = {}
+        self.peak_memory = {}
+        self.stack = []
+    
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time (and if enabled, profile) the body of a with block as phase `name`."""
+        if not self.enabled:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self._record(name, time.perf_counter() - start)
+            return
+        
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        if self.stack:
+            outer = self.stack[-1]
+            self.profiles[outer].disable()
+            # The peak is reset below, so bank the outer phase's peak so far
+            self.peak_memory[outer] = max(self.peak_memory.get(outer, 0), tracemalloc.get_traced_memory()[1])
+        
+        first_run = name not in self.profiles
+        profile = self.profiles.setdefault(name, cProfile.Profile())
+        before = take_snapshot() if first_run else None
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        
+        self.stack.append(name)
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._record(name, time.perf_counter() - start)
+            self.stack.pop()
+            
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak_memory[name] = max(self.peak_memory.get(name, 0), peak)
+            if before is not None:
+                after = take_snapshot()
+                self.allocation_reports[name] = after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+            
+            if self.stack:
+                self.profiles[self.stack[-1]].enable()
+    
+    def _record(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+    
+    def write_reports(self):
+        """Write a .prof file and an allocation report per phase. Returns the output directory, or None."""
+        if not self.enabled or not self.profiles:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        for name, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+            
+            with open(os.path.join(self.output_dir, f"{name}_allocations.txt"), 'w') as f:
+                f.write(f"Phase: {name}\n")
+                f.write(f"Time: {self.timings.get(name, 0):.3f}s over {self.calls.get(name, 0)} call(s)\n")
+                f.write(f"Peak traced memory: {self.peak_memory.get(name, 0) / 1_000_000:.1f} MB\n")
+                f.write(f"\nTop allocations during the first call (by size change):\n")
+                for stat in self.allocation_reports.get(name, []):
+                    f.write(f"{stat}\n")
+                f.write(f"\nTop functions by cumulative time:\n")
+                stats = pstats.Stats(profile, stream=f)
+                stats.sort_stats("cumulative").print_stats(TOP_ALLOCATIONS)
+        
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return self.output_dir
@@ -0,0 +1,268 @@
+"""
+Read-only HTTP query service over the local ABS labour force dataset.
+
+Dashboards query this instead of parsing the _FIXED.csv themselves. The
+dataset is held in memory as a SeriesIndex and recent query results are kept
+in an LRU cache. When a fetch run writes a new dataset (or the daemon appends
+to the current one) the service loads it in the background and swaps it in;
+queries already running finish against the old snapshot.
+
+    python3 abs_query_server.py
+    curl 'http://127.0.0.1:8780/series?region=Victoria&sex=Persons&from=2020-01'
+
+Endpoints:
+    /series          observations as parallel months/values lists. Filter with
+                     region, data_item, age, sex and adjustment_type (each may
+                     be repeated) and from/to months (YYYY-MM, inclusive)
+    /values/<field>  distinct values of a filter field, e.g. /values/region
+    /status          the loaded snapshot and cache statistics
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from abs_data_store import SeriesIndex, find_latest_dataset
+
+QUERY_HOST = "127.0.0.1"
+QUERY_PORT = 8780
+QUERY_CACHE_SIZE = 256  # Query results kept per snapshot
+RELOAD_POLL_SECONDS = 5  # How often to look for a new or updated dataset
+
+# Query parameter -> series field
+QUERY_FIELDS = {
+    "region": "region_description",
+    "data_item": "data_item_description",
+    "age": "age_description",
+    "sex": "sex_description",
+    "adjustment_type": "adjustment_type_description"
+}
+
+class LRUCache:
+    """A thread-safe mapping that drops its least recently used entries."""
+    
+    def __init__(self, max_entries=QUERY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+class Snapshot:
+    """One loaded dataset and the cached answers computed from it."""
+    
+    def __init__(self, index, signature, cache_size):
+        self.index = index
+        self.signature = signature
+        self.cache = LRUCache(cache_size)
+        self.loaded_at = datetime.now()
+
+class QueryService:
+    """
+    Answers queries from the current snapshot and swaps in new ones.
+
+    A snapshot and its cache are replaced together, so a cached answer is
+    never served from a dataset other than the one it was computed on.
+    """
+    
+    def __init__(self, dataset=None, cache_size=QUERY_CACHE_SIZE):
+        self.dataset = dataset
+        self.cache_size = cache_size
+        self.snapshot = None
+        self.pending_signature = None
+        self.reloads = 0
+    
+    def dataset_signature(self):
+        """(path, mtime, size) of the dataset to serve, or None if there isn't one."""
+        path = self.dataset or find_latest_dataset()
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (path, stat.st_mtime_ns, stat.st_size)
+    
+    def load(self, signature):
+        index = SeriesIndex.load(signature[0])
+        self.snapshot = Snapshot(index, signature, self.cache_size)
+        self.reloads += 1
+        logging.info(f"Loaded {index.record_count:,} records in {len(index.series):,} series "
+                     f"from {signature[0]} in {index.load_seconds:.1f}s")
+    
+    def check_for_update(self):
+        """
+        Load the dataset if it has changed since the current snapshot.
+
+        A change is only picked up once the file has looked the same for
+        two polls in a row, so a file still being written isn't loaded.
+        Returns True if a new snapshot was swapped in.
+        """
+        signature = self.dataset_signature()
+        current = self.snapshot.signature if self.snapshot else None
+        if signature is None or signature == current:
+            self.pending_signature = None
+            return False
+        if signature != self.pending_signature:
+            self.pending_signature = signature
+            return False
+        
+        self.pending_signature = None
+        try:
+            self.load(signature)
+        except Exception as e:
+            logging.error(f"Could not load {signature[0]}, still serving the previous snapshot: {e}")
+            return False
+        return True
+    
+    def watch(self, interval=RELOAD_POLL_SECONDS):
+        """Poll for dataset changes forever (run on a background thread)."""
+        while True:
+            time.sleep(interval)
+            self.check_for_update()
+    
+    def handle(self, path, params):
+        """Answer one request. Returns (HTTP status, JSON body bytes)."""
+        snapshot = self.snapshot
+        if path == "/status":
+            return 200, encode(self.status(snapshot))
+        if snapshot is None:
+            return 503, encode({"error": "No dataset loaded yet - run a fetch first"})
+        
+        if path == "/series":
+            cache_key = ("series",) + tuple(sorted((name, tuple(sorted(values))) for name, values in params.items()))
+            body = snapshot.cache.get(cache_key)
+            if body is None:
+                status, result = series_query(snapshot.index, params)
+                if status != 200:
+                    return status, encode(result)
+                body = encode(result)
+                snapshot.cache.put(cache_key, body)
+            return 200, body
+        
+        if path.startswith("/values/"):
+            name = path[len("/values/"):]
+            if name not in QUERY_FIELDS:
+                return 404, encode({"error": f"Unknown field: {name}", "fields": list(QUERY_FIELDS)})
+            return 200, encode(snapshot.index.values_for(QUERY_FIELDS[name]))
+        
+        return 404, encode({"error": f"Unknown path: {path}", "paths": ["/series", "/values/<field>", "/status"]})
+    
+    def status(self, snapshot):
+        if snapshot is None:
+            return {"dataset": None}
+        return {
+            "dataset": snapshot.index.source_file,
+            "loaded_at": snapshot.loaded_at.isoformat(),
+            "records": snapshot.index.record_count,
+            "series": len(snapshot.index.series),
+            "reloads": self.reloads,
+            "cache": snapshot.cache.stats()
+        }
+
+def series_query(index, params):
+    """Run a /series query against an index. Returns (HTTP status, result)."""
+    unknown = set(params) - set(QUERY_FIELDS) - {"from", "to"}
+    if unknown:
+        return 400, {"error": f"Unknown parameter(s): {', '.join(sorted(unknown))}",
+                     "parameters": list(QUERY_FIELDS) + ["from", "to"]}
+    
+    filters = {QUERY_FIELDS[name]: values for name, values in params.items() if name in QUERY_FIELDS}
+    start_month = params.get("from", [None])[-1]
+    end_month = params.get("to", [None])[-1]
+    
+    series = []
+    for key, months, values in index.query(filters, start_month, end_month):
+        entry = dict(zip(QUERY_FIELDS, key))
+        entry["months"] = months
+        entry["values"] = [to_number(value) for value in values]
+        series.append(entry)
+    return 200, {"series": series}
+
+def to_number(value):
+    """An observation value as a float, or None if it is blank or not a number."""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def encode(result):
+    return json.dumps(result, separators=(",", ":")).encode("utf-8")
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """GET-only handler; everything else is refused by BaseHTTPRequestHandler."""
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        status, body = self.server.service.handle(url.path.rstrip("/") or "/", parse_qs(url.query))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+def serve(service, host=QUERY_HOST, port=QUERY_PORT):
+    """Load the dataset, start watching it and serve queries until interrupted."""
+    signature = service.dataset_signature()
+    if signature is not None:
+        service.load(signature)
+    else:
+        logging.warning("No _FIXED.csv dataset found yet - waiting for a fetch run to write one")
+    threading.Thread(target=service.watch, daemon=True).start()
+    
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    logging.info(f"Serving queries on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve read-only queries over the local ABS dataset')
+    parser.add_argument('--host', default=QUERY_HOST,
+                        help=f'Address to listen on (default: {QUERY_HOST})')
+    parser.add_argument('--port', type=int, default=QUERY_PORT,
+                        help=f'Port to listen on (default: {QUERY_PORT})')
+    parser.add_argument('--dataset',
+                        help='Serve this _FIXED.csv file (default: the most recent one, following new runs)')
+    parser.add_argument('--cache-size', type=int, default=QUERY_CACHE_SIZE,
+                        help=f'Query results to cache (default: {QUERY_CACHE_SIZE})')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    serve(QueryService(args.dataset, args.cache_size), args.host, args.port)
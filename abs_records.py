@@ -0,0 +1,130 @@
+"""
+Fast JSON decoding and schema-checked records for API responses.
+
+Responses are decoded with the fastest JSON library installed: msgspec,
+then orjson, then the standard library json module. The library is only
+imported when a decoder is created, so importing this module (and the
+fetcher) stays cheap. Every record in a
+response is then checked against its dataset's RecordSchema: required
+fields must be present, months must look like YYYY-MM and values must be
+numbers (or blank). Checked records keep every field as a string, the way
+they are stored in the CSV files, so a value fetched as 5.2 compares equal
+to the "5.2" read back from disk. A record that fails a check is dropped
+and counted by reason, rather than failing the whole response.
+
+A faster decoder is one package away: pip3 install orjson (or msgspec).
+"""
+
+import re
+import importlib
+import importlib.util
+
+JSON_BACKENDS = ("msgspec", "orjson", "json")  # Fastest first
+FIELD_KINDS = ("text", "month", "number")
+MONTH_PATTERN = re.compile(r"\d{4}-\d{2}$")
+
+def available_backends():
+    """The JSON backends that can be used here, fastest first. Found without importing them."""
+    return [name for name in JSON_BACKENDS if name == "json" or importlib.util.find_spec(name) is not None]
+
+class JsonDecoder:
+    """
+    Decodes response bodies (bytes) with one JSON backend.
+
+    backend is "auto" for the fastest installed one. Raises ValueError for
+    an unknown or missing backend. decode() raises ValueError for invalid
+    JSON whichever backend is used.
+    """
+    
+    def __init__(self, backend="auto"):
+        if backend == "auto":
+            backend = available_backends()[0]
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON backend '{backend}' (choose from auto, {', '.join(JSON_BACKENDS)})")
+        if backend not in available_backends():
+            raise ValueError(f"JSON backend '{backend}' needs the '{backend}' package (pip3 install {backend})")
+        self.backend = backend
+        self.module = importlib.import_module(backend)
+        if backend == "msgspec":
+            self._decoder = self.module.json.Decoder()
+    
+    def decode(self, content):
+        if self.backend == "msgspec":
+            try:
+                return self._decoder.decode(content)
+            except self.module.DecodeError as e:
+                raise ValueError(str(e))
+        # orjson.loads and json.loads both raise ValueError subclasses
+        return self.module.loads(content)
+
+class RecordSchema:
+    """
+    The declared fields of a dataset's records.
+
+    fields maps a field name to its kind: "text", "month" (YYYY-MM) or
+    "number" (blank allowed). Fields in required must be present and not
+    null. Fields that aren't declared are passed through unchecked.
+    """
+    
+    def __init__(self, fields, required=()):
+        unknown = [f"{field} ({kind})" for field, kind in fields.items() if kind not in FIELD_KINDS]
+        if unknown:
+            raise ValueError(f"Unknown field kind(s): {', '.join(unknown)} (choose from {', '.join(FIELD_KINDS)})")
+        self.fields = dict(fields)
+        self.required = tuple(required)
+        for field in self.required:
+            self.fields.setdefault(field, "text")
+        # Grouped by kind so each record is checked in a few tight loops
+        self.text_fields = tuple(field for field, kind in self.fields.items() if kind == "text")
+        self.month_fields = tuple(field for field, kind in self.fields.items() if kind == "month")
+        self.number_fields = tuple(field for field, kind in self.fields.items() if kind == "number")
+    
+    def check_record(self, record):
+        """Coerce a record to the schema in place. Returns None if it passes, or the reason it doesn't."""
+        if not isinstance(record, dict):
+            return "not an object"
+        for field in self.required:
+            if record.get(field) is None:
+                return f"missing {field}"
+        for field in self.text_fields:
+            value = record.get(field)
+            if type(value) is not str:
+                if value is not None:
+                    return f"bad {field}"
+                if field in record:
+                    record[field] = ''
+        for field in self.month_fields:
+            value = record.get(field)
+            if type(value) is not str or not MONTH_PATTERN.match(value):
+                if value is not None:
+                    return f"bad {field}"
+                if field in record:
+                    record[field] = ''
+        for field in self.number_fields:
+            value = record.get(field)
+            if type(value) is str:
+                if value:
+                    try:
+                        float(value)
+                    except ValueError:
+                        return f"bad {field}"
+            elif type(value) in (int, float):
+                record[field] = str(value)
+            elif value is not None:
+                return f"bad {field}"
+            elif field in record:
+                record[field] = ''
+        return None
+    
+    def check(self, records):
+        """(records that pass, {reason: count} for those that don't)."""
+        accepted = []
+        rejections = {}
+        check_record = self.check_record
+        for record in records:
+            reason = check_record(record)
+            if reason is None:
+                accepted.append(record)
+            else:
+                rejections[reason] = rejections.get(reason, 0) + 1
+        return accepted, rejections
@@ -0,0 +1,285 @@
+"""
+Bitemporal revision store for ABS observations.
+
+The ABS revises published values, seasonally adjusted and trend series in
+particular. The revision log (abs_revisions.jsonl) keeps every vintage of
+every observation: each line is one vintage holding only the observations
+that were new or changed since the vintage before it, so the log grows with
+the number of revisions rather than the number of runs. The first line is
+a baseline holding the whole dataset.
+
+Vintages are named by the time they were recorded, to the microsecond,
+so two runs (or two appends in one run) in the same second stay distinct
+and in order. Logs written with second-resolution names still load: the
+names compare as ISO strings either way.
+
+Loading the log builds an index from each observation to its vintages, so
+"as of" queries are a binary search per observation. Lines are in vintage
+order, so an as-of load can also stop reading at the first later vintage.
+An as-of query still visits every observation in the store, so its result
+is cached per vintage: repeated queries between the same two vintages
+don't repeat the work.
+
+A crash while appending can leave a partial last line. Appends cut it off
+first, so the next vintage starts on a line of its own, and loading skips
+any line that can't be read (with a warning) rather than failing.
+
+    python3 abs_revisions.py                                  # summary
+    python3 abs_revisions.py --as-of 2026-03-01 --csv asof.csv
+    python3 abs_revisions.py --history "Australia|Employed persons|15 and over|Persons|Seasonally adjusted"
+"""
+
+import os
+import csv
+import json
+import shutil
+import logging
+import argparse
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from abs_data_store import SERIES_FIELDS
+
+REVISION_FILE = "abs_revisions.jsonl"
+
+_last_vintage = None  # The last vintage appended by this process, to keep names increasing
+
+def observation_key(record):
+    """(series key, month) of a record."""
+    return tuple(record.get(field, '') for field in SERIES_FIELDS), record.get('observation_month', '')
+
+def new_vintage():
+    """A vintage name for now (ISO time to the microsecond), later than any this process named before."""
+    global _last_vintage
+    now = datetime.now()
+    if _last_vintage is not None and now <= _last_vintage:
+        now = _last_vintage + timedelta(microseconds=1)
+    _last_vintage = now
+    return now.isoformat(timespec="microseconds")
+
+def trim_partial_line(path):
+    """
+    Cut a partial last line (left by a crash mid-append) off the log.
+
+    Returns the number of bytes removed.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        # Scan back for the end of the last complete line
+        end = 0
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                end = position + newline + 1
+                break
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+    logging.warning(f"⚠️  Removed a partial last line ({size - end} bytes) from {path} - an earlier append was interrupted")
+    return size - end
+
+def append_vintage(records, path=REVISION_FILE, vintage=None, baseline=False):
+    """
+    Append one vintage: the given records (new or revised observations).
+
+    Each line carries its own table of the series it touches, so vintages
+    can be appended without reading the log. Returns the number of
+    observations written.
+    """
+    if not records:
+        return 0
+    vintage = vintage or new_vintage()
+    series_ids = {}
+    observations = []
+    for record in records:
+        key, month = observation_key(record)
+        series_id = series_ids.setdefault(key, len(series_ids))
+        observations.append([series_id, month, record.get('observation_value', '')])
+    
+    line = {"vintage": vintage, "series": [list(key) for key in series_ids], "observations": observations}
+    if baseline:
+        line["baseline"] = True
+    trim_partial_line(path)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(line, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return len(observations)
+
+class VintageWriter:
+    """
+    Appends one vintage an observation at a time, for runs that can't hold
+    its records in memory (the streaming fetcher).
+
+    Observations go to <path>.pending as they are added. close() appends
+    them to the log as one line, with the series table after them, and
+    returns the number written (nothing is appended for 0). abort()
+    discards them.
+    """
+    
+    def __init__(self, path=REVISION_FILE, vintage=None, baseline=False):
+        self.path = path
+        self.vintage = vintage
+        self.baseline = baseline
+        self.pending_path = path + ".pending"
+        self.pending = open(self.pending_path, 'w', encoding='utf-8')
+        self.series_ids = {}
+        self.count = 0
+    
+    def add(self, record):
+        key, month = observation_key(record)
+        series_id = self.series_ids.setdefault(key, len(self.series_ids))
+        observation = json.dumps([series_id, month, record.get('observation_value', '')], separators=(",", ":"))
+        self.pending.write("," + observation if self.count else observation)
+        self.count += 1
+    
+    def close(self):
+        self.pending.close()
+        try:
+            if not self.count:
+                return 0
+            head = {"vintage": self.vintage or new_vintage()}
+            if self.baseline:
+                head["baseline"] = True
+            series = [list(key) for key in self.series_ids]
+            trim_partial_line(self.path)
+            with open(self.path, 'a', encoding='utf-8') as f, open(self.pending_path, 'r', encoding='utf-8') as pending:
+                f.write(json.dumps(head, separators=(",", ":"))[:-1] + ',"observations":[')
+                shutil.copyfileobj(pending, f)
+                f.write('],"series":' + json.dumps(series, separators=(",", ":")) + "}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            return self.count
+        finally:
+            os.remove(self.pending_path)
+    
+    def abort(self):
+        self.pending.close()
+        if os.path.exists(self.pending_path):
+            os.remove(self.pending_path)
+
+class RevisionStore:
+    """
+    Every vintage of every observation, indexed for as-of queries.
+
+    history maps (series key, month) to two parallel lists: the vintages it
+    was recorded in, in order, and its value in each.
+    """
+    
+    def __init__(self):
+        self.history = {}
+        self.vintages = []
+        self._as_of_cache = {}  # Number of vintages known -> as_of() records
+    
+    @classmethod
+    def load(cls, path=REVISION_FILE, until=None):
+        """
+        Read the revision log, optionally only the vintages recorded up to `until` (ISO time).
+
+        Lines that can't be read (a partial write) are skipped with a warning.
+        """
+        store = cls()
+        if not os.path.exists(path):
+            return store
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    vintage = json.loads(line)
+                except ValueError:
+                    logging.warning(f"⚠️  Skipping unreadable line {number} of {path} (an interrupted append?)")
+                    continue
+                if until is not None and vintage["vintage"] > until:
+                    break
+                store._add_vintage(vintage)
+        return store
+    
+    def _add_vintage(self, vintage):
+        when = vintage["vintage"]
+        self.vintages.append(when)
+        self._as_of_cache.clear()
+        series = [tuple(key) for key in vintage["series"]]
+        for series_id, month, value in vintage["observations"]:
+            entry = self.history.get((series[series_id], month))
+            if entry is None:
+                entry = self.history[(series[series_id], month)] = ([], [])
+            entry[0].append(when)
+            entry[1].append(value)
+    
+    def as_of(self, when):
+        """
+        The dataset as it was known at `when` (ISO time), as record dicts.
+
+        Observations first recorded after `when` are left out. Every
+        observation in the store is visited (a binary search each), so the
+        result is cached by the number of vintages recorded up to `when`;
+        callers get a new list of the cached dicts.
+        """
+        known = bisect_right(self.vintages, when)
+        records = self._as_of_cache.get(known)
+        if records is None:
+            records = []
+            for (key, month), (vintages, values) in self.history.items():
+                position = bisect_right(vintages, when)
+                if position:
+                    record = dict(zip(SERIES_FIELDS, key))
+                    record['observation_month'] = month
+                    record['observation_value'] = values[position - 1]
+                    records.append(record)
+            self._as_of_cache[known] = records
+        return list(records)
+    
+    def revisions(self, key):
+        """Vintage history of one series: {month: [(vintage, value), ...]} for months with more than one vintage."""
+        return {month: list(zip(entry[0], entry[1])) for (series_key, month), entry in sorted(self.history.items())
+                if series_key == key and len(entry[0]) > 1}
+    
+    def revision_count(self):
+        """Number of stored values that replaced an earlier one."""
+        return sum(len(vintages) - 1 for vintages, _ in self.history.values())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Query the ABS revision log')
+    parser.add_argument('--file', default=REVISION_FILE, help=f'Revision log (default: {REVISION_FILE})')
+    parser.add_argument('--as-of', help='Export the dataset as known at this date or time (ISO format)')
+    parser.add_argument('--csv', help='CSV file for --as-of (default: print a count only)')
+    parser.add_argument('--history', help='Print the revisions of one series, given as region|data item|age|sex|adjustment')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not os.path.exists(args.file):
+        logging.error(f"No revision log at {args.file} - run a fetch first")
+        raise SystemExit(1)
+    
+    if args.as_of:
+        # A bare date means as known at the end of that day
+        if len(args.as_of) == 10:
+            args.as_of += "T23:59:59.999999"
+        store = RevisionStore.load(args.file, until=args.as_of)
+        records = store.as_of(args.as_of)
+        logging.info(f"{len(records)} observations known as of {args.as_of} ({len(store.vintages)} vintage(s))")
+        if args.csv:
+            with open(args.csv, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(SERIES_FIELDS) + ['observation_month', 'observation_value'])
+                writer.writeheader()
+                writer.writerows(records)
+            logging.info(f"Written to {args.csv}")
+    elif args.history:
+        store = RevisionStore.load(args.file)
+        for month, versions in store.revisions(tuple(args.history.split("|"))).items():
+            print(month + ": " + " -> ".join(f"{value} ({vintage})" for vintage, value in versions))
+    else:
+        store = RevisionStore.load(args.file)
+        logging.info(f"{len(store.vintages)} vintage(s), {len(store.history)} observations, "
+                     f"{store.revision_count()} revision(s)")
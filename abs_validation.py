@@ -0,0 +1,238 @@
+"""
+Cross-series consistency checks on the labour force dataset.
+
+Some series must add up to others, e.g. LABOUR_FORCE = EMPLOYED_PERSONS +
+UNEMPLOYED_PERSONS and, for original data, PERSONS = MALES + FEMALES. A bad
+or partial API response breaks these identities, so each one is checked
+for every region, age, sex and adjustment type at once, as whole-array
+NumPy operations over the aligned series from abs_derived.
+
+Identities name series by grid code (abs_grid.json). Each series is
+matched to the codes of the request that fetched it, which the fetcher
+records against the combination in the checkpoint (see series_codes in
+fetch_abs_data_auto.py). Series fetched before that was recorded are
+matched against the grid by their descriptions instead; a series that
+matches no grid value is counted as unmapped and not checked.
+
+    python3 abs_validation.py                  # check the latest dataset
+    python3 abs_validation.py --tolerance 0.01 # allow 1% relative difference
+"""
+
+import json
+import time
+import logging
+import functools
+import argparse
+from abs_io import atomic_write
+from abs_data_store import SeriesIndex, SERIES_FIELDS
+import abs_derived
+from abs_derived import np
+
+VALIDATION_FILE = "abs_validation_results.json"
+VALIDATION_REL_TOLERANCE = 0.001  # Allowed difference as a fraction of the total
+VALIDATION_ABS_TOLERANCE = 0.15  # Plus this much, for rounding: counts of persons are published in thousands
+
+# Per data item where the default doesn't fit. None marks items that don't add up across
+# sexes or components (rates and ratios), so no identity is checked on them.
+VALIDATION_ABS_TOLERANCES = {
+    "EMPLOYED_PERSONS_MONTHLY_HOURS_WORKED_IN_ALL_JOBS": 1.5,  # Hours: larger totals, coarser rounding
+    "FULL_TIME_EMPLOYED_MONTHLY_HOURS_WORKED_IN_ALL_JOBS": 1.5,
+    "PART_TIME_EMPLOYED_MONTHLY_HOURS_WORKED_IN_ALL_JOBS": 1.5,
+    "EMPLOYMENT_TO_POPULATION_RATIO": None,
+    "UNEMPLOYMENT_RATE": None,
+    "UNEMPLOYMENT_RATE_LOOKING_FOR_FULL_TIME_WORK": None,
+    "UNEMPLOYMENT_RATE_LOOKING_FOR_PART_TIME_WORK": None,
+    "UNEMPLOYMENT_TO_POPULATION_RATIO_LOOKING_FOR_FULL_TIME_WORK": None,
+    "PARTICIPATION_RATE": None
+}
+
+# (name, series field, total, parts, adjustment types it applies to or None for all)
+IDENTITIES = (
+    ("labour_force", "data_item_description", "LABOUR_FORCE",
+     ("EMPLOYED_PERSONS", "UNEMPLOYED_PERSONS"), None),
+    ("labour_force_full_part_time", "data_item_description", "LABOUR_FORCE",
+     ("LABOUR_FORCE_FULL_TIME", "LABOUR_FORCE_PART_TIME"), None),
+    ("employed_full_part_time", "data_item_description", "EMPLOYED_PERSONS",
+     ("EMPLOYED_FULL_TIME", "EMPLOYED_PART_TIME"), None),
+    ("unemployed_full_part_time", "data_item_description", "UNEMPLOYED_PERSONS",
+     ("UNEMPLOYED_LOOKING_FOR_FULL_TIME_WORK", "UNEMPLOYED_LOOKING_FOR_PART_TIME_WORK"), None),
+    ("hours_full_part_time", "data_item_description", "EMPLOYED_PERSONS_MONTHLY_HOURS_WORKED_IN_ALL_JOBS",
+     ("FULL_TIME_EMPLOYED_MONTHLY_HOURS_WORKED_IN_ALL_JOBS", "PART_TIME_EMPLOYED_MONTHLY_HOURS_WORKED_IN_ALL_JOBS"), None),
+    ("persons_males_females", "sex_description", "PERSONS",
+     ("MALES", "FEMALES"), ("ORIGINAL",))
+)
+
+DATA_ITEM_POSITION = SERIES_FIELDS.index("data_item_description")
+ADJUSTMENT_POSITION = SERIES_FIELDS.index("adjustment_type_description")
+
+def abs_tolerance_for(data_item, default=VALIDATION_ABS_TOLERANCE):
+    """Absolute tolerance for a data item code, or None if it is never checked."""
+    return VALIDATION_ABS_TOLERANCES.get(data_item, default)
+
+@functools.lru_cache(maxsize=4)
+def identity_rows(row_codes, identities, default_tolerance=VALIDATION_ABS_TOLERANCE):
+    """
+    (identity, total rows, part rows, absolute tolerance per total row) for every identity.
+
+    row_codes holds each row's series key in grid codes (None when the
+    codes aren't known). Identities matching no series get empty arrays.
+    Cached by row codes, which rarely change between runs, so repeat
+    checks only do the array work.
+    """
+    code_rows = {codes: row for row, codes in enumerate(row_codes) if codes is not None}
+    matched = []
+    for identity in identities:
+        total_rows, part_rows = match_identity(code_rows, identity)
+        tolerances = np.array([abs_tolerance_for(row_codes[row][DATA_ITEM_POSITION], default_tolerance)
+                               for row in total_rows.tolist()], dtype=float)
+        matched.append((identity, total_rows, part_rows, tolerances))
+    return matched
+
+def match_identity(code_rows, identity):
+    """
+    Rows taking part in one identity.
+
+    code_rows maps each series' key in grid codes to its row. Returns the
+    total rows and a list of part row arrays, one entry per series where
+    the total and every part are present. Data items that don't add up
+    (VALIDATION_ABS_TOLERANCES None) are left out.
+    """
+    name, field, total, parts, adjustment_types = identity
+    position = SERIES_FIELDS.index(field)
+    total_rows = []
+    part_rows = [[] for _ in parts]
+    for codes, row in code_rows.items():
+        if codes[position] != total:
+            continue
+        if adjustment_types and codes[ADJUSTMENT_POSITION] not in adjustment_types:
+            continue
+        if abs_tolerance_for(codes[DATA_ITEM_POSITION]) is None:
+            continue
+        rows = [code_rows.get(codes[:position] + (part,) + codes[position + 1:]) for part in parts]
+        if None in rows:
+            continue
+        total_rows.append(row)
+        for part_list, part_row in zip(part_rows, rows):
+            part_list.append(part_row)
+    return np.array(total_rows, dtype=int), [np.array(rows, dtype=int) for rows in part_rows]
+
+def validate(derived, codes, identities=IDENTITIES, rel_tolerance=VALIDATION_REL_TOLERANCE,
+             abs_tolerance=VALIDATION_ABS_TOLERANCE):
+    """
+    Check every identity over a DerivedSeries' aligned values.
+
+    codes maps series keys (record descriptions) to grid codes, see
+    series_codes in fetch_abs_data_auto.py. abs_tolerance is the default
+    for data items not in VALIDATION_ABS_TOLERANCES. Months where the
+    total or a part is missing are not checked. Returns a result dict with
+    one violation entry per total series that broke an identity in at
+    least one month, and the identities that matched no series.
+    """
+    abs_derived.require_numpy()
+    start_time = time.perf_counter()
+    values = derived.values
+    row_codes = tuple(codes.get(key) for key in derived.keys)
+    
+    violations = []
+    unmatched = []
+    series_checked = 0
+    months_checked = 0
+    for identity, total_rows, part_rows, tolerances in identity_rows(row_codes, tuple(identities), abs_tolerance):
+        if not len(total_rows):
+            unmatched.append(identity[0])
+            continue
+        totals = values[total_rows]
+        sums = sum(values[rows] for rows in part_rows)
+        differences = totals - sums
+        with np.errstate(invalid='ignore'):
+            broken = np.abs(differences) > tolerances[:, None] + rel_tolerance * np.abs(totals)
+        checked_counts = (~np.isnan(differences)).sum(axis=1)
+        series_checked += len(total_rows)
+        months_checked += int(checked_counts.sum())
+        
+        broken_counts = broken.sum(axis=1)
+        worst_columns = np.argmax(np.where(broken, np.abs(differences), -1.0), axis=1)
+        for position in np.nonzero(broken_counts)[0].tolist():
+            column = int(worst_columns[position])
+            violations.append({
+                "identity": identity[0],
+                "series": dict(zip(SERIES_FIELDS, derived.keys[total_rows[position]])),
+                "parts": list(identity[3]),
+                "months_checked": int(checked_counts[position]),
+                "months_violated": int(broken_counts[position]),
+                "worst_month": abs_derived.month_label(derived.start + column),
+                "total": float(totals[position, column]),
+                "sum_of_parts": float(sums[position, column]),
+                "difference": float(differences[position, column])
+            })
+    
+    return {
+        "source": derived.source,
+        "rel_tolerance": rel_tolerance,
+        "abs_tolerance": abs_tolerance,
+        "series_checked": series_checked,
+        "months_checked": months_checked,
+        "unmatched_identities": unmatched,
+        "unmapped_series": sum(1 for row in row_codes if row is None),
+        "violation_count": len(violations),
+        "seconds": time.perf_counter() - start_time,
+        "violations": violations
+    }
+
+def save_validation_report(result, path=VALIDATION_FILE):
+    with atomic_write(path) as f:
+        json.dump(result, f, indent=2)
+
+def log_violations(result, limit=10):
+    """Log a summary line and the worst few violations."""
+    if result["unmapped_series"]:
+        logging.warning(f"⚠️  {result['unmapped_series']} series match no grid codes and were not checked "
+                        f"(their descriptions are recorded in the checkpoint when next fetched)")
+    if result["unmatched_identities"]:
+        logging.warning(f"⚠️  No series matched identities: {', '.join(result['unmatched_identities'])}")
+    if not result["series_checked"]:
+        logging.warning("⚠️  Consistency checks did not run: no series matched any identity")
+        return
+    if not result["violation_count"]:
+        logging.info(f"✅ Consistency checks passed: {result['series_checked']} series, "
+                     f"{result['months_checked']} months ({result['seconds'] * 1000:.1f} ms)")
+        return
+    logging.warning(f"⚠️  {result['violation_count']} series break a consistency identity "
+                    f"(of {result['series_checked']} checked)")
+    worst = sorted(result["violations"], key=lambda v: -abs(v["difference"]))
+    for violation in worst[:limit]:
+        series = violation["series"]
+        logging.warning(f"   {violation['identity']}: {series['region_description']}/{series['data_item_description']}/"
+                        f"{series['sex_description']}/{series['adjustment_type_description']} - "
+                        f"{violation['months_violated']} month(s), worst {violation['worst_month']}: "
+                        f"{violation['total']:g} vs {violation['sum_of_parts']:g}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check cross-series identities in the ABS dataset')
+    parser.add_argument('--dataset', help='_FIXED.csv file to check (default: the most recent one)')
+    parser.add_argument('--tolerance', type=float, default=VALIDATION_REL_TOLERANCE,
+                        help=f'Allowed relative difference (default: {VALIDATION_REL_TOLERANCE})')
+    parser.add_argument('--output', default=VALIDATION_FILE,
+                        help=f'Report file (default: {VALIDATION_FILE})')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    abs_derived.require_numpy()
+    # Grid codes come from the fetcher's checkpoint
+    import fetch_abs_data_auto
+    
+    index = SeriesIndex.load(args.dataset)
+    if index.source_file is None:
+        logging.error("No _FIXED.csv dataset found - fetch data first")
+        raise SystemExit(1)
+    
+    fetch_abs_data_auto.load_grid()
+    derived = abs_derived.DerivedSeries()
+    derived.update(index)
+    codes = fetch_abs_data_auto.series_codes(fetch_abs_data_auto.load_checkpoint(), derived.keys)
+    derived.source = index.source_file
+    result = validate(derived, codes, rel_tolerance=args.tolerance)
+    save_validation_report(result, args.output)
+    log_violations(result)
+    logging.info(f"Report written to {args.output}")
+    raise SystemExit(1 if result["violation_count"] or not result["series_checked"] else 0)
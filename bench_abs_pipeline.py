@@ -0,0 +1,287 @@
+"""
+Benchmarks for the data pipeline hot paths, on synthetic labour force datasets.
+
+Each scale multiplies the number of series in the real grid (1× is the full
+grid of regions, data items, ages, sexes and adjustment types). Results are
+compared against a JSON baseline so slowdowns show up before they reach
+production:
+
+    python3 bench_abs_pipeline.py --save-baseline     # record a baseline
+    python3 bench_abs_pipeline.py                     # compare against it
+    python3 bench_abs_pipeline.py --scales 1 10 100   # full suite (100× needs several GB of RAM)
+
+The derived-series and validation benchmarks only run when numpy is installed.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import platform
+import contextlib
+from datetime import datetime
+import fetch_abs_data_auto as fetcher
+import fix_abs_csv
+import abs_derived
+import abs_validation
+from abs_data_store import SeriesIndex, SERIES_FIELDS
+from abs_io import COMPRESSION_SUFFIXES
+
+BASELINE_FILE = "bench_baseline.json"
+DEFAULT_SCALES = [1, 10]
+DEFAULT_MONTHS = 60  # Months of history per series
+DEFAULT_REPEAT = 3  # Each benchmark reports the fastest of this many runs
+REGRESSION_TOLERANCE = 0.20  # Slower than baseline by more than this fraction is a regression
+
+def grid_series(scale, series_limit=None):
+    """
+    Series keys (region, data item, age, sex, adjustment type) for a synthetic dataset.
+
+    Scales above 1 add copies of every region ("VICTORIA_2", ...), so the
+    dataset grows the way a wider grid would.
+    """
+    series = []
+    for copy in range(1, scale + 1):
+        for region in fetcher.REGIONS:
+            region_name = region if copy == 1 else f"{region}_{copy}"
+            for data_item in fetcher.DATA_ITEMS:
+                for age in fetcher.AGE_GROUPS:
+                    for sex in fetcher.SEX_VALUES:
+                        for adjustment_type in fetcher.ADJUSTMENT_TYPES:
+                            series.append((region_name, data_item, age, sex, adjustment_type))
+                            if series_limit and len(series) >= series_limit:
+                                return series
+    return series
+
+def month_range(months, end_year=2025, end_month=12):
+    """The last `months` observation months as 'YYYY-MM' strings, oldest first."""
+    result = []
+    year, month = end_year, end_month
+    for _ in range(months):
+        result.append(f"{year:04d}-{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return result[::-1]
+
+def describe(series_key):
+    """The record descriptions for a series' grid codes, in SERIES_FIELDS order."""
+    region, data_item, age, sex, adjustment_type = series_key
+    return (region.replace("_", " ").title(), data_item.replace("_", " ").capitalize(),
+            age.replace("_", " ").lower(), sex.capitalize(), adjustment_type.replace("_", " ").title())
+
+def make_records(series_key, months, rng):
+    """Synthetic API records for one series."""
+    descriptions = dict(zip(SERIES_FIELDS, describe(series_key)))
+    return [dict(descriptions, observation_month=month, observation_value=f"{rng.uniform(0, 5000):.1f}")
+            for month in months]
+
+def make_dataset(series, months, rng):
+    """All records for a set of series."""
+    data = []
+    for series_key in series:
+        data.extend(make_records(series_key, months, rng))
+    return data
+
+def make_checkpoint(series):
+    """A checkpoint with every series completed today."""
+    checkpoint = fetcher.empty_checkpoint()
+    fetched_at = datetime.now().isoformat()
+    for series_key in series:
+        fetcher.set_combination_status(checkpoint, fetcher.get_combination_key(*series_key), {
+            "status": "completed",
+            "records": 0,
+            "latest_month": "2025-12",
+            "fetched_at": fetched_at
+        })
+    return checkpoint
+
+def time_call(func, repeat):
+    """Fastest wall time of `repeat` calls to func, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def run_scale(scale, months, series_limit, repeat, compression):
+    """Run every benchmark at one scale in the current directory. Returns a result dict."""
+    rng = random.Random(scale)
+    series = grid_series(scale, series_limit and series_limit * scale)
+    observation_months = month_range(months)
+    all_data = make_dataset(series, observation_months, rng)
+    checkpoint = make_checkpoint(series)
+    combination_keys = [fetcher.get_combination_key(*series_key) for series_key in series]
+    timings = {}
+    
+    # One request's worth of new months merged into the full dataset, through a key index kept
+    # across calls the way FetchRunner keeps it (mapping keys to records when tracking revisions)
+    new_months = iter(month_range(repeat * 12, end_year=2026 + repeat)[::-1])
+    revisions = [] if fetcher.TRACK_REVISIONS else None
+    if revisions is None:
+        record_keys = {fetcher.record_key(record) for record in all_data}
+    else:
+        record_keys = {fetcher.record_key(record): record for record in all_data}
+    def merge():
+        new_records = make_records(series[0], [next(new_months)], rng)
+        fetcher.merge_new_records(all_data, new_records, combination_keys[0], record_keys, revisions)
+    timings["merge_new_records"] = time_call(merge, repeat)
+    
+    # The whole dataset as one response body, decoded and checked against the schema
+    body = json.dumps({"labour_force_statistics": all_data}).encode()
+    decoder = fetcher.json_decoder()
+    schema = fetcher.LABOUR_FORCE.schema
+    timings["decode_response"] = time_call(lambda: decoder.decode(body), repeat)
+    timings["decode_and_check"] = time_call(
+        lambda: schema.check(fetcher.LABOUR_FORCE.extract_records(decoder.decode(body))), repeat)
+    
+    raw_file = fetcher.compressed_name("abs_labour_force_ALL_DATA_20250101_000000.csv", compression)
+    timings["save_to_csv"] = time_call(lambda: fetcher.save_to_csv(all_data, raw_file), repeat)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings["fix_abs_csv"] = time_call(lambda: fix_abs_csv.fix_csv(raw_file), repeat)
+    
+    timings["load_existing_data"] = time_call(lambda: fetcher.load_existing_data(checkpoint), repeat)
+    timings["save_checkpoint"] = time_call(lambda: fetcher.save_checkpoint(checkpoint), repeat)
+    timings["load_checkpoint"] = time_call(fetcher.load_checkpoint, repeat)
+    timings["is_combination_fresh"] = time_call(
+        lambda: [fetcher.is_combination_fresh(checkpoint, key) for key in combination_keys], repeat)
+    
+    # Derived series need numpy - skipped without it
+    if abs_derived.np is not None:
+        index = SeriesIndex.from_records(all_data)
+        timings["derived_full"] = time_call(lambda: abs_derived.DerivedSeries().update(index), repeat)
+        derived = abs_derived.DerivedSeries()
+        derived.update(index)
+        changed = {series[0]}
+        timings["derived_incremental"] = time_call(lambda: derived.update(index, changed), repeat)
+        # Series key (descriptions) -> grid codes, as the fetcher's series_codes gives for fetched series
+        codes = {describe(series_key): series_key for series_key in series}
+        timings["validate_identities"] = time_call(lambda: abs_validation.validate(derived, codes), repeat)
+    
+    return {
+        "series": len(series),
+        "records": len(all_data),
+        "seconds": timings
+    }
+
+def run_benchmarks(scales, months, series_limit=None, repeat=DEFAULT_REPEAT, compression="none"):
+    """Run the suite at every scale in a scratch directory. Returns the results document."""
+    previous_compression = fetcher.OUTPUT_COMPRESSION
+    previous_dir = os.getcwd()
+    fetcher.OUTPUT_COMPRESSION = compression
+    results = {}
+    try:
+        for scale in scales:
+            with tempfile.TemporaryDirectory(prefix="abs_bench_") as scratch:
+                os.chdir(scratch)
+                try:
+                    results[f"{scale}x"] = run_scale(scale, months, series_limit, repeat, compression)
+                finally:
+                    os.chdir(previous_dir)
+            print_scale(f"{scale}x", results[f"{scale}x"])
+    finally:
+        fetcher.OUTPUT_COMPRESSION = previous_compression
+    
+    return {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "months": months,
+            "series_limit": series_limit,
+            "repeat": repeat,
+            "compression": compression,
+            "json_backend": fetcher.json_decoder().backend
+        },
+        "results": results
+    }
+
+def compare(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare results against a baseline.
+
+    Returns a list of (scale, benchmark, baseline seconds, current seconds, ratio)
+    for every benchmark present in both, and the subset that regressed.
+    """
+    rows = []
+    for scale, result in current["results"].items():
+        base_result = baseline.get("results", {}).get(scale)
+        if base_result is None:
+            continue
+        for name, seconds in result["seconds"].items():
+            base_seconds = base_result["seconds"].get(name)
+            if not base_seconds:
+                continue
+            rows.append((scale, name, base_seconds, seconds, seconds / base_seconds))
+    regressions = [row for row in rows if row[4] > 1 + tolerance]
+    return rows, regressions
+
+def print_scale(scale, result):
+    print(f"\n{scale}: {result['series']} series, {result['records']} records")
+    for name, seconds in result["seconds"].items():
+        print(f"  {name:<22} {seconds * 1000:>10.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the ABS data pipeline on synthetic data')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='Dataset sizes as multiples of the full grid (default: 1 10)')
+    parser.add_argument('--months', type=int, default=DEFAULT_MONTHS,
+                        help=f'Months of history per series (default: {DEFAULT_MONTHS})')
+    parser.add_argument('--series', type=int,
+                        help='Series per 1x of scale (default: the full grid)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Runs per benchmark, fastest is kept (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES), default="none",
+                        help='Compression for the data and checkpoint files (default: none)')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help=f'Baseline JSON file (default: {BASELINE_FILE})')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write the results as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help='Allowed slowdown before a benchmark counts as a regression (default: 0.20)')
+    parser.add_argument('--output', help='Also write the results JSON here')
+    args = parser.parse_args()
+    
+    # The pipeline functions log every save and load
+    logging.basicConfig(level=logging.WARNING)
+    
+    results = run_benchmarks(args.scales, args.months, args.series, args.repeat, args.compress)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        sys.exit(0)
+    
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} - run with --save-baseline to create one")
+        sys.exit(0)
+    
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("config") != results["config"]:
+        print(f"\n⚠️  Baseline was recorded with different settings: {baseline.get('config')}")
+    
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print(f"\nCompared with baseline from {baseline.get('created')}:")
+    for scale, name, base_seconds, seconds, ratio in rows:
+        marker = "❌" if ratio > 1 + args.tolerance else "✅"
+        print(f"  {marker} {scale:<5} {name:<22} {base_seconds * 1000:>10.2f} ms -> {seconds * 1000:>10.2f} ms ({ratio:.2f}x)")
+    
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+    print("\n✅ No regressions")
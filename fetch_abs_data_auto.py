@@ -3,7 +3,7 @@ Automated version of fetch_abs_data.py for scheduled runs.
 Enhanced with checkpoint functionality for crash recovery and incremental updates.
 """
 
-import requests
+import re
 import csv
 import json
 import time
@@ -11,18 +11,39 @@ import logging
 import os
 import sys
 import argparse
+import itertools
+import threading
+import glob
+import zlib
+import io
+import contextlib
+
+try:
+    import resource  # Peak RSS for the run report (not available on Windows)
+except ImportError:
+    resource = None
 from datetime import datetime, timedelta
 from collections import deque
+from abs_io import (open_data_file, atomic_write, fsync_file, compressed_name, find_existing_variant,
+                    strip_compression_suffix, compression_for_path, COMPRESSION_SUFFIXES)
+from abs_data_store import find_latest_dataset, SeriesIndex, SERIES_FIELDS
+from abs_datasets import Dataset, register, load_dataset_plugins, select_datasets, DATASETS_FILE
+from abs_records import JsonDecoder, RecordSchema
+from abs_metrics import MetricsRegistry, LATENCY_BUCKETS, DURATION_BUCKETS, BYTES_BUCKETS
+from abs_profiling import PhaseProfiler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('abs_data_fetch.log'),
-        logging.StreamHandler()
-    ]
-)
+def setup_logging():
+    """Log to abs_data_fetch.log and the console. Does nothing if logging is already set up."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler('abs_data_fetch.log'),
+            logging.StreamHandler()
+        ]
+    )
 
 # API Configuration
 BASE_URL = "https://wovg-community.gateway.prod.api.vic.gov.au/abs/v1.0/labour-force-statistics"
@@ -82,22 +103,110 @@ AGE_GROUPS = ["15_AND_OVER"]
 SEX_VALUES = ["MALES", "FEMALES", "PERSONS"]
 ADJUSTMENT_TYPES = ["ORIGINAL", "SEASONALLY_ADJUSTED", "TREND"]
 
+# The lists above are the defaults. If the grid file exists, any list it gives replaces them:
+# {"regions": [...], "data_items": [...], "age_groups": [...], "sex_values": [...], "adjustment_types": [...]}
+GRID_FILE = "abs_grid.json"
+GRID_FIELDS = {
+    "regions": "REGIONS",
+    "data_items": "DATA_ITEMS",
+    "age_groups": "AGE_GROUPS",
+    "sex_values": "SEX_VALUES",
+    "adjustment_types": "ADJUSTMENT_TYPES"
+}
+
+# Sharding: with --shard i/n this machine fetches only its share of the grid,
+# into its own checkpoint and data files. --merge-shards combines them.
+SHARD = None  # (i, n) with i from 1 to n
+
+# Shared by every request, so connections to the gateway are reused (see http_session)
+HTTP_SESSION = None
+
+# Response decoding: msgspec, orjson or json ("auto" picks the fastest installed, see abs_records.py)
+JSON_BACKEND = "auto"
+JSON_DECODER = None  # Created on first use (see json_decoder)
+
 # Rate Limiting Configuration
 MAX_REQUESTS_PER_MINUTE = 25
 RATE_LIMIT_WINDOW = 60
+REQUEST_TIMEOUT = 60  # Seconds before a single API request is abandoned
+
+# Live metrics configuration
+LATENCY_WINDOW = 200  # Latency percentiles cover this many recent requests
+THROUGHPUT_WINDOW = 60  # Requests per second and the ETA cover this many recent seconds
 
 # Checkpoint Configuration
 CHECKPOINT_FILE = "abs_fetch_checkpoint.json"
-CHECKPOINT_SAVE_INTERVAL = 50  # Save checkpoint every N requests
+SUMMARY_FILE = "abs_fetch_summary.json"  # Small sidecar read by the GUI status panel
+# Checkpoint updates are group-committed: saved once either budget is spent
+CHECKPOINT_SAVE_INTERVAL = 50  # Save after this many unsaved combination updates...
+CHECKPOINT_SAVE_SECONDS = 30  # ...or this many seconds after the oldest one, whichever comes first
+DATA_FILE_PREFIX = "abs_labour_force_ALL_DATA"  # Data files are <prefix>_<timestamp>.csv
 DATA_FRESHNESS_DAYS = 30  # Skip combinations fetched within this many days
 
+# Output Compression Configuration (set from --compress / --compress-level)
+OUTPUT_COMPRESSION = "none"  # "none", "gzip" or "zstd"
+COMPRESSION_LEVEL = None  # None uses the codec's default level
+
+# Progress Events Configuration
+# With --json-progress, one JSON object per line is written here (stdout) while
+# the human-readable log stays on stderr. The GUI reads this instead of parsing log text.
+EVENT_STREAM = None
+
+# Metrics Configuration
+# Point METRICS_FILE at node-exporter's textfile collector directory to scrape it (None disables)
+METRICS_FILE = "abs_fetch_metrics.prom"
+METRICS_FORMAT = "prometheus"  # "prometheus" or "openmetrics"
+METRICS_WRITE_INTERVAL = 30  # Seconds between metrics file updates during a run
+
+# Profiling Configuration
+# With --profile, each phase of the run gets a cProfile .prof file and an allocation report
+PROFILE = False
+
+# Run Report Configuration
+# Each run writes <data file prefix>_<timestamp>_report.json and appends it to the history
+RUN_HISTORY_FILE = "abs_fetch_history.jsonl"
+RUN_HISTORY_LIMIT = 500  # Reports kept in the history
+
+# Derived series (abs_derived.py, needs numpy)
+DERIVED_SERIES = True  # Update abs_derived_series.npz after each run
+VALIDATE_IDENTITIES = True  # Check cross-series identities on the derived series' values (abs_validation.py)
+VALIDATION_TOLERANCE = 0.001  # Allowed difference as a fraction of the total, plus a rounding allowance per data item
+
+# Revision tracking (abs_revisions.py)
+TRACK_REVISIONS = True  # Apply revised values to the dataset and log every vintage
+REVISION_FILE = "abs_revisions.jsonl"
+
+# Bounded-memory mode (--streaming, abs_external_sort.py)
+STREAMING = False  # Spill fetched records to sorted runs on disk instead of holding the dataset in memory
+STREAM_MEMORY_MB = 256  # Memory cap for buffered records in streaming mode
+STREAM_SPILL_DIR = None  # Folder for the sorted runs (None: the system temp folder)
+
+# Export fan-out (abs_export.py)
+EXPORT_FORMATS = ()  # e.g. ("jsonl", "parquet", "regions"); empty to skip the export stage
+EXPORT_DIR = "abs_exports"
+
+# Run-to-run changesets (abs_fingerprints.py)
+FINGERPRINTS = True  # Fingerprint each dataset and write a changeset against the previous one
+
+# Daemon Configuration (--daemon)
+DAEMON_INTERVAL_HOURS = 24  # Wake at least this often to fetch whatever has gone stale
+DAEMON_CONTROL_PORT = 8790  # Control socket, on 127.0.0.1 only
+RELEASE_TIME = "11:30"  # Local time the ABS publishes on a release date
+
 class RateLimiter:
     def __init__(self, max_requests, time_window):
         self.max_requests = max_requests
         self.time_window = time_window
         self.request_times = deque()
+        self.last_wait_seconds = 0.0
     
-    def wait_if_needed(self):
+    def wait_if_needed(self, cancel_token=None):
+        """
+        Block until a request may be made. Returns False if cancelled while waiting.
+        
+        The time spent blocked is kept in last_wait_seconds.
+        """
+        self.last_wait_seconds = 0.0
         now = time.time()
         while self.request_times and self.request_times[0] < now - self.time_window:
             self.request_times.popleft()
@@ -106,97 +215,644 @@ class RateLimiter:
             sleep_time = self.time_window - (now - self.request_times[0]) + 0.1
             if sleep_time > 0:
                 logging.info(f"Rate limit reached. Waiting {sleep_time:.1f} seconds...")
-                time.sleep(sleep_time)
+                if cancel_token is not None:
+                    cancelled = cancel_token.sleep(sleep_time)
+                else:
+                    time.sleep(sleep_time)
+                    cancelled = False
+                self.last_wait_seconds = time.time() - now
+                if cancelled:
+                    return False
                 now = time.time()
                 while self.request_times and self.request_times[0] < now - self.time_window:
                     self.request_times.popleft()
         
         self.request_times.append(now)
+        return True
 
 rate_limiter = RateLimiter(MAX_REQUESTS_PER_MINUTE, RATE_LIMIT_WINDOW)
 
+class FetchStats:
+    """
+    Request timings for one run, collected by fetch_endpoint().
+    
+    Latency is the network round trip only; time blocked in the rate limiter
+    is counted separately, so a slow run can be put down to one or the other.
+    Decoding time and records rejected by the dataset schema are kept too.
+    """
+    
+    def __init__(self):
+        self.requests = 0
+        self.bytes_received = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.finish_times = deque()
+        self.last_latency = 0.0
+        self.last_wait = 0.0
+        self.last_bytes = 0
+        self.decode_seconds = 0.0
+        self.decoded_bytes = 0
+        self.last_decode_seconds = 0.0
+        self.last_decode_bytes = 0
+        self.records_checked = 0
+        self.records_rejected = 0
+        self.rejections = {}
+    
+    def record_wait(self, seconds):
+        # Each request starts here, so the last decode figures belong to the request before
+        self.last_wait = seconds
+        self.last_decode_seconds = 0.0
+        self.last_decode_bytes = 0
+        self.rate_limit_wait_seconds += seconds
+    
+    def record_request(self, latency, size):
+        self.requests += 1
+        self.bytes_received += size
+        self.latencies.append(latency)
+        self.last_latency = latency
+        self.last_bytes = size
+        
+        now = time.time()
+        self.finish_times.append(now)
+        while self.finish_times and self.finish_times[0] < now - THROUGHPUT_WINDOW:
+            self.finish_times.popleft()
+    
+    def record_decode(self, seconds, size):
+        self.decode_seconds += seconds
+        self.decoded_bytes += size
+        self.last_decode_seconds = seconds
+        self.last_decode_bytes = size
+    
+    def record_check(self, checked, rejections):
+        self.records_checked += checked
+        for reason, count in rejections.items():
+            self.records_rejected += count
+            self.rejections[reason] = self.rejections.get(reason, 0) + count
+    
+    def decode_bytes_per_second(self):
+        if self.decode_seconds <= 0:
+            return None
+        return self.decoded_bytes / self.decode_seconds
+    
+    def rejection_rate(self):
+        """Fraction of the records received that failed the schema."""
+        if not self.records_checked:
+            return 0.0
+        return self.records_rejected / self.records_checked
+    
+    def requests_per_second(self):
+        """Request rate over the last THROUGHPUT_WINDOW seconds."""
+        now = time.time()
+        while self.finish_times and self.finish_times[0] < now - THROUGHPUT_WINDOW:
+            self.finish_times.popleft()
+        if len(self.finish_times) < 2:
+            return 0.0
+        return (len(self.finish_times) - 1) / max(now - self.finish_times[0], 1e-6)
+    
+    def snapshot(self):
+        """Current figures, as progress event fields."""
+        latencies = sorted(self.latencies)
+        
+        def percentile(q):
+            if not latencies:
+                return None
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+        
+        return {
+            "requests_per_second": self.requests_per_second(),
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+            "rate_limit_wait_seconds": self.rate_limit_wait_seconds,
+            "bytes_received": self.bytes_received
+        }
+
+class CancellationToken:
+    """
+    Cooperative stop and pause signal for a FetchRunner.
+    
+    cancel(), pause() and resume() may be called from any thread. The runner
+    checks the token between requests and while waiting on the rate limiter.
+    """
+    
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+    
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # Wake a paused runner so it can stop
+    
+    def pause(self):
+        self._running.clear()
+    
+    def resume(self):
+        self._running.set()
+    
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+    
+    @property
+    def paused(self):
+        return not self._running.is_set()
+    
+    def wait_while_paused(self):
+        self._running.wait()
+    
+    def sleep(self, seconds):
+        """Sleep for up to seconds. Returns True if cancelled meanwhile."""
+        return self._cancelled.wait(seconds)
+
+def make_event(event, **fields):
+    """Build a machine-readable progress event."""
+    payload = {"event": event, "time": time.time()}
+    payload.update(fields)
+    return payload
+
+def emit_event(event, **fields):
+    """Write a machine-readable progress event as a single JSON line."""
+    if EVENT_STREAM is None:
+        return
+    EVENT_STREAM.write(json.dumps(make_event(event, **fields)) + "\n")
+    EVENT_STREAM.flush()
+
+class FetchMetrics:
+    """
+    Prometheus metrics for one run.
+    
+    Written to METRICS_FILE every METRICS_WRITE_INTERVAL seconds during the
+    run and once more when it ends.
+    """
+    
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        registry = self.registry
+        self.requests = registry.counter(
+            "abs_fetch_requests_total", "API requests by outcome", ["status"])
+        self.latency = registry.histogram(
+            "abs_fetch_request_latency_seconds", "API request round trip time", LATENCY_BUCKETS)
+        self.payload_bytes = registry.histogram(
+            "abs_fetch_response_bytes", "API response payload size", BYTES_BUCKETS)
+        self.rate_limit_wait = registry.counter(
+            "abs_fetch_rate_limit_wait_seconds_total", "Time spent blocked by the rate limiter")
+        self.merge_seconds = registry.histogram(
+            "abs_fetch_merge_seconds", "Time merging one response into the dataset", DURATION_BUCKETS)
+        self.records_added = registry.counter(
+            "abs_fetch_records_added_total", "New records added to the dataset")
+        self.decode_seconds = registry.counter(
+            "abs_fetch_decode_seconds_total", "Time decoding response bodies")
+        self.decoded_bytes = registry.counter(
+            "abs_fetch_decoded_bytes_total", "Response bytes decoded")
+        self.records_rejected = registry.counter(
+            "abs_fetch_records_rejected_total", "Records dropped for failing the dataset schema", ["reason"])
+        self.checkpoint_save_seconds = registry.histogram(
+            "abs_fetch_checkpoint_save_seconds", "Time saving the checkpoint", DURATION_BUCKETS)
+        self.run_start = registry.gauge(
+            "abs_fetch_run_start_timestamp_seconds", "When the current or last run started")
+        self.run_finished = registry.gauge(
+            "abs_fetch_run_finished", "1 once the run has ended, 0 while it is running")
+        self.validation_violations = registry.gauge(
+            "abs_fetch_validation_violations", "Series breaking a consistency identity in the last check")
+        self.updated = registry.gauge(
+            "abs_fetch_metrics_updated_timestamp_seconds", "When this file was last written")
+        self.run_start.set(time.time())
+        self.run_finished.set(0)
+        self.last_written = None
+    
+    def write(self, force=False):
+        """Write the metrics file, at most once per METRICS_WRITE_INTERVAL unless forced."""
+        if METRICS_FILE is None:
+            return
+        now = time.time()
+        if not force and self.last_written is not None and now - self.last_written < METRICS_WRITE_INTERVAL:
+            return
+        self.updated.set(now)
+        try:
+            self.registry.write_textfile(METRICS_FILE, openmetrics=(METRICS_FORMAT == "openmetrics"))
+        except OSError as e:
+            logging.warning(f"Could not write metrics file {METRICS_FILE}: {e}")
+        self.last_written = now
+
+def peak_rss_bytes():
+    """Peak resident memory of this process in bytes, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def save_run_report(report, report_file):
+    """Write a run report and append it to the rolling history."""
+    with atomic_write(report_file) as f:
+        json.dump(report, f, indent=2)
+    
+    history = []
+    if os.path.exists(RUN_HISTORY_FILE):
+        with open(RUN_HISTORY_FILE, 'r') as f:
+            history = [line for line in f if line.strip()]
+    history.append(json.dumps(report) + "\n")
+    
+    # Rewritten atomically so a crash can't truncate the history
+    with atomic_write(RUN_HISTORY_FILE) as f:
+        f.writelines(history[-RUN_HISTORY_LIMIT:])
+
 def get_combination_key(region, data_item, age, sex, adjustment_type):
     """Generate unique key for a data combination."""
     return f"{region}_{data_item}_{age}_{sex}_{adjustment_type}"
 
+def load_grid(path=None):
+    """
+    Replace the grid lists with those from the grid file, if it exists.
+    
+    Returns the file used, or None. Raises ValueError for an invalid file.
+    """
+    path = path or GRID_FILE
+    if not os.path.exists(path):
+        return None
+    
+    with open(path, 'r') as f:
+        config = json.load(f)
+    
+    unknown = sorted(set(config) - set(GRID_FIELDS))
+    if unknown:
+        raise ValueError(f"{path}: unknown grid field(s) {', '.join(unknown)}")
+    for field, name in GRID_FIELDS.items():
+        if field not in config:
+            continue
+        values = config[field]
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"{path}: '{field}' must be a non-empty list")
+        globals()[name] = [str(value) for value in values]
+    return path
+
+def parse_shard(text):
+    """Parse an 'i/n' shard spec into (i, n)."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/n, e.g. 1/3 (got {text!r})")
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard {text}: i must be between 1 and n")
+    return index, count
+
+def shard_name(shard):
+    return f"shard{shard[0]}of{shard[1]}"
+
+def in_shard(combination_key, shard):
+    """
+    Whether a combination belongs to a shard.
+    
+    Uses crc32 of the key rather than hash(), so every machine splits the
+    grid the same way regardless of Python version or hash seed.
+    """
+    if shard is None:
+        return True
+    return zlib.crc32(combination_key.encode("utf-8")) % shard[1] == shard[0] - 1
+
+def use_shard(shard):
+    """Fetch only one shard of the grid, into the shard's own checkpoint and data files."""
+    global SHARD, CHECKPOINT_FILE, SUMMARY_FILE, DATA_FILE_PREFIX, RUN_HISTORY_FILE
+    SHARD = shard
+    name = shard_name(shard)
+    CHECKPOINT_FILE = f"abs_fetch_checkpoint_{name}.json"
+    SUMMARY_FILE = f"abs_fetch_summary_{name}.json"
+    DATA_FILE_PREFIX = f"abs_labour_force_{name}"
+    RUN_HISTORY_FILE = f"abs_fetch_history_{name}.jsonl"
+
+def iter_combinations(shard=None, dataset=None):
+    """
+    Lazily yield (parameter values..., key) for a dataset's grid, or one shard of it.
+    
+    For the labour force dataset (the default) that is (region, data_item,
+    age, sex, adjustment_type, key).
+    """
+    dataset = dataset or LABOUR_FORCE
+    for combination in itertools.product(*dataset.param_values()):
+        key = dataset.combination_key(combination)
+        if in_shard(key, shard):
+            yield combination + (key,)
+
+def spelled_code(description):
+    """The grid code a description spells out: "New South Wales" -> NEW_SOUTH_WALES."""
+    return re.sub(r"[^A-Z0-9]+", "_", description.upper()).strip("_")
+
+def series_codes(checkpoint, keys=()):
+    """
+    Series key (record descriptions) -> grid codes (region, data item, age, sex, adjustment type).
+
+    Series that a completed labour force combination recorded when it was
+    fetched map to that combination's codes. Other series in keys (those
+    fetched before combinations recorded their series, and still fresh)
+    are mapped field by field against the loaded grid: through the
+    description a recorded series used for the same code, or else the
+    code the description spells out. Keys with a field that matches no
+    grid value are left out.
+    """
+    codes = {}
+    known = [{} for _ in SERIES_FIELDS]  # Per field: description -> code, from the recorded series
+    completed = checkpoint["completed_combinations"]
+    for entry in iter_combinations():
+        series = (completed.get(entry[-1]) or {}).get("series")
+        if series:
+            codes[tuple(series)] = tuple(entry[:-1])
+            for lookup, description, code in zip(known, series, entry[:-1]):
+                lookup[description] = code
+    
+    spelled = [{spelled_code(value): value for value in values} for values in LABOUR_FORCE.param_values()]
+    for key in keys:
+        if key in codes:
+            continue
+        mapped = tuple(lookup.get(description) or grid.get(spelled_code(description))
+                       for description, lookup, grid in zip(key, known, spelled))
+        if None not in mapped:
+            codes[key] = mapped
+    return codes
+
+class LabourForceDataset(Dataset):
+    """
+    The built-in labour force dataset.
+    
+    The grid lists, BASE_URL and DATA_FILE_PREFIX are read when used, so
+    --grid, --shard and scripts that change them keep working. Combination
+    keys keep their original, unprefixed form.
+    """
+    
+    labour_force_steps = True
+    
+    def __init__(self):
+        key_fields = SERIES_FIELDS + ("observation_month",)
+        schema = RecordSchema(dict({field: "text" for field in SERIES_FIELDS},
+                                   observation_month="month", observation_value="number"),
+                              required=key_fields)  # Values may be null (blank) for suppressed months
+        super().__init__("labour_force", BASE_URL, [], "labour_force_statistics", key_fields,
+                         file_stem="abs_labour_force", schema=schema)
+    
+    @property
+    def url(self):
+        return BASE_URL
+    
+    @property
+    def param_names(self):
+        return ["region", "data_item", "age", "sex", "adjustment_type"]
+    
+    def param_values(self):
+        return [REGIONS, DATA_ITEMS, AGE_GROUPS, SEX_VALUES, ADJUSTMENT_TYPES]
+    
+    def combination_key(self, values):
+        return get_combination_key(*values)
+    
+    def label(self, values):
+        region, data_item, age, sex, adjustment_type = values
+        return f"{region}/{data_item}/{sex}/{adjustment_type}"
+    
+    def data_file_prefix(self, shard_name=None):
+        # use_shard() already points DATA_FILE_PREFIX at the shard's files
+        return DATA_FILE_PREFIX
+    
+    def record_key(self, record):
+        return record_key(record)
+    
+    def extract_records(self, data):
+        return extract_records_from_response(data)
+
+LABOUR_FORCE = register(LabourForceDataset())
+
+def dataset_checkpoint(checkpoint, dataset):
+    """
+    The part of the checkpoint holding one dataset's combinations.
+    
+    The labour force dataset uses the checkpoint itself, as it always has;
+    other datasets get a section of the same shape under "datasets".
+    """
+    if dataset is LABOUR_FORCE:
+        return checkpoint
+    sections = checkpoint.setdefault("datasets", {})
+    if dataset.name not in sections:
+        sections[dataset.name] = empty_checkpoint()
+    return sections[dataset.name]
+
+def empty_checkpoint():
+    """Return an empty checkpoint structure."""
+    return {
+        "completed_combinations": {},
+        "last_run": None,
+        "total_records": 0,
+        "last_checkpoint_save": None,
+        "summary": empty_summary()
+    }
+
+def empty_summary():
+    """Return empty aggregates for the checkpoint summary."""
+    return {
+        "status_counts": {},
+        "latest_month": None,
+        "total_combinations": None
+    }
+
+def rebuild_summary(checkpoint):
+    """Recompute the summary aggregates from every combination (old checkpoints only)."""
+    summary = empty_summary()
+    summary["total_combinations"] = checkpoint.get("summary", {}).get("total_combinations")
+    for combo_data in checkpoint["completed_combinations"].values():
+        update_summary(summary, None, combo_data)
+    checkpoint["summary"] = summary
+
+def update_summary(summary, old_entry, new_entry):
+    """Apply one combination's status change to the summary aggregates."""
+    counts = summary["status_counts"]
+    if old_entry is not None:
+        old_status = old_entry.get("status")
+        counts[old_status] = counts.get(old_status, 1) - 1
+    new_status = new_entry.get("status")
+    counts[new_status] = counts.get(new_status, 0) + 1
+    
+    latest_month = new_entry.get("latest_month")
+    if latest_month and (summary["latest_month"] is None or latest_month > summary["latest_month"]):
+        summary["latest_month"] = latest_month
+
+def set_combination_status(checkpoint, combo_key, entry):
+    """Record a combination's result in the checkpoint, keeping the summary up to date."""
+    old_entry = checkpoint["completed_combinations"].get(combo_key)
+    checkpoint["completed_combinations"][combo_key] = entry
+    update_summary(checkpoint["summary"], old_entry, entry)
+
 def load_checkpoint():
     """Load checkpoint from file, or return empty checkpoint structure."""
-    if not os.path.exists(CHECKPOINT_FILE):
+    checkpoint_path = find_existing_variant(CHECKPOINT_FILE)
+    if checkpoint_path is None:
         logging.info("No checkpoint file found. Starting fresh.")
-        return {
-            "completed_combinations": {},
-            "last_run": None,
-            "total_records": 0,
-            "last_checkpoint_save": None
-        }
+        return empty_checkpoint()
     
     try:
-        with open(CHECKPOINT_FILE, 'r') as f:
+        with open_data_file(checkpoint_path, 'r') as f:
             checkpoint = json.load(f)
+        if "summary" not in checkpoint:
+            rebuild_summary(checkpoint)
         logging.info(f"Loaded checkpoint with {len(checkpoint['completed_combinations'])} completed combinations")
         return checkpoint
     except Exception as e:
-        logging.error(f"Error loading checkpoint: {e}. Starting fresh.")
-        return {
-            "completed_combinations": {},
-            "last_run": None,
-            "total_records": 0,
-            "last_checkpoint_save": None
-        }
+        # Keep the unreadable file for inspection rather than overwriting it at the next save
+        corrupt_path = checkpoint_path + ".corrupt"
+        try:
+            os.replace(checkpoint_path, corrupt_path)
+            logging.error(f"Error loading checkpoint: {e}. Moved it to {corrupt_path} - starting fresh.")
+        except OSError:
+            logging.error(f"Error loading checkpoint: {e}. Starting fresh.")
+        return empty_checkpoint()
+
+def save_summary(checkpoint):
+    """Write the small status summary the GUI reads instead of the full checkpoint."""
+    summary = checkpoint["summary"]
+    status = {
+        "last_run": checkpoint.get("last_run"),
+        "last_checkpoint_save": checkpoint.get("last_checkpoint_save"),
+        "total_records": checkpoint.get("total_records", 0),
+        "completed": len(checkpoint["completed_combinations"]),
+        "status_counts": summary["status_counts"],
+        "latest_month": summary["latest_month"],
+        "total_combinations": summary["total_combinations"]
+    }
+    with atomic_write(SUMMARY_FILE) as f:
+        json.dump(status, f, indent=2)
 
 def save_checkpoint(checkpoint):
-    """Save checkpoint to file."""
+    """Save checkpoint to file, atomically: a crash leaves the previous checkpoint intact."""
     try:
         checkpoint["last_checkpoint_save"] = datetime.now().isoformat()
-        with open(CHECKPOINT_FILE, 'w') as f:
+        checkpoint_path = compressed_name(CHECKPOINT_FILE, OUTPUT_COMPRESSION)
+        with atomic_write(checkpoint_path, level=COMPRESSION_LEVEL) as f:
             json.dump(checkpoint, f, indent=2)
+        
+        # Remove copies left behind by a previous run with a different compression
+        for suffix in COMPRESSION_SUFFIXES.values():
+            stale_path = CHECKPOINT_FILE + suffix
+            if stale_path != checkpoint_path and os.path.exists(stale_path):
+                os.remove(stale_path)
+        
+        save_summary(checkpoint)
         logging.debug("Checkpoint saved")
     except Exception as e:
         logging.error(f"Error saving checkpoint: {e}")
 
-def is_combination_fresh(checkpoint, combination_key, freshness_days=DATA_FRESHNESS_DAYS):
-    """Check if a combination was fetched recently and doesn't need re-fetching."""
-    if combination_key not in checkpoint["completed_combinations"]:
-        return False
+def combination_state(combo_data, fresh_after):
+    """
+    Classify a combination's checkpoint entry for planning.
+    
+    Returns "new" (never fetched), "not_available" (404 - never retried),
+    "retry" (failed last time), "stale" (fetched on or before fresh_after)
+    or "fresh".
+    """
+    if combo_data is None:
+        return "new"
     
-    combo_data = checkpoint["completed_combinations"][combination_key]
     status = combo_data.get("status")
     
     # If data is not available in the API, don't retry it
     if status == "not_available":
-        return True
+        return "not_available"
     
     # Only check freshness for completed fetches
     if status != "completed":
-        return False
+        return "retry"
     
     fetched_at_str = combo_data.get("fetched_at")
     if not fetched_at_str:
-        return False
+        return "stale"
     
     try:
-        fetched_at = datetime.fromisoformat(fetched_at_str)
-        age_days = (datetime.now() - fetched_at).days
-        return age_days < freshness_days
-    except:
-        return False
+        return "fresh" if datetime.fromisoformat(fetched_at_str) > fresh_after else "stale"
+    except (TypeError, ValueError):
+        return "stale"
+
+def is_combination_fresh(checkpoint, combination_key, freshness_days=None):
+    """Check if a combination was fetched recently and doesn't need re-fetching (default: DATA_FRESHNESS_DAYS)."""
+    if freshness_days is None:
+        freshness_days = DATA_FRESHNESS_DAYS
+    fresh_after = datetime.now() - timedelta(days=freshness_days)
+    state = combination_state(checkpoint["completed_combinations"].get(combination_key), fresh_after)
+    return state in ("fresh", "not_available")
+
+class FetchPlan:
+    """
+    The combinations a run will fetch, decided once from the checkpoint.
+    Covers the whole grid, or one shard of it.
+    
+    Every combination in the dataset's grid (labour force by default) is keyed and classified exactly once (see
+    combination_state); "new", "stale" and "retry" ones are fetched, in grid
+    order. fresh_after moves the freshness cutoff later (e.g. to the latest
+    ABS release), so anything fetched before it is due again.
+    """
+    
+    FETCH_STATES = ("new", "stale", "retry")
+    
+    def __init__(self, checkpoint, freshness_days=None, shard=None, fresh_after=None, dataset=None):
+        # Read when called, so --freshness-days (set after import) applies
+        if freshness_days is None:
+            freshness_days = DATA_FRESHNESS_DAYS
+        self.freshness_days = freshness_days
+        self.counts = {"new": 0, "stale": 0, "retry": 0, "fresh": 0, "not_available": 0}
+        self.to_fetch = []  # (parameter values..., combination key), see iter_combinations
+        self.total = 0
+        
+        completed = checkpoint["completed_combinations"]
+        cutoff = datetime.now() - timedelta(days=freshness_days)
+        if fresh_after is not None and fresh_after > cutoff:
+            cutoff = fresh_after
+        for entry in iter_combinations(shard, dataset):
+            state = combination_state(completed.get(entry[-1]), cutoff)
+            self.counts[state] += 1
+            if state in self.FETCH_STATES:
+                self.to_fetch.append(entry)
+            self.total += 1
+    
+    @property
+    def skip_count(self):
+        """Combinations that won't be requested (fresh or known unavailable)."""
+        return self.total - len(self.to_fetch)
+    
+    @property
+    def estimated_seconds(self):
+        """Minimum duration at the rate limit."""
+        return len(self.to_fetch) * 60 / MAX_REQUESTS_PER_MINUTE
+    
+    def describe(self):
+        """Human-readable plan, as printed by --dry-run."""
+        minutes = self.estimated_seconds / 60
+        lines = [
+            f"Total combinations: {self.total}",
+            f"  Fresh (< {self.freshness_days} days old): {self.counts['fresh']}",
+            f"  Not available in API: {self.counts['not_available']}",
+            f"  New: {self.counts['new']}",
+            f"  Stale: {self.counts['stale']}",
+            f"  Failed last time (retry): {self.counts['retry']}",
+            f"Combinations to fetch: {len(self.to_fetch)}",
+            f"Estimated time: {minutes:.1f} minutes ({minutes/60:.1f} hours) at {MAX_REQUESTS_PER_MINUTE} requests/minute"
+        ]
+        
+        by_region = {}
+        for entry in self.to_fetch:
+            by_region[entry[0]] = by_region.get(entry[0], 0) + 1
+        if by_region:
+            lines.append("To fetch by region:")
+            lines += [f"  {region}: {count}" for region, count in by_region.items()]
+        return "\n".join(lines)
 
-def load_existing_data(checkpoint):
+def load_existing_data(checkpoint, prefix=None):
     """Load existing data from previous runs based on checkpoint."""
     all_data = []
     
     # Find the most recent FIXED CSV file
-    import glob
-    fixed_files = glob.glob("abs_labour_force_ALL_DATA_*_FIXED.csv")
-    if not fixed_files:
+    most_recent = find_latest_dataset(prefix or DATA_FILE_PREFIX)
+    if most_recent is None:
         logging.info("No existing data files found")
         return all_data
     
-    most_recent = max(fixed_files, key=os.path.getctime)
     logging.info(f"Loading existing data from: {most_recent}")
     
     try:
-        with open(most_recent, 'r', encoding='utf-8') as f:
+        with open_data_file(most_recent, 'r') as f:
             reader = csv.DictReader(f)
             for row in reader:
                 all_data.append(row)
@@ -206,11 +862,24 @@ def load_existing_data(checkpoint):
     
     return all_data
 
-def fetch_data(region, data_item, age, sex, adjustment_type):
-    """Fetch data from API."""
-    rate_limiter.wait_if_needed()
-    
-    endpoint = BASE_URL
+def http_session():
+    """The requests Session shared by every dataset, created on first use."""
+    global HTTP_SESSION
+    if HTTP_SESSION is None:
+        # Imported here so runs with nothing to fetch (and --dry-run) never load it
+        import requests
+        HTTP_SESSION = requests.Session()
+    return HTTP_SESSION
+
+def json_decoder():
+    """The JsonDecoder for JSON_BACKEND, created (and its JSON library imported) on first use."""
+    global JSON_DECODER
+    if JSON_DECODER is None:
+        JSON_DECODER = JsonDecoder(JSON_BACKEND)
+    return JSON_DECODER
+
+def fetch_data(region, data_item, age, sex, adjustment_type, api_key=None, cancel_token=None, stats=None):
+    """Fetch one labour force combination from the API. Timings are recorded in stats (a FetchStats) if given."""
     params = {
         "region": region,
         "data_item": data_item,
@@ -218,27 +887,61 @@ def fetch_data(region, data_item, age, sex, adjustment_type):
         "sex": sex,
         "adjustment_type": adjustment_type
     }
+    return fetch_endpoint(BASE_URL, params, f"{region}/{data_item}/{age}/{sex}/{adjustment_type}",
+                          api_key, cancel_token, stats)
+
+def fetch_endpoint(endpoint, params, label, api_key=None, cancel_token=None, stats=None):
+    """
+    Fetch one combination from any gateway endpoint, through the shared session and rate limiter.
+    
+    Returns the decoded response, "NOT_AVAILABLE" (404), "CANCELLED" or
+    None on any other error.
+    """
+    import requests
+    
+    allowed = rate_limiter.wait_if_needed(cancel_token)
+    if stats is not None:
+        stats.record_wait(rate_limiter.last_wait_seconds)
+    if not allowed:
+        return "CANCELLED"
     
     headers = {
         "accept": "application/json",
-        "apikey": API_KEY
+        "apikey": api_key or API_KEY
     }
     
+    request_start = time.perf_counter()
+    response = None
+    latency = None
     try:
-        response = requests.get(endpoint, params=params, headers=headers)
+        response = http_session().get(endpoint, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        latency = time.perf_counter() - request_start
         response.raise_for_status()
-        return response.json()
+        decode_start = time.perf_counter()
+        data = json_decoder().decode(response.content)
+        if stats is not None:
+            stats.record_decode(time.perf_counter() - decode_start, len(response.content))
+        return data
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
             # 404 means this combination doesn't exist - not an error, just unavailable
-            logging.debug(f"Data not available for {region}/{data_item}/{age}/{sex}/{adjustment_type}")
+            logging.debug(f"Data not available for {label}")
             return "NOT_AVAILABLE"
         else:
-            logging.error(f"Error fetching {region}/{data_item}/{age}/{sex}/{adjustment_type}: {e}")
+            logging.error(f"Error fetching {label}: {e}")
             return None
     except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching {region}/{data_item}/{age}/{sex}/{adjustment_type}: {e}")
+        logging.error(f"Error fetching {label}: {e}")
+        return None
+    except ValueError as e:
+        logging.error(f"Error fetching {label}: invalid JSON ({e})")
         return None
+    finally:
+        if stats is not None:
+            if latency is None:
+                latency = time.perf_counter() - request_start
+            size = len(response.content) if response is not None else 0
+            stats.record_request(latency, size)
 
 def extract_records_from_response(data):
     """Extract records from API response."""
@@ -263,42 +966,60 @@ def get_latest_observation_month(records):
     
     return max(months)
 
-def merge_new_records(existing_data, new_records, combination_key):
-    """Merge new records with existing data, avoiding duplicates."""
-    # Create a set of existing record keys for quick lookup
-    existing_keys = set()
-    for record in existing_data:
-        # Create a unique key for each record
-        key = (
-            record.get('region_description', ''),
-            record.get('data_item_description', ''),
-            record.get('age_description', ''),
-            record.get('sex_description', ''),
-            record.get('adjustment_type_description', ''),
-            record.get('observation_month', '')
-        )
-        existing_keys.add(key)
-    
-    # Add only new records
+def record_key(record):
+    """Unique key of an observation: its series and month."""
+    return (
+        record.get('region_description', ''),
+        record.get('data_item_description', ''),
+        record.get('age_description', ''),
+        record.get('sex_description', ''),
+        record.get('adjustment_type_description', ''),
+        record.get('observation_month', '')
+    )
+
+def merge_new_records(existing_data, new_records, combination_key, existing_keys=None, revisions=None, key=None):
+    """
+    Merge new records with existing data, avoiding duplicates.
+    
+    existing_keys holds the record keys already in existing_data. Pass the
+    same one on every call to keep it up to date instead of rebuilding it.
+    key gives a record's natural key (record_key by default).
+    
+    Without a revisions list the first value seen for a key is kept, and
+    existing_keys can be a set. With one, existing_keys must map keys to
+    their records: a record whose value differs from the one held updates
+    it in place, and (record, previous value) is appended to revisions.
+    """
+    key = key or record_key
+    if existing_keys is None:
+        # Index existing record keys for quick lookup
+        if revisions is None:
+            existing_keys = {key(record) for record in existing_data}
+        else:
+            existing_keys = {key(record): record for record in existing_data}
+    
+    # Add new records (and apply revised values if tracking revisions)
     added_count = 0
     for record in new_records:
-        key = (
-            record.get('region_description', ''),
-            record.get('data_item_description', ''),
-            record.get('age_description', ''),
-            record.get('sex_description', ''),
-            record.get('adjustment_type_description', ''),
-            record.get('observation_month', '')
-        )
-        if key not in existing_keys:
+        new_key = key(record)
+        if new_key not in existing_keys:
             existing_data.append(record)
-            existing_keys.add(key)
+            if revisions is None:
+                existing_keys.add(new_key)
+            else:
+                existing_keys[new_key] = record
             added_count += 1
+        elif revisions is not None:
+            existing = existing_keys[new_key]
+            value = record.get('observation_value', '')
+            if existing.get('observation_value', '') != value:
+                revisions.append((existing, existing.get('observation_value', '')))
+                existing['observation_value'] = value
     
     return added_count
 
 def save_to_csv(all_data, filename):
-    """Save data to CSV file."""
+    """Save data to CSV file (written to a temporary file and renamed into place)."""
     if not all_data:
         logging.warning("No data to save")
         return
@@ -310,7 +1031,7 @@ def save_to_csv(all_data, filename):
     
     fieldnames = sorted(list(fieldnames))
     
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+    with atomic_write(filename, level=COMPRESSION_LEVEL, newline='') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
         
@@ -320,173 +1041,1415 @@ def save_to_csv(all_data, filename):
     
     logging.info(f"Data saved to {filename}")
 
-def main():
-    logging.info("="*70)
-    logging.info("Starting Automated ABS Data Fetch (with Checkpoint Support)")
-    logging.info("="*70)
+def append_to_dataset(dataset_file, records):
+    """
+    Append records to an existing _FIXED.csv file instead of rewriting it.
+    
+    Returns False (and writes nothing) when that isn't possible: the records
+    have a column the file lacks, or the file is zstd (readers stop at the
+    first zstd frame, so appended frames would be lost). The file is synced
+    to disk before returning.
+    """
+    if compression_for_path(dataset_file) == "zstd":
+        return False
+    with open_data_file(dataset_file, 'r', newline='') as f:
+        header = next(csv.reader(f), None)
+    if not header or any(set(record) - set(header) for record in records):
+        return False
+    
+    with open_data_file(dataset_file, 'a', level=COMPRESSION_LEVEL, newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=header)
+        writer.writerows(records)
+    fsync_file(dataset_file)
+    return True
+
+class WarmState:
+    """
+    Checkpoint, dataset and record index kept in memory between runs (daemon mode).
+    
+    A FetchRunner given a WarmState uses whatever it holds instead of
+    reloading from disk, and leaves its own state there when it finishes.
+    """
+    
+    def __init__(self):
+        self.checkpoint = None
+        self.all_data = None
+        self.record_keys = None
+        self.dataset_file = None
+
+def run_csv_fixer(filename):
+    """Run the CSV fixer on a raw data file, in-process. Returns the _FIXED file, or None."""
+    logging.info("Running CSV formatter...")
+    try:
+        import fix_abs_csv
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            fixed_file = fix_abs_csv.fix_csv(filename, OUTPUT_COMPRESSION, COMPRESSION_LEVEL)
+        if fixed_file:
+            logging.info("✅ CSV formatting completed")
+            logging.info(output.getvalue())
+        else:
+            logging.error(f"CSV formatting failed: {output.getvalue()}")
+        return fixed_file
+    except Exception as e:
+        logging.error(f"Error running CSV formatter: {e}")
+        return None
+
+def merge_shards():
+    """
+    Combine every shard's checkpoint and latest dataset into the main ones.
+    
+    For a combination in several checkpoints, the most recent fetch wins;
+    for a record in several datasets, the newest file wins. The existing
+    main dataset is kept as the base. Returns the merged data file, or None.
+    """
+    shard_checkpoints = sorted({strip_compression_suffix(path) for path in glob.glob("abs_fetch_checkpoint_shard*of*.json*")})
+    if not shard_checkpoints:
+        logging.error("❌ No shard checkpoints found (abs_fetch_checkpoint_shard<i>of<n>.json)")
+        return None
     
-    # Load checkpoint
     checkpoint = load_checkpoint()
+    sources = []
+    for base_name in shard_checkpoints:
+        name = base_name[len("abs_fetch_checkpoint_"):-len(".json")]
+        with open_data_file(find_existing_variant(base_name), 'r') as f:
+            shard_checkpoint = json.load(f)
+        merged = 0
+        for key, entry in shard_checkpoint["completed_combinations"].items():
+            current = checkpoint["completed_combinations"].get(key)
+            if current is None or entry.get("fetched_at", "") >= current.get("fetched_at", ""):
+                set_combination_status(checkpoint, key, entry)
+                merged += 1
+        logging.info(f"Merged {merged} combinations from {name}")
+        
+        dataset = find_latest_dataset(f"abs_labour_force_{name}")
+        if dataset:
+            sources.append(dataset)
+        else:
+            logging.warning(f"No data file found for {name}")
     
-    # Load existing data for incremental updates
-    all_data = load_existing_data(checkpoint)
-    initial_record_count = len(all_data)
-    
-    total_combinations = len(REGIONS) * len(DATA_ITEMS) * len(AGE_GROUPS) * len(SEX_VALUES) * len(ADJUSTMENT_TYPES)
-    
-    # Count how many combinations are already fresh
-    fresh_count = 0
-    for region in REGIONS:
-        for data_item in DATA_ITEMS:
-            for age in AGE_GROUPS:
-                for sex in SEX_VALUES:
-                    for adj_type in ADJUSTMENT_TYPES:
-                        combo_key = get_combination_key(region, data_item, age, sex, adj_type)
-                        if is_combination_fresh(checkpoint, combo_key):
-                            fresh_count += 1
-    
-    combinations_to_fetch = total_combinations - fresh_count
-    estimated_minutes = combinations_to_fetch / MAX_REQUESTS_PER_MINUTE
-    
-    logging.info(f"Total combinations: {total_combinations}")
-    logging.info(f"Already up-to-date (< {DATA_FRESHNESS_DAYS} days old): {fresh_count}")
-    logging.info(f"Combinations to fetch: {combinations_to_fetch}")
-    logging.info(f"Estimated time: {estimated_minutes:.1f} minutes ({estimated_minutes/60:.1f} hours)")
-    logging.info(f"Starting with {initial_record_count} existing records")
-    
-    successful_requests = 0
-    failed_requests = 0
-    skipped_requests = 0
-    new_records_added = 0
-    start_time = time.time()
-    current_request = 0
-    
-    for region in REGIONS:
-        for data_item in DATA_ITEMS:
-            for age in AGE_GROUPS:
-                for sex in SEX_VALUES:
-                    for adj_type in ADJUSTMENT_TYPES:
-                        current_request += 1
-                        combo_key = get_combination_key(region, data_item, age, sex, adj_type)
-                        
-                        # Check if combination is fresh and can be skipped
-                        if is_combination_fresh(checkpoint, combo_key):
-                            skipped_requests += 1
-                            if current_request % 100 == 0:
-                                progress = (current_request / total_combinations) * 100
-                                logging.info(f"Progress: [{current_request}/{total_combinations}] ({progress:.1f}%) - Skipped {skipped_requests} fresh")
-                            continue
-                        
-                        # Log progress periodically
-                        if (successful_requests + failed_requests) % 50 == 0 and (successful_requests + failed_requests) > 0:
-                            progress = (current_request / total_combinations) * 100
-                            logging.info(f"Progress: [{current_request}/{total_combinations}] ({progress:.1f}%) - Fetched: {successful_requests}, Failed: {failed_requests}, Skipped: {skipped_requests}")
-                        
-                        # Fetch data
-                        data = fetch_data(region, data_item, age, sex, adj_type)
-                        
-                        if data == "NOT_AVAILABLE":
-                            # This combination doesn't exist in the API (404)
-                            checkpoint["completed_combinations"][combo_key] = {
-                                "status": "not_available",
-                                "fetched_at": datetime.now().isoformat()
-                            }
-                            skipped_requests += 1
-                            logging.info(f"🚫 {region}/{data_item}/{sex}/{adj_type}: Not available in API")
-                        elif data:
-                            records = extract_records_from_response(data)
-                            
-                            if records:
-                                # Merge with existing data (avoid duplicates)
-                                added = merge_new_records(all_data, records, combo_key)
-                                new_records_added += added
-                                
-                                # Update checkpoint
-                                latest_month = get_latest_observation_month(records)
-                                checkpoint["completed_combinations"][combo_key] = {
-                                    "status": "completed",
-                                    "records": len(records),
-                                    "latest_month": latest_month,
-                                    "fetched_at": datetime.now().isoformat()
-                                }
-                                checkpoint["total_records"] = len(all_data)
-                                
-                                successful_requests += 1
-                                
-                                # Log success with details
-                                logging.info(f"✅ {region}/{data_item}/{sex}/{adj_type}: {len(records)} records (latest: {latest_month})")
-                                
-                                # Save checkpoint periodically
-                                if (successful_requests + failed_requests) % CHECKPOINT_SAVE_INTERVAL == 0:
-                                    save_checkpoint(checkpoint)
-                                    logging.info(f"💾 Checkpoint saved ({successful_requests} successful, {failed_requests} failed)")
-                            else:
-                                logging.warning(f"No records in response for {combo_key}")
-                                failed_requests += 1
-                        else:
-                            failed_requests += 1
-                            # Mark as failed in checkpoint but don't block retry
-                            checkpoint["completed_combinations"][combo_key] = {
-                                "status": "failed",
-                                "fetched_at": datetime.now().isoformat()
-                            }
-    
-    elapsed_time = (time.time() - start_time) / 60
-    
-    # Final checkpoint save
+    # Newest first, so the first copy of a record seen is the one kept
+    sources.sort(key=os.path.getmtime, reverse=True)
+    base_dataset = find_latest_dataset(DATA_FILE_PREFIX)
+    if base_dataset:
+        sources.append(base_dataset)
+    
+    all_data = []
+    seen = set()
+    for source in sources:
+        before = len(all_data)
+        with open_data_file(source, 'r', newline='') as f:
+            for record in csv.DictReader(f):
+                key = record_key(record)
+                if key not in seen:
+                    seen.add(key)
+                    all_data.append(record)
+        logging.info(f"Read {source}: {len(all_data) - before} records kept")
+    
+    checkpoint["total_records"] = len(all_data)
+    checkpoint["summary"]["total_combinations"] = sum(1 for _ in iter_combinations())
     checkpoint["last_run"] = datetime.now().isoformat()
     save_checkpoint(checkpoint)
     
-    # Count not_available combinations
-    not_available_count = sum(1 for combo in checkpoint["completed_combinations"].values() 
-                             if combo.get("status") == "not_available")
-    
-    logging.info("="*70)
-    logging.info("Fetch Complete!")
-    logging.info(f"Successful requests: {successful_requests}")
-    logging.info(f"Failed requests: {failed_requests}")
-    logging.info(f"Skipped (fresh data): {skipped_requests - not_available_count}")
-    logging.info(f"Not available in API (404): {not_available_count}")
-    logging.info(f"New records added: {new_records_added}")
-    logging.info(f"Total records in dataset: {len(all_data)} (started with {initial_record_count})")
-    logging.info(f"Total time: {elapsed_time:.1f} minutes")
-    logging.info("="*70)
-    
-    # Save data
+    if not all_data:
+        logging.error("❌ No shard data to merge")
+        return None
+    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"abs_labour_force_ALL_DATA_{timestamp}.csv"
+    filename = compressed_name(f"{DATA_FILE_PREFIX}_{timestamp}.csv", OUTPUT_COMPRESSION)
+    save_to_csv(all_data, filename)
+    logging.info(f"✅ Merged {len(sources)} data file(s) into {filename} ({len(all_data)} records)")
+    run_csv_fixer(filename)
+    return filename
+
+class FetchRunner:
+    """
+    A single fetch run, used by main() and embeddable in other programs (the GUI).
     
-    if all_data:
-        save_to_csv(all_data, filename)
-        logging.info(f"✅ Raw data saved to: {filename}")
+    Call run() on a worker thread. stop(), pause() and resume() are safe to
+    call from any other thread. However the run ends (finished, stopped,
+    Ctrl+C or an error), run() first flushes everything fetched so far to
+    the checkpoint and a new data file.
+    
+    Progress events go to event_sink (a callable taking an event dict) if
+    given, otherwise to the --json-progress stream.
+    
+    With a WarmState (daemon mode), state is reused from the previous run
+    and fresh_after can bring the freshness cutoff forward. With
+    incremental=True, new records are appended to the existing dataset
+    file rather than written to a new one.
+    
+    dataset picks what to fetch (labour force by default). A checkpoint
+    passed in is shared with other runners, as run_datasets() does.
+    """
+    
+    def __init__(self, api_key=None, cancel_token=None, event_sink=None, warm=None, fresh_after=None, incremental=False,
+                 dataset=None, checkpoint=None, metrics=None):
+        self.api_key = api_key or API_KEY
+        self.dataset = dataset or LABOUR_FORCE
+        self.shared_checkpoint = checkpoint
+        self.cancel_token = cancel_token or CancellationToken()
+        self.event_sink = event_sink
+        self.warm = warm
+        self.fresh_after = fresh_after
+        self.incremental = incremental
+        
+        self.checkpoint = None
+        self.checkpoint_root = None
+        self.plan = None
+        self.data_loaded = False
+        self.all_data = []
+        self.record_keys = None
+        self.dataset_file = None
+        self.added_records = []
+        self.changed_series = set()
+        self.revised_records = []
+        self.revised_count = 0
+        self.derived = None
+        self._series_index = None
+        self.initial_record_count = 0
+        self.total_combinations = 0
+        self.combinations_to_fetch = 0
+        
+        self.successful_requests = 0
+        self.failed_requests = 0
+        self.skipped_requests = 0
+        self.not_available_requests = 0
+        self.new_records_added = 0
+        self.current_request = 0
+        self.unsaved_updates = 0  # Checkpoint updates since the last save (see checkpoint_updated)
+        self.oldest_unsaved_at = None
+        self.start_time = None
+        self.stats = FetchStats()
+        # run_datasets() passes one FetchMetrics to every runner, so the metrics file covers all datasets
+        self.shared_metrics = metrics is not None
+        self.metrics = metrics or FetchMetrics()
+        self.requests_before = dict(self.metrics.requests.values)  # Counted by earlier runners sharing the metrics
+        self.profiler = PhaseProfiler(enabled=PROFILE)
+        self.started_at = None
+        self.report = None
+    
+    def stop(self):
+        """Ask the run to stop. It flushes its progress and returns from run()."""
+        self.cancel_token.cancel()
+    
+    def pause(self):
+        """Pause before the next request."""
+        self.cancel_token.pause()
+    
+    def resume(self):
+        """Continue a paused run."""
+        self.cancel_token.resume()
+    
+    @property
+    def cancelled(self):
+        return self.cancel_token.cancelled
+    
+    def emit(self, event, **fields):
+        """Send a progress event to the event sink."""
+        if self.event_sink is not None:
+            self.event_sink(make_event(event, **fields))
+        else:
+            emit_event(event, **fields)
+    
+    def progress_fields(self):
+        """Counters, live metrics and ETA shared by every progress event."""
+        attempted = self.successful_requests + self.failed_requests + self.not_available_requests
+        remaining = self.combinations_to_fetch - attempted
+        metrics = self.stats.snapshot()
+        if metrics["requests_per_second"]:
+            # Rolling rate, so the ETA follows the current pace rather than the run average
+            eta_seconds = remaining / metrics["requests_per_second"]
+        elif attempted:
+            eta_seconds = remaining * (time.time() - self.start_time) / attempted
+        else:
+            eta_seconds = remaining * 60 / MAX_REQUESTS_PER_MINUTE
+        return {
+            "current": self.current_request,
+            "total": self.total_combinations,
+            "fetched": self.successful_requests,
+            "failed": self.failed_requests,
+            "not_available": self.not_available_requests,
+            "skipped": self.skipped_requests - self.not_available_requests,
+            "records_added": self.new_records_added,
+            "eta_seconds": max(eta_seconds, 0),
+            **metrics
+        }
+    
+    def save_checkpoint(self):
+        """Save the checkpoint, timing the save."""
+        start = time.perf_counter()
+        save_checkpoint(self.checkpoint_root)
+        self.metrics.checkpoint_save_seconds.observe(time.perf_counter() - start)
+        self.unsaved_updates = 0
+        self.oldest_unsaved_at = None
+    
+    def checkpoint_updated(self):
+        """
+        Count one combination update and save the checkpoint once the count
+        or time budget is spent (group commit).
         
-        # Auto-run the CSV fixer
-        logging.info("Running CSV formatter...")
+        Fast runs save every CHECKPOINT_SAVE_INTERVAL updates; slow ones at
+        least every CHECKPOINT_SAVE_SECONDS, so little work is ever unsaved.
+        """
+        self.unsaved_updates += 1
+        if self.oldest_unsaved_at is None:
+            self.oldest_unsaved_at = time.time()
+        if (self.unsaved_updates < CHECKPOINT_SAVE_INTERVAL
+                and time.time() - self.oldest_unsaved_at < CHECKPOINT_SAVE_SECONDS):
+            return
+        updates = self.unsaved_updates
+        self.save_checkpoint()
+        logging.info(f"💾 Checkpoint saved ({updates} update(s); {self.successful_requests} successful, "
+                     f"{self.failed_requests} failed)")
+        self.emit("checkpoint_saved", **self.progress_fields())
+    
+    def run(self):
+        """
+        Run the fetch. Returns the raw data file written, or None.
+        
+        If every combination was already fresh, nothing is reloaded or
+        rewritten and the existing dataset file is returned.
+        """
+        logging.info("="*70)
+        logging.info("Starting Automated ABS Data Fetch (with Checkpoint Support)")
+        logging.info("="*70)
+        
+        self.started_at = datetime.now()
+        self.prepare()
         try:
-            import subprocess
-            result = subprocess.run(['python3', 'fix_abs_csv.py'], 
-                                  capture_output=True, 
-                                  text=True,
-                                  timeout=300)
-            if result.returncode == 0:
-                logging.info("✅ CSV formatting completed")
-                logging.info(result.stdout)
+            with self.profiler.phase("fetch_loop"):
+                self.fetch_all()
+        except BaseException:
+            # Ctrl+C or an unexpected error - keep what was fetched, then re-raise
+            self.flush()
+            raise
+        return self.flush()
+    
+    def prepare(self):
+        """Load the checkpoint, plan the run and load existing data if anything needs fetching."""
+        # Load checkpoint
+        if self.shared_checkpoint is not None:
+            self.checkpoint_root = self.shared_checkpoint
+        elif self.warm is not None and self.warm.checkpoint is not None:
+            self.checkpoint_root = self.warm.checkpoint
+        else:
+            with self.profiler.phase("checkpoint_load"):
+                self.checkpoint_root = load_checkpoint()
+        self.checkpoint = dataset_checkpoint(self.checkpoint_root, self.dataset)
+        
+        with self.profiler.phase("plan"):
+            self.plan = FetchPlan(self.checkpoint, shard=SHARD, fresh_after=self.fresh_after, dataset=self.dataset)
+        
+        self.total_combinations = self.plan.total
+        self.checkpoint["summary"]["total_combinations"] = self.total_combinations
+        fresh_count = self.plan.skip_count
+        self.combinations_to_fetch = len(self.plan.to_fetch)
+        estimated_minutes = self.plan.estimated_seconds / 60
+        
+        # Fresh combinations count as done up front
+        self.current_request = fresh_count
+        self.skipped_requests = fresh_count
+        
+        # Load existing data for incremental updates - not needed if nothing will change
+        if self.plan.to_fetch:
+            self.load_data()
+            self.data_loaded = True
+        self.initial_record_count = self.total_records() if self.data_loaded else 0
+        
+        logging.info(f"Total combinations: {self.total_combinations}")
+        logging.info(f"Already up-to-date (< {DATA_FRESHNESS_DAYS} days old): {fresh_count}")
+        logging.info(f"Combinations to fetch: {self.combinations_to_fetch}")
+        logging.info(f"Estimated time: {estimated_minutes:.1f} minutes ({estimated_minutes/60:.1f} hours)")
+        if self.data_loaded:
+            logging.info(f"Starting with {self.initial_record_count} existing records")
+        else:
+            logging.info("Everything is up to date - existing data not reloaded")
+        
+        self.emit("run_started",
+                  total=self.total_combinations,
+                  fresh=fresh_count,
+                  to_fetch=self.combinations_to_fetch,
+                  existing_records=self.initial_record_count,
+                  eta_seconds=estimated_minutes * 60)
+    
+    def load_data(self):
+        """Load the existing dataset and its record index (or take them from the warm state)."""
+        if self.warm is not None and self.warm.all_data is not None:
+            self.all_data = self.warm.all_data
+            self.record_keys = self.warm.record_keys
+            self.dataset_file = self.warm.dataset_file
+            return
+        with self.profiler.phase("existing_data_load"):
+            self.dataset_file = find_latest_dataset(self.data_file_prefix)
+            self.all_data = load_existing_data(self.checkpoint, self.data_file_prefix)
+            key = self.dataset.record_key
+            if TRACK_REVISIONS:
+                self.record_keys = {key(record): record for record in self.all_data}
             else:
-                logging.error(f"CSV formatting failed: {result.stderr}")
-        except Exception as e:
-            logging.error(f"Error running CSV formatter: {e}")
+                self.record_keys = {key(record) for record in self.all_data}
+    
+    def merge_records(self, records, combination_key):
+        """Merge one response's records into the dataset. Returns (records added, values revised)."""
+        revised_before = len(self.revised_records)
+        key = self.dataset.record_key
+        added = merge_new_records(self.all_data, records, combination_key, self.record_keys,
+                                  self.revised_records if TRACK_REVISIONS else None, key)
+        revised = len(self.revised_records) - revised_before
+        # A series is its record key without the month
+        if added:
+            self.added_records.extend(self.all_data[-added:])
+            self.changed_series.update(key(record)[:-1] for record in self.all_data[-added:])
+        if revised:
+            self.changed_series.update(key(record)[:-1] for record, _ in self.revised_records[revised_before:])
+        return added, revised
+    
+    def wait_if_paused(self):
+        """Block while the run is paused."""
+        if not self.cancel_token.paused:
+            return
+        logging.info("⏸️  Fetch paused")
+        self.emit("run_paused", **self.progress_fields())
+        self.cancel_token.wait_while_paused()
+        if not self.cancelled:
+            logging.info("▶️  Fetch resumed")
+            self.emit("run_resumed", **self.progress_fields())
+    
+    def fetch_all(self):
+        """Fetch every combination that isn't fresh, until done or stopped."""
+        checkpoint = self.checkpoint
+        total_combinations = self.total_combinations
+        self.start_time = time.time()
+        
+        dataset = self.dataset
+        for entry in self.plan.to_fetch:
+            values, combo_key = entry[:-1], entry[-1]
+            label = dataset.label(values)
+            self.wait_if_paused()
+            if self.cancelled:
+                logging.warning("⏹️  Stop requested - saving progress")
+                return
+            
+            self.current_request += 1
+            current_request = self.current_request
+            
+            # Log progress periodically
+            attempted = self.successful_requests + self.failed_requests
+            if attempted % 50 == 0 and attempted > 0:
+                progress = (current_request / total_combinations) * 100
+                logging.info(f"Progress: [{current_request}/{total_combinations}] ({progress:.1f}%) - Fetched: {self.successful_requests}, Failed: {self.failed_requests}, Skipped: {self.skipped_requests}")
+            
+            # Fetch data
+            self.emit("request_started", key=combo_key, current=current_request, total=total_combinations)
+            data = fetch_endpoint(dataset.url, dataset.request_params(values), "/".join(values),
+                                  api_key=self.api_key, cancel_token=self.cancel_token, stats=self.stats)
+            records = []
+            added = 0
+            self.metrics.rate_limit_wait.inc(self.stats.last_wait)
+            self.metrics.decode_seconds.inc(self.stats.last_decode_seconds)
+            self.metrics.decoded_bytes.inc(self.stats.last_decode_bytes)
+            
+            if data == "CANCELLED":
+                # Stopped while waiting on the rate limiter - this combination wasn't requested
+                self.current_request -= 1
+                logging.warning("⏹️  Stop requested - saving progress")
+                return
+            elif data == "NOT_AVAILABLE":
+                # This combination doesn't exist in the API (404)
+                set_combination_status(checkpoint, combo_key, {
+                    "status": "not_available",
+                    "fetched_at": datetime.now().isoformat()
+                })
+                self.skipped_requests += 1
+                self.not_available_requests += 1
+                request_status = "not_available"
+                logging.info(f"🚫 {label}: Not available in API")
+            elif data:
+                records, rejections = dataset.schema.check(dataset.extract_records(data))
+                if rejections:
+                    rejected = sum(rejections.values())
+                    self.stats.record_check(len(records) + rejected, rejections)
+                    for reason, count in rejections.items():
+                        self.metrics.records_rejected.inc(count, reason=reason)
+                    logging.warning(f"⚠️  {label}: {rejected} record(s) rejected "
+                                    f"({', '.join(f'{count} {reason}' for reason, count in rejections.items())})")
+                else:
+                    self.stats.record_check(len(records), rejections)
+                
+                if records:
+                    # Merge with existing data (avoid duplicates)
+                    merge_start = time.perf_counter()
+                    with self.profiler.phase("merge"):
+                        added, revised = self.merge_records(records, combo_key)
+                    self.metrics.merge_seconds.observe(time.perf_counter() - merge_start)
+                    self.new_records_added += added
+                    self.revised_count += revised
+                    self.metrics.records_added.inc(added)
+                    
+                    # Update checkpoint
+                    latest_month = get_latest_observation_month(records)
+                    entry = {
+                        "status": "completed",
+                        "records": len(records),
+                        "latest_month": latest_month,
+                        "fetched_at": datetime.now().isoformat()
+                    }
+                    if dataset.labour_force_steps:
+                        # Ties the series' descriptions to this request's grid codes (see series_codes)
+                        entry["series"] = list(dataset.record_key(records[0])[:-1])
+                    set_combination_status(checkpoint, combo_key, entry)
+                    checkpoint["total_records"] = self.total_records()
+                    
+                    self.successful_requests += 1
+                    request_status = "completed"
+                    
+                    # Log success with details
+                    logging.info(f"✅ {label}: {len(records)} records (latest: {latest_month})"
+                                 + (f", {revised} revised" if revised else ""))
+                else:
+                    logging.warning(f"No records in response for {combo_key}")
+                    self.failed_requests += 1
+                    request_status = "empty"
+            else:
+                self.failed_requests += 1
+                request_status = "failed"
+                # Mark as failed in checkpoint but don't block retry
+                set_combination_status(checkpoint, combo_key, {
+                    "status": "failed",
+                    "fetched_at": datetime.now().isoformat()
+                })
+            
+            if request_status != "empty":
+                self.checkpoint_updated()
+            
+            self.emit("request_finished",
+                      key=combo_key,
+                      status=request_status,
+                      latency=self.stats.last_latency,
+                      wait=self.stats.last_wait,
+                      bytes=self.stats.last_bytes,
+                      records=len(records),
+                      added=added,
+                      **self.progress_fields())
+            
+            self.metrics.requests.inc(status=request_status)
+            self.metrics.latency.observe(self.stats.last_latency)
+            self.metrics.payload_bytes.observe(self.stats.last_bytes)
+            self.metrics.write()
+    
+    def flush(self):
+        """Save the checkpoint and all data fetched so far. Returns the raw data file, or None."""
+        checkpoint = self.checkpoint
+        all_data = self.all_data
+        if self.start_time is None:
+            self.start_time = time.time()
+        elapsed_time = (time.time() - self.start_time) / 60
+        
+        # Final checkpoint save
+        checkpoint["last_run"] = datetime.now().isoformat()
+        with self.profiler.phase("save"):
+            self.save_checkpoint()
+        
+        # Count not_available combinations
+        not_available_count = checkpoint["summary"]["status_counts"].get("not_available", 0)
+        
+        logging.info("="*70)
+        logging.info("Fetch Stopped - progress saved" if self.cancelled else "Fetch Complete!")
+        logging.info(f"Successful requests: {self.successful_requests}")
+        logging.info(f"Failed requests: {self.failed_requests}")
+        logging.info(f"Skipped (fresh data): {self.skipped_requests - not_available_count}")
+        logging.info(f"Not available in API (404): {not_available_count}")
+        logging.info(f"New records added: {self.new_records_added}")
+        if self.stats.records_rejected:
+            logging.info(f"Records rejected by the schema: {self.stats.records_rejected} "
+                         f"({self.stats.rejection_rate():.2%} of {self.stats.records_checked})")
+        if self.data_loaded:
+            logging.info(f"Total records in dataset: {self.total_records()} (started with {self.initial_record_count})")
+        logging.info(f"Total time: {elapsed_time:.1f} minutes")
+        logging.info("="*70)
+        
+        # Save data
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = compressed_name(f"{self.data_file_prefix}_{timestamp}.csv", OUTPUT_COMPRESSION)
+        
+        self.emit("run_finished",
+                  cancelled=self.cancelled,
+                  elapsed_seconds=time.time() - self.start_time,
+                  total_records=self.total_records(),
+                  **self.progress_fields())
+        
+        if not self.shared_metrics:
+            self.metrics.run_finished.set(1)
+        self.metrics.write(force=True)
+        
+        fixed_file = None
+        if not self.data_loaded:
+            # Nothing was due - the existing dataset is still current
+            filename = fixed_file = find_latest_dataset(self.data_file_prefix)
+            if filename:
+                logging.info(f"✅ Existing data is up to date: {filename}")
+            else:
+                logging.error("❌ No data file found - delete the checkpoint to fetch everything again")
+        else:
+            filename, fixed_file = self.save_data(filename)
+        
+        revision_observations = self.record_revisions()
+        derived_recomputed = self.update_derived(fixed_file)
+        validation = self.validate()
+        changeset_file, changeset_summary = self.write_changeset(fixed_file, timestamp)
+        exports = self.export()
+        
+        if self.warm is not None:
+            self.warm.checkpoint = self.checkpoint_root
+            if self.data_loaded:
+                self.warm.all_data = all_data
+                self.warm.record_keys = self.record_keys
+                self.warm.dataset_file = fixed_file or self.dataset_file
+        
+        profile_dir = self.write_profile()
+        
+        report_file = f"{self.data_file_prefix}_{timestamp}_report.json"
+        report = self.build_report(filename, fixed_file, profile_dir)
+        report["revisions"] = {
+            "revised_values": self.revised_count,
+            "vintage_observations": revision_observations,
+            "revision_file": REVISION_FILE if revision_observations is not None else None
+        }
+        report["derived_series_recomputed"] = derived_recomputed
+        report["validation"] = validation and {
+            "series_checked": validation["series_checked"],
+            "months_checked": validation["months_checked"],
+            "violations": validation["violation_count"],
+            "unmatched_identities": validation["unmatched_identities"],
+            "report_file": validation["report_file"]
+        }
+        report["changeset"] = changeset_summary and dict(changeset_summary, file=changeset_file)
+        report["exports"] = exports
+        self.report = report
+        try:
+            save_run_report(report, report_file)
+            logging.info(f"📋 Run report saved to: {report_file}")
+        except OSError as e:
+            logging.error(f"Error saving run report: {e}")
         
         return filename
-    else:
-        logging.error("❌ No data was fetched")
+    
+    def save_data(self, filename):
+        """Write the dataset and its _FIXED file. Returns both, or (None, None) if there was no data."""
+        if self.incremental and self.flush_incremental():
+            return self.dataset_file, self.dataset_file
+        if not self.all_data:
+            logging.error("❌ No data was fetched")
+            return None, None
+        
+        with self.profiler.phase("save"):
+            save_to_csv(self.all_data, filename)
+        logging.info(f"✅ Raw data saved to: {filename}")
+        
+        # Auto-run the CSV fixer (in-process, so the fix phase can be profiled)
+        with self.profiler.phase("fix"):
+            fixed_file = run_csv_fixer(filename)
+        return filename, fixed_file
+    
+    @property
+    def data_file_prefix(self):
+        return self.dataset.data_file_prefix(shard_name(SHARD) if SHARD else None)
+    
+    def total_records(self):
+        """Records in the dataset (from the checkpoint when the data wasn't loaded)."""
+        if self.data_loaded:
+            return len(self.all_data)
+        return self.checkpoint.get("total_records", 0)
+    
+    def build_report(self, data_file, fixed_file, profile_dir):
+        """The machine-readable summary of this run."""
+        not_available_count = self.checkpoint["summary"]["status_counts"].get("not_available", 0)
+        requests_by_status = {labels[0][1]: count - self.requests_before.get(labels, 0)
+                              for labels, count in self.metrics.requests.values.items()
+                              if count > self.requests_before.get(labels, 0)}
+        metrics = self.stats.snapshot()
+        
+        return {
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": datetime.now().isoformat(),
+            "cancelled": self.cancelled,
+            "dataset": self.dataset.name,
+            "shard": shard_name(SHARD) if SHARD else None,
+            "elapsed_seconds": time.time() - self.start_time,
+            "phases": {
+                name: {"seconds": seconds, "calls": self.profiler.calls[name]}
+                for name, seconds in self.profiler.timings.items()
+            },
+            "requests": {
+                "total_combinations": self.total_combinations,
+                "to_fetch": self.combinations_to_fetch,
+                "by_status": requests_by_status,
+                "skipped_fresh": self.skipped_requests - not_available_count
+            },
+            "latency_seconds": {
+                "p50": metrics["latency_p50"],
+                "p95": metrics["latency_p95"],
+                "p99": metrics["latency_p99"]
+            },
+            "rate_limit_wait_seconds": self.stats.rate_limit_wait_seconds,
+            "bytes_received": self.stats.bytes_received,
+            "decoding": {
+                "backend": json_decoder().backend,
+                "seconds": self.stats.decode_seconds,
+                "bytes": self.stats.decoded_bytes,
+                "bytes_per_second": self.stats.decode_bytes_per_second(),
+                "records_checked": self.stats.records_checked,
+                "records_rejected": self.stats.records_rejected,
+                "rejection_rate": self.stats.rejection_rate(),
+                "rejections": self.stats.rejections
+            },
+            "records_added": self.new_records_added,
+            "total_records": self.total_records(),
+            "initial_records": self.initial_record_count,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "outputs": {
+                "data_file": data_file,
+                "fixed_file": fixed_file,
+                "checkpoint_file": compressed_name(CHECKPOINT_FILE, OUTPUT_COMPRESSION),
+                "summary_file": SUMMARY_FILE,
+                "metrics_file": METRICS_FILE,
+                "profile_dir": profile_dir
+            }
+        }
+    
+    def flush_incremental(self):
+        """Append this run's new records to the dataset file. Returns False if a full rewrite is needed."""
+        if not self.dataset_file or not os.path.exists(self.dataset_file):
+            return False
+        if self.revised_records:
+            logging.info(f"{len(self.revised_records)} revised values - rewriting the dataset")
+            return False
+        if self.added_records:
+            with self.profiler.phase("save"):
+                if not append_to_dataset(self.dataset_file, self.added_records):
+                    return False
+            logging.info(f"✅ Appended {len(self.added_records)} new records to {self.dataset_file}")
+        else:
+            logging.info(f"✅ No new records - {self.dataset_file} is unchanged")
+        return True
+    
+    def record_revisions(self):
+        """
+        Append this run's new and revised observations to the revision log as one vintage.
+        
+        The first time, the whole dataset is logged as the baseline vintage.
+        Returns the number of observations logged, or None if skipped.
+        """
+        if not TRACK_REVISIONS or SHARD is not None or not self.data_loaded or not self.dataset.labour_force_steps:
+            return None
+        import abs_revisions
+        
+        with self.profiler.phase("revisions"):
+            if not os.path.exists(REVISION_FILE):
+                written = abs_revisions.append_vintage(self.all_data, REVISION_FILE, baseline=True)
+            else:
+                # A record fetched more than once in the run is logged once, with its final value
+                observations = list({id(record): record for record in self.added_records +
+                                     [record for record, _ in self.revised_records]}.values())
+                written = abs_revisions.append_vintage(observations, REVISION_FILE)
+        if written:
+            logging.info(f"🕰️  Logged {written} observations ({len(self.revised_records)} revised) to {REVISION_FILE}")
+        return written
+    
+    def series_index(self):
+        """A SeriesIndex over all_data, built once and shared by the steps after saving."""
+        if self._series_index is None:
+            self._series_index = SeriesIndex.from_records(self.all_data)
+        return self._series_index
+    
+    def update_derived(self, fixed_file):
+        """
+        Recompute the derived series that depend on this run's new records.
+        
+        Returns the number of series recomputed, or None if skipped. Shards
+        hold part of the grid only, so they leave derived series to the
+        merged dataset.
+        """
+        if not DERIVED_SERIES or SHARD is not None or not self.data_loaded or not fixed_file or not self.dataset.labour_force_steps:
+            return None
+        import abs_derived
+        if abs_derived.np is None:
+            logging.info("Derived series skipped - numpy is not installed (pip3 install numpy)")
+            return None
+        
+        with self.profiler.phase("derive"):
+            derived, recomputed = abs_derived.update_derived_file(
+                self.series_index, self.changed_series,
+                previous_source=self.dataset_file, source=fixed_file)
+        logging.info(f"📐 Derived series: {recomputed} of {len(derived.keys)} recomputed ({abs_derived.DERIVED_FILE})")
+        self.derived = derived
+        return recomputed
+    
+    def validate(self):
+        """
+        Check the cross-series identities (LABOUR_FORCE = EMPLOYED + UNEMPLOYED, ...).
+        
+        Uses the derived series' aligned values when the derive step ran,
+        and aligns the series itself otherwise. Returns the validation
+        result, or None if skipped.
+        """
+        if not VALIDATE_IDENTITIES or not self.data_loaded or not self.dataset.labour_force_steps:
+            return None
+        import abs_derived
+        import abs_validation
+        if abs_derived.np is None:
+            logging.warning("⚠️  Consistency checks skipped - numpy is not installed (pip3 install numpy)")
+            return None
+        
+        with self.profiler.phase("validate"):
+            derived = self.derived
+            if derived is None:
+                derived = abs_derived.DerivedSeries()
+                derived.update(self.series_index())
+            result = abs_validation.validate(derived, series_codes(self.checkpoint_root, derived.keys),
+                                             rel_tolerance=VALIDATION_TOLERANCE)
+        abs_validation.log_violations(result)
+        try:
+            abs_validation.save_validation_report(result)
+            result["report_file"] = abs_validation.VALIDATION_FILE
+        except OSError as e:
+            logging.warning(f"Could not write {abs_validation.VALIDATION_FILE}: {e}")
+            result["report_file"] = None
+        
+        self.metrics.validation_violations.set(result["violation_count"])
+        self.metrics.write(force=True)
+        return result
+    
+    def previous_series(self):
+        """
+        A SeriesIndex of the series this run changed, as they were before it:
+        months it added are left out and revised values are put back.
+        """
+        key = self.dataset.record_key
+        added = {}
+        for record in self.added_records:
+            record_key = key(record)
+            added.setdefault(record_key[:-1], set()).add(record_key[-1])
+        previous_values = {}
+        for record, value in self.revised_records:
+            # The first revision of a month holds the value it was loaded with
+            previous_values.setdefault(key(record), value)
+        
+        current = self.series_index()
+        index = SeriesIndex()
+        for series in self.changed_series:
+            months, values = current.series.get(series, ((), ()))
+            skipped = added.get(series, ())
+            kept = [(month, previous_values.get(series + (month,), value))
+                    for month, value in zip(months, values) if month not in skipped]
+            index.series[series] = ([month for month, _ in kept], [value for _, value in kept])
+        return index
+    
+    def write_changeset(self, fixed_file, timestamp):
+        """
+        Fingerprint the dataset and write what changed since the dataset it was loaded from.
+        
+        Only the series this run changed are hashed again. Returns the
+        changeset file and its summary, or (None, None) if there was nothing
+        to compare against.
+        """
+        if not FINGERPRINTS or not self.data_loaded or not fixed_file or not self.dataset.labour_force_steps:
+            return None, None
+        import abs_fingerprints
+        
+        with self.profiler.phase("fingerprint"):
+            previous = abs_fingerprints.Fingerprints.load(
+                abs_fingerprints.fingerprint_file(self.dataset_file) if self.dataset_file else None)
+            trusted = previous is not None and previous.source == self.dataset_file
+            fingerprints = abs_fingerprints.Fingerprints.build(
+                self.series_index(), source=fixed_file,
+                previous=previous if trusted else None, changed=self.changed_series)
+            fingerprints.save(abs_fingerprints.fingerprint_file(fixed_file), COMPRESSION_LEVEL)
+            changeset = None
+            if previous is not None:
+                # Trusted fingerprints only differ in the series this run changed, whose old values are known
+                old_index = self.previous_series() if trusted else SeriesIndex.load(self.dataset_file)
+                changeset = abs_fingerprints.diff(previous, fingerprints, old_index, self.series_index())
+        
+        if changeset is None:
+            return None, None
+        changeset_file = f"{self.data_file_prefix}_{timestamp}_changeset.json"
+        abs_fingerprints.save_changeset(changeset, changeset_file)
+        summary = changeset["summary"]
+        logging.info(f"🔀 Changes since {self.dataset_file}: {summary['series_changed']} series changed "
+                     f"({summary['new_months']} new months, {summary['revised_values']} revised values), "
+                     f"{summary['series_new']} new, {summary['series_vanished']} vanished -> {changeset_file}")
+        return changeset_file, summary
+    
+    def export(self):
+        """
+        Write the merged records to every EXPORT_FORMATS sink in one pass over memory.
+        
+        Returns {format: [files written]}, or None if skipped. Runs where
+        nothing was due leave the previous exports in place.
+        """
+        if not EXPORT_FORMATS or SHARD is not None or not self.data_loaded or not self.all_data:
+            return None
+        import abs_export
+        
+        try:
+            with self.profiler.phase("export"):
+                exports = abs_export.export_records(self.all_data, self.dataset.fieldnames, EXPORT_FORMATS, EXPORT_DIR,
+                                                    OUTPUT_COMPRESSION, COMPRESSION_LEVEL,
+                                                    prefix=self.dataset.file_stem)
+        except (OSError, RuntimeError) as e:
+            logging.error(f"❌ Export failed, previous exports left in place: {e}")
+            return None
+        logging.info(f"📤 Exported {', '.join(exports)} to {EXPORT_DIR}/")
+        return exports
+    
+    def write_profile(self):
+        """Write the --profile reports and log where they went. Returns the directory, or None."""
+        profile_dir = self.profiler.write_reports()
+        if profile_dir is None:
+            return None
+        logging.info(f"📈 Profile written to {profile_dir}/")
+        for name, seconds in self.profiler.timings.items():
+            logging.info(f"   {name}: {seconds:.3f}s ({self.profiler.calls[name]} call(s))")
+        return profile_dir
+
+class StreamingFetchRunner(FetchRunner):
+    """
+    A fetch run with a hard memory cap (--streaming).
+    
+    Fetched records are spilled to sorted runs on disk instead of being
+    merged into the dataset in memory. When the run ends, the existing
+    dataset is streamed through the same sorter, and an external k-way
+    merge on the record key dedupes everything and streams it to the new
+    data file and any --export outputs in one pass. New and revised
+    observations are written to the revision log as the merge finds them.
+    Steps that need the whole dataset in memory (derived series,
+    consistency checks and changesets) are skipped.
+    """
+    
+    EXISTING = 1  # Sort priority of existing records; the lowest priority for a key wins
+    
+    def __init__(self, *args, memory_mb=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.memory_bytes = (memory_mb or STREAM_MEMORY_MB) * 1024 * 1024
+        # Fetched values replace existing ones when tracking revisions (the last fetched wins), and lose
+        # to them otherwise (the first fetched wins)
+        self.fetched_priority = 0 if TRACK_REVISIONS else 2
+        self.sorter = None
+        self.fieldnames = set()
+        self.sequence = 0
+        self.merged_record_count = None
+        self.stream_file = None
+        self.stream_exports = None
+        self.vintage_writer = None
+    
+    def sort_key(self, item):
+        priority, sequence, record = item
+        # Fetched records winning over existing ones (tracking revisions) are ordered latest first, so
+        # the last value fetched for a key wins, as in merge_new_records
+        if priority < self.EXISTING:
+            sequence = -sequence
+        return self.dataset.record_key(record), priority, sequence
+    
+    def load_data(self):
+        """Only find the existing dataset - it is read during the final merge."""
+        import abs_external_sort
+        self.dataset_file = find_latest_dataset(self.data_file_prefix)
+        self.sorter = abs_external_sort.ExternalSorter(self.sort_key, self.memory_bytes, STREAM_SPILL_DIR)
+        logging.info(f"Streaming mode: records spill to {self.sorter.spill_dir} "
+                     f"(memory cap {self.memory_bytes // (1024 * 1024)} MB)")
+        logging.info("Streaming mode: derived series, consistency checks and changesets are skipped")
+    
+    def total_records(self):
+        if self.merged_record_count is not None:
+            return self.merged_record_count
+        return self.checkpoint.get("total_records", 0)
+    
+    def add(self, priority, record):
+        self.sorter.add([priority, self.sequence, record])
+        self.sequence += 1
+    
+    def merge_records(self, records, combination_key):
+        """Spill the records; what they add is only known after the final merge."""
+        for record in records:
+            self.fieldnames.update(record)
+            self.add(self.fetched_priority, record)
+        return 0, 0
+    
+    def flush(self):
+        if self.sorter is not None:
+            try:
+                self.merge_runs()
+            except BaseException:
+                if self.vintage_writer is not None:
+                    self.vintage_writer.abort()
+                    self.vintage_writer = None
+                raise
+            finally:
+                self.sorter.cleanup()
+        return super().flush()
+    
+    def merge_runs(self):
+        """Merge the spilled records with the existing dataset into a new data file (and exports)."""
+        import abs_export
+        if self.dataset_file:
+            with self.profiler.phase("existing_data_load"):
+                with open_data_file(self.dataset_file, 'r', newline='') as f:
+                    reader = csv.DictReader(f)
+                    self.fieldnames.update(reader.fieldnames or [])
+                    for record in reader:
+                        self.add(self.EXISTING, record)
+        if not self.sorter.item_count:
+            return
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = compressed_name(f"{self.data_file_prefix}_{timestamp}.csv", OUTPUT_COMPRESSION)
+        fieldnames = sorted(self.fieldnames)
+        formats = EXPORT_FORMATS if SHARD is None else ()
+        with self.profiler.phase("merge"):
+            try:
+                written = abs_export.export_records(
+                    self.deduped(), fieldnames, formats, EXPORT_DIR, OUTPUT_COMPRESSION, COMPRESSION_LEVEL,
+                    prefix=self.dataset.file_stem, extra_sinks={"dataset": abs_export.CsvSink(filename, fieldnames, OUTPUT_COMPRESSION, COMPRESSION_LEVEL)})
+            except (OSError, RuntimeError) as e:
+                if not formats:
+                    raise
+                # Don't lose the fetched data over an export - write the dataset on its own
+                logging.error(f"❌ Export failed, previous exports left in place: {e}")
+                written = abs_export.export_records(
+                    self.deduped(), fieldnames, (), extra_sinks={
+                        "dataset": abs_export.CsvSink(filename, fieldnames, OUTPUT_COMPRESSION, COMPRESSION_LEVEL)})
+        
+        self.stream_file = written.pop("dataset")[0]
+        self.stream_exports = written or None
+        self.checkpoint["total_records"] = self.merged_record_count
+        self.metrics.records_added.inc(self.new_records_added)
+        logging.info(f"🔀 Merged {self.sorter.item_count} records from {len(self.sorter.runs) or 1} sorted run(s) "
+                     f"into {self.merged_record_count} ({self.new_records_added} new, {self.revised_count} revised, "
+                     f"{self.sorter.spilled_bytes / 1048576:.1f} MB spilled)")
+    
+    def open_vintage(self):
+        """Start this run's revision log vintage (the baseline if there is no log yet), or None if not tracking."""
+        if self.vintage_writer is not None:
+            self.vintage_writer.abort()
+            self.vintage_writer = None
+        if TRACK_REVISIONS and SHARD is None and self.dataset.labour_force_steps:
+            import abs_revisions
+            self.vintage_writer = abs_revisions.VintageWriter(REVISION_FILE, baseline=not os.path.exists(REVISION_FILE))
+        return self.vintage_writer
+    
+    def deduped(self):
+        """
+        The merged stream with one record per key. Counts new records and
+        revised values, and adds them to the revision log vintage (every
+        record, for a baseline).
+        """
+        self.new_records_added = self.revised_count = self.merged_record_count = 0
+        vintage = self.open_vintage()
+        log_all = vintage is not None and vintage.baseline
+        log_changes = vintage is not None and not log_all
+        current_key = winner = None
+        has_existing = True
+        for priority, _, record in self.sorter.merged():
+            key = self.dataset.record_key(record)
+            if key != current_key:
+                if not has_existing:
+                    self.new_records_added += 1
+                    if log_changes:
+                        vintage.add(winner)
+                current_key, winner, has_existing = key, record, priority == self.EXISTING
+                self.merged_record_count += 1
+                if log_all:
+                    vintage.add(record)
+                yield record
+            elif priority == self.EXISTING:
+                # Only reached with a fetched record ahead of it (the winner) when tracking revisions
+                if not has_existing and record.get('observation_value', '') != winner.get('observation_value', ''):
+                    self.revised_count += 1
+                    if log_changes:
+                        vintage.add(winner)
+                has_existing = True
+        if not has_existing:
+            self.new_records_added += 1
+            if log_changes:
+                vintage.add(winner)
+    
+    def save_data(self, filename):
+        if self.stream_file is None:
+            logging.error("❌ No data was fetched")
+            return None, None
+        logging.info(f"✅ Raw data saved to: {self.stream_file}")
+        with self.profiler.phase("fix"):
+            fixed_file = run_csv_fixer(self.stream_file)
+        return self.stream_file, fixed_file
+    
+    def record_revisions(self):
+        """Append the vintage the merge collected. Returns the number of observations logged, or None if skipped."""
+        if self.vintage_writer is None:
+            return None
+        with self.profiler.phase("revisions"):
+            written = self.vintage_writer.close()
+        self.vintage_writer = None
+        if written:
+            logging.info(f"🕰️  Logged {written} observations ({self.revised_count} revised) to {REVISION_FILE}")
+        return written
+    
+    def update_derived(self, fixed_file):
+        return None
+    
+    def validate(self):
         return None
+    
+    def write_changeset(self, fixed_file, timestamp):
+        return None, None
+    
+    def export(self):
+        return self.stream_exports
+
+def load_release_dates(path):
+    """
+    Read ABS release dates (one YYYY-MM-DD per line, # for comments).
+    
+    Returns sorted datetimes at RELEASE_TIME on each date.
+    """
+    hour, minute = (int(part) for part in RELEASE_TIME.split(":"))
+    releases = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                releases.append(datetime.fromisoformat(line).replace(hour=hour, minute=minute))
+    return sorted(releases)
+
+class FetchDaemon:
+    """
+    Long-running fetcher (--daemon).
+    
+    Keeps the checkpoint, dataset and record index warm between runs. Wakes
+    every interval and at each ABS release time, fetches only what is due
+    (anything stale, or fetched before the latest release) and appends new
+    records to the dataset file.
+    
+    The control socket on 127.0.0.1 takes one command per connection and
+    answers with a JSON line: status, refresh, refresh all or stop.
+    """
+    
+    COMMANDS = ("status", "refresh", "refresh all", "stop")
+    
+    def __init__(self, api_key, interval_hours=DAEMON_INTERVAL_HOURS, release_dates=None, control_port=DAEMON_CONTROL_PORT):
+        self.api_key = api_key
+        self.interval = timedelta(hours=interval_hours)
+        self.release_dates = release_dates or []
+        self.control_port = control_port
+        self.warm = WarmState()
+        self.wake_event = threading.Event()
+        self.stopping = False
+        self.refresh_all = False
+        self.runner = None
+        self.last_report = None
+        self.runs = 0
+        self.next_wake = None
+        self.started_at = datetime.now()
+    
+    def latest_release(self, now):
+        past = [release for release in self.release_dates if release <= now]
+        return past[-1] if past else None
+    
+    def next_release(self, now):
+        future = [release for release in self.release_dates if release > now]
+        return future[0] if future else None
+    
+    def serve_forever(self):
+        """Run until stopped by the control socket, SIGTERM or Ctrl+C."""
+        server = self.start_control_server()
+        logging.info(f"🛰️  Daemon started - control socket on 127.0.0.1:{self.control_port}")
+        try:
+            while not self.stopping:
+                self.run_once()
+                if self.stopping:
+                    break
+                
+                now = datetime.now()
+                self.next_wake = now + self.interval
+                release = self.next_release(now)
+                if release is not None and release < self.next_wake:
+                    self.next_wake = release
+                logging.info(f"💤 Next check at {self.next_wake:%Y-%m-%d %H:%M}")
+                self.wake_event.wait((self.next_wake - now).total_seconds())
+                self.wake_event.clear()
+        finally:
+            server.shutdown()
+            server.server_close()
+            logging.info("Daemon stopped")
+    
+    def run_once(self):
+        """Fetch whatever is due, reusing the warm state."""
+        fresh_after = self.latest_release(datetime.now())
+        if self.refresh_all:
+            fresh_after = datetime.now()
+            self.refresh_all = False
+        
+        self.next_wake = None
+        self.runner = FetchRunner(self.api_key, warm=self.warm, fresh_after=fresh_after, incremental=True)
+        try:
+            self.runner.run()
+        except Exception as e:
+            logging.error(f"Daemon run failed: {e}", exc_info=True)
+        finally:
+            self.last_report = self.runner.report
+            self.runs += 1
+            self.runner = None
+    
+    def handle_command(self, command):
+        """Apply one control command. Returns the JSON-able reply."""
+        command = " ".join(command.lower().split())
+        if command == "status":
+            return self.status()
+        if command in ("refresh", "refresh all"):
+            if command == "refresh all":
+                self.refresh_all = True
+            self.wake_event.set()
+            return {"ok": True, "message": "Refresh queued after the current run" if self.runner else "Refresh started"}
+        if command == "stop":
+            self.stopping = True
+            runner = self.runner
+            if runner is not None:
+                runner.stop()
+            self.wake_event.set()
+            return {"ok": True, "message": "Stopping"}
+        return {"ok": False, "error": f"Unknown command: {command!r}", "commands": list(self.COMMANDS)}
+    
+    def status(self):
+        now = datetime.now()
+        runner = self.runner
+        status = {
+            "ok": True,
+            "state": "fetching" if runner is not None else "idle",
+            "started_at": self.started_at.isoformat(),
+            "runs": self.runs,
+            "next_wake": self.next_wake.isoformat() if self.next_wake else None,
+            "latest_release": self.latest_release(now).isoformat() if self.latest_release(now) else None,
+            "next_release": self.next_release(now).isoformat() if self.next_release(now) else None,
+            "records_in_memory": len(self.warm.all_data) if self.warm.all_data is not None else None,
+            "dataset_file": self.warm.dataset_file
+        }
+        # Plain counters only - the runner's other state belongs to its thread
+        if runner is not None and runner.plan is not None:
+            status["progress"] = {
+                "current": runner.current_request,
+                "total": runner.total_combinations,
+                "fetched": runner.successful_requests,
+                "failed": runner.failed_requests,
+                "not_available": runner.not_available_requests,
+                "records_added": runner.new_records_added
+            }
+        report = self.last_report
+        if report is not None:
+            status["last_run"] = {
+                "finished_at": report["finished_at"],
+                "cancelled": report["cancelled"],
+                "elapsed_seconds": report["elapsed_seconds"],
+                "records_added": report["records_added"],
+                "requests": report["requests"]["by_status"]
+            }
+        return status
+    
+    def start_control_server(self):
+        """Serve the control socket on a background thread."""
+        import socketserver
+        daemon = self
+        
+        class ControlHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                command = self.rfile.readline(1024).decode("utf-8", "replace")
+                reply = daemon.handle_command(command)
+                self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+        
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", self.control_port), ControlHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+def send_control_command(command, port=DAEMON_CONTROL_PORT, timeout=10):
+    """Send a command to a running daemon. Returns its reply."""
+    import socket
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+        sock.sendall((command + "\n").encode("utf-8"))
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+    return json.loads(reply.decode("utf-8"))
+
+def run_datasets(datasets, api_key=None):
+    """
+    Fetch several datasets in turn through one engine.
+    
+    They share the HTTP session, the rate limiter and the checkpoint file,
+    so jobs for different datasets can't overlap and exceed the gateway's
+    per-key limit. One FetchMetrics covers every dataset and is marked
+    finished after the last. Returns the raw data file of each dataset, in
+    order.
+    """
+    runner_class = StreamingFetchRunner if STREAMING else FetchRunner
+    checkpoint = load_checkpoint()
+    metrics = FetchMetrics()
+    results = []
+    try:
+        for dataset in datasets:
+            logging.info(f"📦 Dataset: {dataset.name}")
+            runner = runner_class(api_key or API_KEY, dataset=dataset, checkpoint=checkpoint, metrics=metrics)
+            results.append(runner.run())
+            if runner.cancelled:
+                break
+    finally:
+        metrics.run_finished.set(1)
+        metrics.write(force=True)
+    return results
+
+def main(datasets=None):
+    if datasets and datasets != [LABOUR_FORCE]:
+        results = run_datasets(datasets)
+        return results[-1] if results and all(results) else None
+    if STREAMING:
+        return StreamingFetchRunner(API_KEY).run()
+    return FetchRunner(API_KEY).run()
 
 if __name__ == "__main__":
+    setup_logging()
+    
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description='Fetch ABS Labour Force data')
     parser.add_argument('--api-key', type=str, help='API key for ABS API')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES), default=OUTPUT_COMPRESSION,
+                        help='Compress CSV outputs and the checkpoint file (default: none)')
+    parser.add_argument('--compress-level', type=int, help='Compression level (default: codec default)')
+    parser.add_argument('--json-progress', action='store_true',
+                        help='Write JSON-lines progress events to stdout (log stays on stderr)')
+    parser.add_argument('--metrics-file', default=METRICS_FILE,
+                        help=f'Prometheus textfile to write run metrics to (default: {METRICS_FILE})')
+    parser.add_argument('--metrics-format', choices=['prometheus', 'openmetrics'], default=METRICS_FORMAT,
+                        help='Metrics file format (default: prometheus)')
+    parser.add_argument('--no-metrics', action='store_true', help='Do not write a metrics file')
+    parser.add_argument('--no-derived', action='store_true',
+                        help='Do not update the derived series (abs_derived_series.npz) or check identities')
+    parser.add_argument('--no-revisions', action='store_true',
+                        help='Keep the first value seen for each observation and do not log vintages')
+    parser.add_argument('--no-changeset', action='store_true',
+                        help='Do not fingerprint the dataset or write a changeset against the previous one')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='Do not check cross-series identities after merging')
+    parser.add_argument('--validation-tolerance', type=float, default=VALIDATION_TOLERANCE,
+                        help=f'Allowed relative difference in the identity checks (default: {VALIDATION_TOLERANCE})')
+    parser.add_argument('--export', help='Also export the merged records to these formats in one pass '
+                        '(comma-separated: csv, jsonl, parquet, regions)')
+    parser.add_argument('--export-dir', default=EXPORT_DIR, help=f'Folder for --export outputs (default: {EXPORT_DIR})')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Keep memory bounded: spill records to sorted runs on disk and merge them at the end')
+    parser.add_argument('--memory-mb', type=int, default=STREAM_MEMORY_MB,
+                        help=f'Streaming: memory cap for buffered records in MB (default: {STREAM_MEMORY_MB})')
+    parser.add_argument('--spill-dir', help='Streaming: folder for the sorted runs (default: system temp folder)')
+    parser.add_argument('--datasets', default=LABOUR_FORCE.name,
+                        help=f'Comma-separated datasets to fetch through one engine, or "all" (default: {LABOUR_FORCE.name})')
+    parser.add_argument('--datasets-file', help=f'Dataset plugin file (default: {DATASETS_FILE} if it exists)')
+    parser.add_argument('--json-backend', default=JSON_BACKEND, choices=["auto", "msgspec", "orjson", "json"],
+                        help='JSON decoder for responses (default: auto, the fastest installed)')
+    parser.add_argument('--grid', help=f'Grid config file (default: {GRID_FILE} if it exists)')
+    parser.add_argument('--shard', help='Fetch only shard i of n (e.g. 2/3), into per-shard files')
+    parser.add_argument('--merge-shards', action='store_true',
+                        help='Merge every shard checkpoint and data file into the main ones, then exit')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running, fetching whatever is due on a schedule and after ABS releases')
+    parser.add_argument('--interval', type=float, default=DAEMON_INTERVAL_HOURS,
+                        help=f'Daemon: hours between checks (default: {DAEMON_INTERVAL_HOURS})')
+    parser.add_argument('--release-dates',
+                        help='Daemon: file of ABS release dates (YYYY-MM-DD per line) to refresh after')
+    parser.add_argument('--control-port', type=int, default=DAEMON_CONTROL_PORT,
+                        help=f'Daemon control socket port on 127.0.0.1 (default: {DAEMON_CONTROL_PORT})')
+    parser.add_argument('--control', choices=FetchDaemon.COMMANDS,
+                        help='Send a command to a running daemon, print its reply and exit')
+    parser.add_argument('--freshness-days', type=int, default=DATA_FRESHNESS_DAYS,
+                        help=f'Skip combinations fetched within this many days (default: {DATA_FRESHNESS_DAYS})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print what would be fetched and the estimated time, then exit')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile each phase (CPU and memory), writing reports to abs_profile_<timestamp>/')
     args = parser.parse_args()
     
+    if args.json_progress:
+        EVENT_STREAM = sys.stdout
+    
+    OUTPUT_COMPRESSION = args.compress
+    COMPRESSION_LEVEL = args.compress_level
+    METRICS_FILE = None if args.no_metrics else args.metrics_file
+    METRICS_FORMAT = args.metrics_format
+    PROFILE = args.profile
+    DERIVED_SERIES = not args.no_derived
+    VALIDATE_IDENTITIES = not args.no_validate
+    VALIDATION_TOLERANCE = args.validation_tolerance
+    FINGERPRINTS = not args.no_changeset
+    TRACK_REVISIONS = not args.no_revisions
+    
+    EXPORT_DIR = args.export_dir
+    STREAMING = args.streaming
+    STREAM_MEMORY_MB = args.memory_mb
+    STREAM_SPILL_DIR = args.spill_dir
+    JSON_BACKEND = args.json_backend
+    DATA_FRESHNESS_DAYS = args.freshness_days
+    
+    try:
+        json_decoder()
+        if args.export:
+            import abs_export
+            EXPORT_FORMATS = abs_export.parse_formats(args.export)
+        grid_file = load_grid(args.grid)
+        if args.grid and grid_file is None:
+            raise ValueError(f"Grid file not found: {args.grid}")
+        datasets_file = load_dataset_plugins(args.datasets_file)
+        if args.datasets_file and datasets_file is None:
+            raise ValueError(f"Datasets file not found: {args.datasets_file}")
+        datasets = select_datasets(args.datasets)
+        if datasets != [LABOUR_FORCE] and (args.daemon or args.merge_shards):
+            raise ValueError("--daemon and --merge-shards only handle the labour_force dataset")
+        if args.streaming and args.daemon:
+            raise ValueError("--daemon keeps the dataset in memory between runs - run it without --streaming")
+        if args.shard and args.merge_shards:
+            raise ValueError("--merge-shards merges into the main files - run it without --shard")
+        if args.shard:
+            use_shard(parse_shard(args.shard))
+            if args.metrics_file == parser.get_default('metrics_file'):
+                METRICS_FILE = None if args.no_metrics else f"abs_fetch_metrics_{shard_name(SHARD)}.prom"
+    except ValueError as e:
+        logging.error(f"❌ {e}")
+        sys.exit(1)
+    if grid_file:
+        logging.info(f"Grid loaded from {grid_file}")
+    if datasets_file:
+        logging.info(f"Datasets loaded from {datasets_file}")
+    
+    if args.control:
+        try:
+            reply = send_control_command(args.control, args.control_port)
+        except OSError as e:
+            logging.error(f"❌ No daemon answering on port {args.control_port}: {e}")
+            sys.exit(1)
+        print(json.dumps(reply, indent=2))
+        sys.exit(0 if reply.get("ok") else 1)
+    
+    if args.merge_shards:
+        sys.exit(0 if merge_shards() else 1)
+    
+    if args.dry_run:
+        checkpoint = load_checkpoint()
+        for dataset in datasets:
+            if len(datasets) > 1:
+                print(f"Dataset: {dataset.name}")
+            print(FetchPlan(dataset_checkpoint(checkpoint, dataset), shard=SHARD, dataset=dataset).describe())
+        sys.exit(0)
+    
     # Set API key from command-line or config file
     if args.api_key:
         API_KEY = args.api_key
@@ -503,12 +2466,26 @@ if __name__ == "__main__":
             sys.exit(1)
     
     try:
-        logging.info(f"Checkpoint file: {CHECKPOINT_FILE}")
+        if SHARD:
+            logging.info(f"Shard {SHARD[0]} of {SHARD[1]}")
+        logging.info(f"Checkpoint file: {compressed_name(CHECKPOINT_FILE, OUTPUT_COMPRESSION)}")
+        if OUTPUT_COMPRESSION != "none":
+            logging.info(f"Output compression: {OUTPUT_COMPRESSION} (level {COMPRESSION_LEVEL or 'default'})")
         logging.info(f"Data freshness threshold: {DATA_FRESHNESS_DAYS} days")
-        logging.info(f"Checkpoint save interval: every {CHECKPOINT_SAVE_INTERVAL} requests")
+        logging.info(f"Checkpoint save interval: every {CHECKPOINT_SAVE_INTERVAL} updates "
+                     f"or {CHECKPOINT_SAVE_SECONDS} seconds, whichever comes first")
         logging.info("")
         
-        result_file = main()
+        if args.daemon:
+            release_dates = load_release_dates(args.release_dates) if args.release_dates else []
+            daemon = FetchDaemon(API_KEY, args.interval, release_dates, args.control_port)
+            # systemd and friends stop services with SIGTERM - treat it like the stop command
+            import signal
+            signal.signal(signal.SIGTERM, lambda signum, frame: daemon.handle_command("stop"))
+            daemon.serve_forever()
+            sys.exit(0)
+        
+        result_file = main(datasets)
         if result_file:
             logging.info("✅ Script completed successfully")
             logging.info(f"💡 Tip: To force a full refresh, delete {CHECKPOINT_FILE}")
@@ -516,7 +2493,7 @@ if __name__ == "__main__":
             logging.error("Script completed with errors")
     except KeyboardInterrupt:
         logging.warning("\n⚠️  Script interrupted by user (Ctrl+C)")
-        logging.warning("💾 Partial progress has been saved to checkpoint file")
+        logging.warning("💾 Partial progress and data fetched so far have been saved")
         logging.warning(f"🔄 Run the script again to resume from where you left off")
     except Exception as e:
         logging.error(f"Script failed with exception: {e}", exc_info=True)
@@ -3,69 +3,126 @@ import ast
 import sys
 import glob
 import os
+import re
+import argparse
+from abs_io import open_data_file, atomic_write, compressed_name, compression_for_path, strip_compression_suffix, COMPRESSION_SUFFIXES
 
 # Increase CSV field size limit
 csv.field_size_limit(sys.maxsize)
 
-# Find the most recent abs_labour_force file
-files = glob.glob("abs_labour_force*.csv")
-files = [f for f in files if not f.endswith("_FIXED.csv")]
+# Files matching abs_labour_force*.csv that are not raw fetcher output: shard files
+# (merged by --merge-shards) and the derived series export
+NOT_INPUT_PATTERN = re.compile(r"_shard\d+of\d+_|_DERIVED\.csv$")
 
-if not files:
-    print("No ABS labour force CSV files found!")
-    print("Please run fetch_abs_data.py first.")
-    exit(1)
+def find_input_file():
+    """Find the most recent abs_labour_force file (plain, .gz or .zst), or None."""
+    files = glob.glob("abs_labour_force*.csv*")
+    files = [f for f in files if strip_compression_suffix(f).endswith(".csv")]
+    files = [f for f in files if not strip_compression_suffix(f).endswith("_FIXED.csv")]
+    files = [f for f in files if not NOT_INPUT_PATTERN.search(strip_compression_suffix(f))]
+    
+    if not files:
+        return None
+    
+    # Use the most recent file
+    return max(files, key=os.path.getctime)
 
-# Use the most recent file
-input_file = max(files, key=os.path.getctime)
-output_file = input_file.replace(".csv", "_FIXED.csv")
+def fixed_name(input_file, compression=None):
+    """Return the _FIXED.csv name for an input file, in the given compression (default: the input's)."""
+    output_compression = compression or compression_for_path(input_file)
+    return compressed_name(strip_compression_suffix(input_file).replace(".csv", "_FIXED.csv"), output_compression)
 
-print(f"Found file: {input_file}")
-print(f"Reading {input_file}...")
+def fix_csv(input_file, compression=None, compress_level=None):
+    """
+    Expand one raw ABS CSV into a _FIXED.csv file.
 
-with open(input_file, 'r') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        # The data is in the 'labour_force_statistics' column
-        data_str = row.get('labour_force_statistics', '')
+    Returns the output file name, or None if there was nothing to write.
+    """
+    output_file = fixed_name(input_file, compression)
+    
+    print(f"Found file: {input_file}")
+    print(f"Reading {input_file}...")
+    
+    with open_data_file(input_file, 'r') as f:
+        reader = csv.DictReader(f)
         
-        if not data_str:
-            print("No data found in labour_force_statistics column")
-            continue
-        
-        try:
-            # Parse the string representation of the list
-            data_records = ast.literal_eval(data_str)
-            
-            print(f"Found {len(data_records)} records")
-            
-            if len(data_records) == 0:
-                print("No records to save!")
-                exit(1)
-            
-            # Get all field names
-            fieldnames = list(data_records[0].keys())
-            
-            print(f"Fields: {', '.join(fieldnames)}")
+        # fetch_abs_data_auto.py already writes one record per row - stream it straight through
+        if reader.fieldnames and 'labour_force_statistics' not in reader.fieldnames:
+            print(f"Input is already one record per row")
+            print(f"Fields: {', '.join(reader.fieldnames)}")
             print(f"\nWriting to {output_file}...")
             
-            # Write to proper CSV
-            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            record_count = 0
+            with atomic_write(output_file, level=compress_level, newline='') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=reader.fieldnames)
                 writer.writeheader()
-                
-                for record in data_records:
+                for record in reader:
                     writer.writerow(record)
+                    record_count += 1
+            
+            print(f"✅ Success! Saved {record_count} records to {output_file}")
+            return output_file
+        
+        written = False
+        for row in reader:
+            # The data is in the 'labour_force_statistics' column
+            data_str = row.get('labour_force_statistics', '')
             
-            print(f"✅ Success! Saved {len(data_records)} records to {output_file}")
-            print(f"\nSample record:")
-            first_record = data_records[0]
-            for key, value in first_record.items():
-                print(f"  {key}: {value}")
+            if not data_str:
+                print("No data found in labour_force_statistics column")
+                continue
             
-            print(f"\nDate range: {data_records[0].get('observation_month')} to {data_records[-1].get('observation_month')}")
+            try:
+                # Parse the string representation of the list
+                data_records = ast.literal_eval(data_str)
+                
+                print(f"Found {len(data_records)} records")
+                
+                if len(data_records) == 0:
+                    print("No records to save!")
+                    return None
+                
+                # Get all field names
+                fieldnames = list(data_records[0].keys())
+                
+                print(f"Fields: {', '.join(fieldnames)}")
+                print(f"\nWriting to {output_file}...")
+                
+                # Write to proper CSV
+                with atomic_write(output_file, level=compress_level, newline='') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    writer.writeheader()
+                    
+                    for record in data_records:
+                        writer.writerow(record)
+                written = True
+                
+                print(f"✅ Success! Saved {len(data_records)} records to {output_file}")
+                print(f"\nSample record:")
+                first_record = data_records[0]
+                for key, value in first_record.items():
+                    print(f"  {key}: {value}")
+                
+                print(f"\nDate range: {data_records[0].get('observation_month')} to {data_records[-1].get('observation_month')}")
             
-        except Exception as e:
-            print(f"Error parsing data: {e}")
-            print(f"First 200 chars of data: {data_str[:200]}")
+            except Exception as e:
+                print(f"Error parsing data: {e}")
+                print(f"First 200 chars of data: {data_str[:200]}")
+    
+    return output_file if written else None
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Expand the raw ABS CSV into a _FIXED.csv file')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES),
+                        help='Compression for the _FIXED.csv output (default: same as the input)')
+    parser.add_argument('--compress-level', type=int, help='Compression level (default: codec default)')
+    args = parser.parse_args()
+    
+    input_file = find_input_file()
+    if input_file is None:
+        print("No ABS labour force CSV files found!")
+        print("Please run fetch_abs_data.py first.")
+        exit(1)
+    
+    if fix_csv(input_file, args.compress, args.compress_level) is None:
+        exit(1)
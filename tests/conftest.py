@@ -0,0 +1,19 @@
+"""Shared test setup: the top-level scripts are importable, and `fetcher` gives the fetcher a small grid."""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def fetcher(monkeypatch, tmp_path):
+    """fetch_abs_data_auto with a small grid (2 regions x 2 data items), working in a temporary folder."""
+    import fetch_abs_data_auto
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fetch_abs_data_auto, "REGIONS", ["AUSTRALIA", "VICTORIA"])
+    monkeypatch.setattr(fetch_abs_data_auto, "DATA_ITEMS", ["EMPLOYED_PERSONS", "UNEMPLOYED_PERSONS"])
+    monkeypatch.setattr(fetch_abs_data_auto, "AGE_GROUPS", ["15_AND_OVER"])
+    monkeypatch.setattr(fetch_abs_data_auto, "SEX_VALUES", ["PERSONS"])
+    monkeypatch.setattr(fetch_abs_data_auto, "ADJUSTMENT_TYPES", ["ORIGINAL"])
+    return fetch_abs_data_auto
@@ -0,0 +1,73 @@
+import json
+import pytest
+import abs_datasets
+from abs_datasets import Dataset, load_dataset_plugins, select_datasets
+
+ENTRY = {"name": "jobs", "path": "jobs-statistics", "params": {"region": ["AUSTRALIA", 1]},
+         "response_path": "jobs.data", "key_fields": ["region_description", "observation_month"]}
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    """An empty dataset registry, working in a temporary folder."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(abs_datasets, "DATASETS", {})
+    return abs_datasets.DATASETS
+
+def write_config(entries):
+    with open(abs_datasets.DATASETS_FILE, 'w') as f:
+        json.dump(entries, f)
+
+def test_no_file(registry):
+    assert load_dataset_plugins() is None
+    assert registry == {}
+
+def test_load(registry):
+    write_config([dict(ENTRY, schema={"jobs": "number"})])
+    assert load_dataset_plugins() == abs_datasets.DATASETS_FILE
+    dataset = registry["jobs"]
+    assert dataset.params == [("region", ["AUSTRALIA", "1"])]
+    assert dataset.url == abs_datasets.GATEWAY_URL + "jobs-statistics"
+    assert dataset.combination_key(["AUSTRALIA"]) == "jobs:AUSTRALIA"
+    assert dataset.data_file_prefix() == "abs_jobs_ALL_DATA"
+    assert dataset.fieldnames == ["jobs", "observation_month", "region_description"]
+    assert dataset.extract_records({"jobs": {"data": [{"a": 1}]}}) == [{"a": 1}]
+
+@pytest.mark.parametrize("entry, message", [
+    ({key: value for key, value in ENTRY.items() if key != "path"}, "missing path"),
+    (dict(ENTRY, params={"region": []}), "non-empty list"),
+    (dict(ENTRY, schema={"jobs": "float"}), "Unknown field kind"),
+    (dict(ENTRY, schema=["jobs"]), "schema must map")
+])
+def test_invalid_entries(registry, entry, message):
+    write_config([entry])
+    with pytest.raises(ValueError, match=message):
+        load_dataset_plugins()
+
+def test_duplicate_name(registry):
+    write_config([ENTRY, ENTRY])
+    with pytest.raises(ValueError, match="already taken"):
+        load_dataset_plugins()
+
+def test_select(registry):
+    for name in ("a", "b"):
+        abs_datasets.register(Dataset(name, name, [("p", ["x"])], name, ["observation_month"]))
+    assert [d.name for d in select_datasets("b, a,")] == ["b", "a"]
+    assert [d.name for d in select_datasets("ALL")] == ["a", "b"]
+    with pytest.raises(ValueError, match="Unknown dataset 'c'"):
+        select_datasets("a,c")
+
+def test_runners_share_metrics(fetcher, monkeypatch):
+    class Runner(fetcher.FetchRunner):
+        def run(self):
+            assert self.metrics.run_finished.value() == 0
+            self.metrics.requests.inc(status="success")
+            self.metrics.write(force=True)
+            return self.dataset.name
+    monkeypatch.setattr(fetcher, "FetchRunner", Runner)
+    datasets = [Dataset(name, name, [("p", ["x"])], name, ["observation_month"]) for name in ("a", "b")]
+    
+    assert fetcher.run_datasets(datasets) == ["a", "b"]
+    with open(fetcher.METRICS_FILE) as f:
+        text = f.read()
+    assert 'abs_fetch_requests_total{status="success"} 2' in text
+    assert "abs_fetch_run_finished 1" in text
@@ -0,0 +1,64 @@
+import csv
+import json
+import os
+import pytest
+import abs_export
+from abs_export import CsvSink, Sink, export_records, parse_formats
+
+FIELDS = ["observation_month", "observation_value", "region_description"]
+RECORDS = [
+    {"region_description": "Victoria", "observation_month": "2024-01", "observation_value": "1.5"},
+    {"region_description": "New South Wales", "observation_month": "2024-01", "observation_value": ""},
+    {"region_description": "Victoria", "observation_month": "2024-02", "observation_value": "2.5", "extra": "x"}
+]
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_sink_is_abstract():
+    with pytest.raises(TypeError):
+        Sink("out.csv", FIELDS)
+
+def test_csv_and_jsonl(tmp_path):
+    written = export_records(RECORDS, FIELDS, ("csv", "jsonl"), str(tmp_path), buffer_records=2, prefix="test")
+    assert written == {"csv": [str(tmp_path / "test.csv")], "jsonl": [str(tmp_path / "test.jsonl")]}
+    rows = read_csv(tmp_path / "test.csv")
+    assert [row["observation_value"] for row in rows] == ["1.5", "", "2.5"]
+    assert all(list(row) == FIELDS for row in rows)
+    with open(tmp_path / "test.jsonl") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[2] == {field: RECORDS[2][field] for field in FIELDS}
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_regions(tmp_path):
+    written = export_records(RECORDS, FIELDS, ("regions",), str(tmp_path), prefix="test")
+    assert written["regions"] == [str(tmp_path / "test_New_South_Wales.csv"), str(tmp_path / "test_Victoria.csv")]
+    assert [row["observation_month"] for row in read_csv(tmp_path / "test_Victoria.csv")] == ["2024-01", "2024-02"]
+
+def test_failure_keeps_previous_exports(tmp_path):
+    export_records(RECORDS[:1], FIELDS, ("csv",), str(tmp_path), prefix="test")
+    
+    def failing():
+        yield RECORDS[1]
+        raise OSError("disk full")
+    with pytest.raises(OSError):
+        export_records(failing(), FIELDS, ("csv", "regions"), str(tmp_path), buffer_records=1, prefix="test")
+    assert os.listdir(tmp_path) == ["test.csv"]
+    assert len(read_csv(tmp_path / "test.csv")) == 1
+
+def test_extra_sinks(tmp_path):
+    sink = CsvSink(str(tmp_path / "dataset.csv"), FIELDS)
+    written = export_records(RECORDS, FIELDS, (), extra_sinks={"dataset": sink})
+    assert written == {"dataset": [str(tmp_path / "dataset.csv")]}
+    assert sink.record_count == 3
+
+@pytest.mark.skipif(abs_export.pyarrow is not None, reason="pyarrow is installed")
+def test_parquet_needs_pyarrow(tmp_path):
+    with pytest.raises(RuntimeError):
+        export_records(RECORDS, FIELDS, ("parquet",), str(tmp_path))
+
+def test_parse_formats():
+    assert parse_formats(" CSV, jsonl ,") == ("csv", "jsonl")
+    with pytest.raises(ValueError):
+        parse_formats("csv,xml")
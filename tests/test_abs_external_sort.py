@@ -0,0 +1,35 @@
+import os
+import random
+from abs_external_sort import ExternalSorter
+
+def test_merges_spilled_runs_in_order(tmp_path):
+    items = [[random.randrange(1000), position] for position in range(2000)]
+    # A tiny budget and fan-in force many runs and more than one merge pass.
+    # Equal keys are only kept in order within a run, so the position is part of the key.
+    with ExternalSorter(lambda item: item, 1, str(tmp_path), fan_in=2) as sorter:
+        for item in items:
+            sorter.add(item)
+        merged = list(sorter.merged())
+        assert len(sorter.runs) <= 2
+        spill_dir = sorter.spill_dir
+    assert merged == sorted(items)
+    assert not os.path.exists(spill_dir)
+
+def test_in_memory_when_it_fits(tmp_path):
+    with ExternalSorter(lambda item: item, 1024 * 1024, str(tmp_path)) as sorter:
+        for item in (3, 1, 2):
+            sorter.add(item)
+        assert list(sorter.merged()) == [1, 2, 3]
+        assert sorter.runs == [] and sorter.spilled_bytes == 0
+
+def test_dedupe_by_priority(tmp_path):
+    # The streaming fetcher keeps the first item per key, ordered by (key, priority, sequence)
+    items = [["b", 1, 0, "existing b"], ["a", 2, 1, "fetched a"], ["b", 0, 2, "fetched b"],
+             ["a", 1, 3, "existing a"], ["c", 2, 4, "fetched c"]]
+    with ExternalSorter(lambda item: item[:3], 1, str(tmp_path)) as sorter:
+        for item in items:
+            sorter.add(item)
+        winners = {}
+        for key, _, _, value in sorter.merged():
+            winners.setdefault(key, value)
+    assert winners == {"a": "existing a", "b": "fetched b", "c": "fetched c"}
@@ -0,0 +1,68 @@
+import csv
+import json
+from abs_data_store import SeriesIndex, SERIES_FIELDS
+from abs_fingerprints import Fingerprints, diff, fingerprint_series
+
+SERIES_A = ("Australia", "Employed persons", "15 and over", "Persons", "Original")
+SERIES_B = ("Victoria", "Employed persons", "15 and over", "Persons", "Original")
+SERIES_C = ("Victoria", "Unemployed persons", "15 and over", "Persons", "Original")
+
+def records(series):
+    return [dict(zip(SERIES_FIELDS, key), observation_month=month, observation_value=value)
+            for key, observations in series.items() for month, value in observations.items()]
+
+OLD = {SERIES_A: {"2023-12": "10", "2024-01": "11", "2024-02": "12"},
+       SERIES_B: {"2023-12": "5", "2024-01": "6"},
+       SERIES_C: {"2024-01": "1"}}
+NEW = {SERIES_A: {"2023-12": "10", "2024-01": "11.5", "2024-02": "12", "2024-03": "13"},
+       SERIES_B: {"2023-12": "5", "2024-01": "6"},
+       ("Victoria", "Employed full time", "15 and over", "Persons", "Original"): {"2024-01": "4"}}
+
+def test_blocks_are_years():
+    fingerprint, blocks = fingerprint_series(["2023-12", "2024-01"], ["1", "2"])
+    assert sorted(blocks) == ["2023", "2024"]
+    assert fingerprint_series(["2023-12", "2024-01"], ["1", "3"])[1]["2023"] == blocks["2023"]
+
+def test_diff():
+    old_index, new_index = SeriesIndex.from_records(records(OLD)), SeriesIndex.from_records(records(NEW))
+    changeset = diff(Fingerprints.build(old_index), Fingerprints.build(new_index), old_index, new_index)
+    assert changeset["summary"] == {"series_unchanged": 1, "series_changed": 1, "series_new": 1,
+                                    "series_vanished": 1, "new_months": 1, "revised_values": 1, "removed_months": 0}
+    assert changeset["changes"] == [{"series": list(SERIES_A), "new_months": {"2024-03": "13"},
+                                     "revised": {"2024-01": ["11", "11.5"]}, "removed_months": []}]
+    assert changeset["vanished_series"] == [list(SERIES_C)]
+
+def test_diff_reads_only_changed_series():
+    # Unchanged series are never looked up, so an index holding just the changed ones is enough
+    old_index, new_index = SeriesIndex.from_records(records(OLD)), SeriesIndex.from_records(records(NEW))
+    old, new = Fingerprints.build(old_index), Fingerprints.build(new_index)
+    changed_only = SeriesIndex.from_records(records({SERIES_A: OLD[SERIES_A]}))
+    assert diff(old, new, changed_only, new_index)["changes"] == diff(old, new, old_index, new_index)["changes"]
+
+def write_dataset(path, series):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(SERIES_FIELDS) + ["observation_month", "observation_value"])
+        writer.writeheader()
+        writer.writerows(records(series))
+
+def test_saved_fingerprints_hold_no_values(tmp_path):
+    old_file, new_file = str(tmp_path / "old_FIXED.csv"), str(tmp_path / "new_FIXED.csv")
+    write_dataset(old_file, OLD)
+    write_dataset(new_file, NEW)
+    for dataset in (old_file, new_file):
+        Fingerprints.build(SeriesIndex.load(dataset), source=dataset).save(dataset + ".fp.json")
+    with open(old_file + ".fp.json") as f:
+        assert "11" not in [value for entry in json.load(f)["series"] for value in entry["blocks"].values()]
+    
+    old, new = Fingerprints.load(old_file + ".fp.json"), Fingerprints.load(new_file + ".fp.json")
+    assert old.series == Fingerprints.build(SeriesIndex.load(old_file)).series
+    # Without indexes, the values are read from the source datasets
+    assert diff(old, new)["changes"][0]["revised"] == {"2024-01": ["11", "11.5"]}
+
+def test_loads_files_with_values(tmp_path):
+    fingerprint, blocks = fingerprint_series(["2024-01"], ["1"])
+    path = str(tmp_path / "fp.json")
+    with open(path, 'w') as f:
+        json.dump({"series": [{"key": list(SERIES_A), "fingerprint": fingerprint,
+                               "blocks": {"2024": [blocks["2024"], {"2024-01": "1"}]}}]}, f)
+    assert Fingerprints.load(path).series == {SERIES_A: (fingerprint, blocks)}
@@ -0,0 +1,82 @@
+import os
+import pytest
+import abs_io
+from abs_io import atomic_write, open_data_file, compressed_name, compression_for_path, strip_compression_suffix
+
+CODECS = ["none", "gzip"] + (["zstd"] if abs_io.zstandard is not None else [])
+
+@pytest.mark.parametrize("compression", CODECS)
+def test_round_trip(tmp_path, compression):
+    path = compressed_name(str(tmp_path / "data.csv"), compression)
+    assert compression_for_path(path) == compression
+    text = "a,b\r\n1,2\r\n" * 100
+    with open_data_file(path, 'w', newline='') as f:
+        f.write(text)
+    with open_data_file(path, 'r', newline='') as f:
+        assert f.read() == text
+
+@pytest.mark.parametrize("compression", CODECS)
+def test_append(tmp_path, compression):
+    path = compressed_name(str(tmp_path / "log.txt"), compression)
+    for line in ("one\n", "two\n"):
+        with open_data_file(path, 'a') as f:
+            f.write(line)
+    with open_data_file(path) as f:
+        assert f.read() == "one\ntwo\n"
+
+@pytest.mark.parametrize("compression", CODECS)
+def test_atomic_round_trip(tmp_path, compression):
+    path = compressed_name(str(tmp_path / "data.csv"), compression)
+    text = "a,b\n1,2\n" * 100
+    with atomic_write(path, newline='') as f:
+        f.write(text)
+    with open_data_file(path, 'r', newline='') as f:
+        assert f.read() == text
+    assert not os.path.exists(path + ".tmp")
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = str(tmp_path / "out.txt")
+    with atomic_write(path) as f:
+        f.write("old")
+    with atomic_write(path) as f:
+        f.write("new")
+    with open(path) as f:
+        assert f.read() == "new"
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path):
+    path = str(tmp_path / "out.txt")
+    with atomic_write(path) as f:
+        f.write("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write("half")
+            raise RuntimeError("crash")
+    with open(path) as f:
+        assert f.read() == "old"
+    assert not os.path.exists(path + ".tmp")
+
+def test_atomic_write_binary(tmp_path):
+    path = str(tmp_path / "out.bin")
+    with atomic_write(path, binary=True) as f:
+        f.write(b"\x00\x01")
+    with open(path, 'rb') as f:
+        assert f.read() == b"\x00\x01"
+    with pytest.raises(ValueError):
+        with atomic_write(path + ".gz", binary=True):
+            pass
+
+def test_names():
+    assert compressed_name("data.csv.gz", "zstd") == "data.csv.zst"
+    assert compressed_name("data.csv", "none") == "data.csv"
+    assert strip_compression_suffix("data.csv.zst") == "data.csv"
+
+def test_find_existing_variant(tmp_path):
+    base = str(tmp_path / "data.csv")
+    assert abs_io.find_existing_variant(base) is None
+    with open_data_file(base + ".gz", 'w') as f:
+        f.write("x")
+    assert abs_io.find_existing_variant(base) == base + ".gz"
+
+def test_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        open_data_file(str(tmp_path / "data.csv"), 'w', compression="bz2")
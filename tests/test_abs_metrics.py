@@ -0,0 +1,46 @@
+from abs_metrics import MetricsRegistry, format_value
+
+def registry():
+    metrics = MetricsRegistry()
+    metrics.counter("abs_requests_total", "Requests", ("status",)).inc(2, status="ok")
+    metrics.gauge("abs_last_run", "Last run").set(1.5)
+    histogram = metrics.histogram("abs_latency_seconds", "Latency", (0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(5)
+    return metrics
+
+def test_render_prometheus():
+    assert registry().render() == "\n".join([
+        "# HELP abs_requests_total Requests",
+        "# TYPE abs_requests_total counter",
+        'abs_requests_total{status="ok"} 2',
+        "# HELP abs_last_run Last run",
+        "# TYPE abs_last_run gauge",
+        "abs_last_run 1.5",
+        "# HELP abs_latency_seconds Latency",
+        "# TYPE abs_latency_seconds histogram",
+        'abs_latency_seconds_bucket{le="0.1"} 1',
+        'abs_latency_seconds_bucket{le="1"} 1',
+        'abs_latency_seconds_bucket{le="+Inf"} 2',
+        "abs_latency_seconds_sum 5.05",
+        "abs_latency_seconds_count 2"]) + "\n"
+
+def test_render_openmetrics():
+    text = registry().render(openmetrics=True)
+    assert "# TYPE abs_requests counter\n" in text
+    assert text.endswith("# EOF\n")
+
+def test_label_escaping():
+    metrics = MetricsRegistry()
+    metrics.counter("x_total", "X", ("path",)).inc(path='C:\\a "b"\n')
+    assert 'x_total{path="C:\\\\a \\"b\\"\\n"} 1' in metrics.render()
+
+def test_write_textfile(tmp_path):
+    path = str(tmp_path / "metrics.prom")
+    registry().write_textfile(path)
+    with open(path) as f:
+        assert f.read() == registry().render()
+
+def test_format_value():
+    assert format_value(3.0) == "3"
+    assert format_value(float("inf")) == "+Inf"
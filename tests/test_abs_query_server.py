@@ -0,0 +1,61 @@
+import os
+import csv
+import json
+from abs_data_store import SERIES_FIELDS
+from abs_query_server import LRUCache, QueryService
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # "b" is now the least recently used
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 2, "misses": 1}
+
+def write_dataset(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(SERIES_FIELDS) + ["observation_month", "observation_value"])
+        writer.writeheader()
+        for region, month, value in rows:
+            writer.writerow(dict(zip(SERIES_FIELDS, (region, "Employed persons", "15 and over", "Persons", "Original")),
+                                 observation_month=month, observation_value=value))
+
+def query(service, **params):
+    status, body = service.handle("/series", {name: [value] for name, value in params.items()})
+    return status, json.loads(body)
+
+def test_series_queries_are_cached_per_snapshot(tmp_path):
+    path = str(tmp_path / "abs_labour_force_ALL_DATA_20250101_000000_FIXED.csv")
+    write_dataset(path, [("Victoria", "2024-01", "1"), ("Victoria", "2024-02", ""), ("Australia", "2024-01", "5")])
+    service = QueryService(path)
+    assert service.handle("/series", {})[0] == 503
+    assert service.check_for_update() is False  # A change must look the same for two polls
+    assert service.check_for_update() is True
+    
+    status, result = query(service, region="Victoria")
+    assert status == 200
+    assert [(s["region"], s["months"], s["values"]) for s in result["series"]] == [("Victoria", ["2024-01", "2024-02"], [1.0, None])]
+    query(service, region="Victoria")
+    assert service.snapshot.cache.stats()["hits"] == 1
+    assert query(service, region="Victoria", **{"from": "2024-02"})[1]["series"][0]["months"] == ["2024-02"]
+    
+    # A new dataset replaces the snapshot and its cache together
+    write_dataset(path, [("Victoria", "2024-01", "2")])
+    os.utime(path, ns=(1, 1))
+    service.check_for_update()
+    assert service.check_for_update() is True
+    assert query(service, region="Victoria")[1]["series"][0]["values"] == [2.0]
+    assert service.snapshot.cache.stats()["hits"] == 0
+
+def test_bad_requests(tmp_path):
+    path = str(tmp_path / "data_FIXED.csv")
+    write_dataset(path, [("Victoria", "2024-01", "1")])
+    service = QueryService(path)
+    service.load(service.dataset_signature())
+    assert query(service, colour="red")[0] == 400
+    assert service.handle("/values/colour", {})[0] == 404
+    assert json.loads(service.handle("/values/region", {})[1]) == ["Victoria"]
+    assert service.handle("/nowhere", {})[0] == 404
+    assert json.loads(service.handle("/status", {})[1])["records"] == 1
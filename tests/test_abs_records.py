@@ -0,0 +1,39 @@
+import pytest
+from abs_records import RecordSchema, JsonDecoder, available_backends
+
+SCHEMA = RecordSchema({"region": "text", "month": "month", "value": "number"}, required=("region", "month"))
+
+def test_accepts_and_coerces():
+    record = {"region": "Victoria", "month": "2024-01", "value": 5.2}
+    assert SCHEMA.check_record(record) is None
+    assert record["value"] == "5.2"
+
+def test_optional_number_may_be_null_or_blank():
+    records = [{"region": "Victoria", "month": "2024-01", "value": None},
+               {"region": "Victoria", "month": "2024-02", "value": ""},
+               {"region": "Victoria", "month": "2024-03"}]
+    accepted, rejections = SCHEMA.check(records)
+    assert len(accepted) == 3 and not rejections
+    assert records[0]["value"] == ""
+    assert "value" not in records[2]
+
+def test_rejections_are_counted_by_reason():
+    records = [{"month": "2024-01"},
+               {"region": "Victoria", "month": "Jan 2024"},
+               {"region": "Victoria", "month": "2024-01", "value": "n/a"},
+               {"region": 3, "month": "2024-01"},
+               "not a record"]
+    accepted, rejections = SCHEMA.check(records)
+    assert accepted == []
+    assert rejections == {"missing region": 1, "bad month": 1, "bad value": 1, "bad region": 1, "not an object": 1}
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        RecordSchema({"value": "float"})
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_decoders_agree(backend):
+    decoder = JsonDecoder(backend)
+    assert decoder.decode(b'{"a": [1, "x", null]}') == {"a": [1, "x", None]}
+    with pytest.raises(ValueError):
+        decoder.decode(b'{"a": ')
@@ -0,0 +1,93 @@
+from abs_data_store import SERIES_FIELDS
+from abs_revisions import RevisionStore, VintageWriter, append_vintage, new_vintage, trim_partial_line
+
+SERIES = ("Australia", "Employed persons", "15 and over", "Persons", "Seasonally adjusted")
+
+def record(month, value, series=SERIES):
+    return dict(zip(SERIES_FIELDS, series), observation_month=month, observation_value=value)
+
+def values(records):
+    return {r["observation_month"]: r["observation_value"] for r in records}
+
+def test_as_of(tmp_path):
+    path = str(tmp_path / "revisions.jsonl")
+    append_vintage([record("2024-01", "10"), record("2024-02", "11")], path, "2024-03-01T10:00:00", baseline=True)
+    append_vintage([record("2024-02", "11.5"), record("2024-03", "12")], path, "2024-04-01T10:00:00.000001")
+    store = RevisionStore.load(path)
+    
+    assert store.as_of("2024-02-01") == []
+    assert values(store.as_of("2024-03-31T23:59:59.999999")) == {"2024-01": "10", "2024-02": "11"}
+    assert values(store.as_of("2024-04-01T10:00:00.000001")) == {"2024-01": "10", "2024-02": "11.5", "2024-03": "12"}
+    assert store.revisions(SERIES) == {"2024-02": [("2024-03-01T10:00:00", "11"), ("2024-04-01T10:00:00.000001", "11.5")]}
+    assert store.revision_count() == 1
+    
+    early = RevisionStore.load(path, until="2024-03-31")
+    assert early.vintages == ["2024-03-01T10:00:00"]
+
+def test_as_of_results_are_not_shared(tmp_path):
+    path = str(tmp_path / "revisions.jsonl")
+    append_vintage([record("2024-01", "10")], path, "2024-03-01T10:00:00")
+    store = RevisionStore.load(path)
+    first = store.as_of("2025")
+    first.clear()
+    assert len(store.as_of("2025")) == 1
+
+def test_vintage_names_increase():
+    names = [new_vintage() for _ in range(100)]
+    assert names == sorted(set(names))
+
+def test_vintage_writer_matches_append(tmp_path):
+    records = [record("2024-01", "10"), record("2024-01", "3", SERIES[:3] + ("Males", SERIES[4]))]
+    appended, written = str(tmp_path / "appended.jsonl"), str(tmp_path / "written.jsonl")
+    append_vintage(records, appended, "2024-03-01T10:00:00")
+    writer = VintageWriter(written, "2024-03-01T10:00:00")
+    for r in records:
+        writer.add(r)
+    assert writer.close() == 2
+    assert RevisionStore.load(written).history == RevisionStore.load(appended).history
+    
+    empty = VintageWriter(written)
+    assert empty.close() == 0
+    assert len(RevisionStore.load(written).vintages) == 1
+
+def test_recovers_from_a_partial_append(tmp_path):
+    path = str(tmp_path / "revisions.jsonl")
+    append_vintage([record("2024-01", "10")], path, "2024-03-01T10:00:00", baseline=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"vintage":"2024-04-01T10:00:00","series":[["Aus')  # Crash mid-write
+    
+    store = RevisionStore.load(path)
+    assert store.vintages == ["2024-03-01T10:00:00"]
+    
+    append_vintage([record("2024-01", "11")], path, "2024-05-01T10:00:00")
+    with open(path, encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 2
+    assert values(RevisionStore.load(path).as_of("2025")) == {"2024-01": "11"}
+    
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"vintage":')
+    writer = VintageWriter(path, "2024-06-01T10:00:00")
+    writer.add(record("2024-01", "12"))
+    writer.close()
+    assert RevisionStore.load(path).vintages == ["2024-03-01T10:00:00", "2024-05-01T10:00:00", "2024-06-01T10:00:00"]
+
+def test_skips_unreadable_lines(tmp_path):
+    # Logs written before appends trimmed partial lines can have one glued to the next vintage
+    path = str(tmp_path / "revisions.jsonl")
+    append_vintage([record("2024-01", "10")], path, "2024-03-01T10:00:00")
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"vintage":"2024-04')
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"vintage":"2024-05-01T10:00:00","series":[],"observations":[]}\n')
+    append_vintage([record("2024-01", "12")], path, "2024-06-01T10:00:00")
+    assert RevisionStore.load(path).vintages == ["2024-03-01T10:00:00", "2024-06-01T10:00:00"]
+
+def test_trim_partial_line(tmp_path):
+    path = tmp_path / "log.jsonl"
+    assert trim_partial_line(str(path)) == 0
+    path.write_bytes(b"")
+    assert trim_partial_line(str(path)) == 0
+    path.write_bytes(b"partial")
+    assert trim_partial_line(str(path)) == 7 and path.read_bytes() == b""
+    path.write_bytes(b"one\ntwo\n")
+    assert trim_partial_line(str(path)) == 0 and path.read_bytes() == b"one\ntwo\n"
@@ -0,0 +1,94 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import abs_validation
+from abs_data_store import SeriesIndex, SERIES_FIELDS
+from abs_derived import DerivedSeries
+
+def codes(region, data_item, sex="PERSONS", adjustment="ORIGINAL"):
+    return (region, data_item, "AGE_15_AND_OVER", sex, adjustment)
+
+def labour_force_identity():
+    return next(identity for identity in abs_validation.IDENTITIES if identity[0] == "labour_force")
+
+def test_match_identity():
+    code_rows = {codes("AUS", "LABOUR_FORCE"): 0, codes("AUS", "EMPLOYED_PERSONS"): 1,
+                 codes("AUS", "UNEMPLOYED_PERSONS"): 2, codes("VIC", "LABOUR_FORCE"): 3,
+                 codes("VIC", "EMPLOYED_PERSONS"): 4}
+    total_rows, part_rows = abs_validation.match_identity(code_rows, labour_force_identity())
+    # Victoria has no unemployed series, so only Australia is checked
+    assert total_rows.tolist() == [0]
+    assert [rows.tolist() for rows in part_rows] == [[1], [2]]
+
+def test_match_identity_skips_rates_and_adjustment_types():
+    identity = next(identity for identity in abs_validation.IDENTITIES if identity[0] == "persons_males_females")
+    code_rows = {}
+    for item in ("UNEMPLOYMENT_RATE", "EMPLOYED_PERSONS"):
+        for adjustment in ("ORIGINAL", "SEASONALLY_ADJUSTED"):
+            for sex in ("PERSONS", "MALES", "FEMALES"):
+                code_rows[codes("AUS", item, sex, adjustment)] = len(code_rows)
+    total_rows, _ = abs_validation.match_identity(code_rows, identity)
+    assert total_rows.tolist() == [code_rows[codes("AUS", "EMPLOYED_PERSONS")]]
+
+def test_abs_tolerance_for():
+    assert abs_validation.abs_tolerance_for("EMPLOYED_PERSONS") == abs_validation.VALIDATION_ABS_TOLERANCE
+    assert abs_validation.abs_tolerance_for("UNEMPLOYMENT_RATE") is None
+
+def test_validate():
+    series = {"Labour force": ("LABOUR_FORCE", ["100", "101"]),
+              "Employed persons": ("EMPLOYED_PERSONS", ["90", "90"]),
+              "Unemployed persons": ("UNEMPLOYED_PERSONS", ["10", "10"])}
+    records = [dict(zip(SERIES_FIELDS, ("Australia", item, "15 and over", "Persons", "Original")),
+                    observation_month=month, observation_value=value)
+               for item, (_, values) in series.items() for month, value in zip(("2024-01", "2024-02"), values)]
+    derived = DerivedSeries()
+    derived.update(SeriesIndex.from_records(records))
+    series_codes = {("Australia", item, "15 and over", "Persons", "Original"): codes("AUS", code)
+                    for item, (code, _) in series.items()}
+    
+    result = abs_validation.validate(derived, series_codes)
+    assert result["series_checked"] == 1 and result["months_checked"] == 2
+    assert result["violation_count"] == 1
+    violation = result["violations"][0]
+    assert (violation["identity"], violation["worst_month"], violation["difference"]) == ("labour_force", "2024-02", 1.0)
+    assert "persons_males_females" in result["unmatched_identities"]
+    assert result["unmapped_series"] == 0
+    
+    # Series without grid codes are never matched
+    assert abs_validation.validate(derived, {})["series_checked"] == 0
+
+def test_series_codes_from_checkpoint_and_grid(fetcher):
+    checkpoint = fetcher.empty_checkpoint()
+    recorded = ("Australia", "Employed persons", "15 years and over", "Persons", "Original")
+    fetcher.set_combination_status(checkpoint, "AUSTRALIA_EMPLOYED_PERSONS_15_AND_OVER_PERSONS_ORIGINAL",
+                                   {"status": "completed", "series": list(recorded)})
+    keys = [
+        recorded,
+        # Fetched before series were recorded: "15 years and over" is known from the recorded series
+        ("Victoria", "Unemployed persons", "15 years and over", "Persons", "Original"),
+        # Spelled-out codes
+        ("Victoria", "Employed persons", "15 and over", "Persons", "Original"),
+        # Not in the grid
+        ("Tasmania", "Employed persons", "15 and over", "Persons", "Original")
+    ]
+    codes = fetcher.series_codes(checkpoint, keys)
+    assert codes == {
+        keys[0]: ("AUSTRALIA", "EMPLOYED_PERSONS", "15_AND_OVER", "PERSONS", "ORIGINAL"),
+        keys[1]: ("VICTORIA", "UNEMPLOYED_PERSONS", "15_AND_OVER", "PERSONS", "ORIGINAL"),
+        keys[2]: ("VICTORIA", "EMPLOYED_PERSONS", "15_AND_OVER", "PERSONS", "ORIGINAL")
+    }
+    assert fetcher.series_codes(checkpoint) == {keys[0]: codes[keys[0]]}
+
+def test_rel_tolerance(fetcher, monkeypatch):
+    monkeypatch.setattr(fetcher, "DATA_ITEMS", ["LABOUR_FORCE", "EMPLOYED_PERSONS", "UNEMPLOYED_PERSONS"])
+    series = {"Labour force": ["100", "110"], "Employed persons": ["90", "90"], "Unemployed persons": ["10", "10"]}
+    records = [dict(zip(SERIES_FIELDS, ("Australia", item, "15 and over", "Persons", "Original")),
+                    observation_month=month, observation_value=value)
+               for item, values in series.items() for month, value in zip(("2024-01", "2024-02"), values)]
+    derived = DerivedSeries()
+    derived.update(SeriesIndex.from_records(records))
+    codes = fetcher.series_codes(fetcher.empty_checkpoint(), derived.keys)
+    assert len(codes) == 3
+    assert abs_validation.validate(derived, codes)["violation_count"] == 1
+    assert abs_validation.validate(derived, codes, rel_tolerance=0.1)["violation_count"] == 0
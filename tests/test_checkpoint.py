@@ -0,0 +1,29 @@
+import os
+
+def test_group_commit(fetcher, monkeypatch):
+    monkeypatch.setattr(fetcher, "CHECKPOINT_SAVE_INTERVAL", 3)
+    runner = fetcher.FetchRunner()
+    runner.checkpoint_root = fetcher.load_checkpoint()
+    saves = []
+    monkeypatch.setattr(fetcher, "save_checkpoint", saves.append)
+    
+    for _ in range(7):
+        runner.checkpoint_updated()
+    assert len(saves) == 2 and runner.unsaved_updates == 1
+    
+    # A slow run saves once the oldest unsaved update is old enough
+    monkeypatch.setattr(fetcher, "CHECKPOINT_SAVE_SECONDS", 0)
+    runner.checkpoint_updated()
+    assert len(saves) == 3 and runner.unsaved_updates == 0
+
+def test_save_replaces_other_compressions(fetcher, monkeypatch):
+    checkpoint = fetcher.load_checkpoint()
+    fetcher.save_checkpoint(checkpoint)
+    assert os.path.exists(fetcher.CHECKPOINT_FILE)
+    
+    monkeypatch.setattr(fetcher, "OUTPUT_COMPRESSION", "gzip")
+    checkpoint["total_records"] = 5
+    fetcher.save_checkpoint(checkpoint)
+    assert not os.path.exists(fetcher.CHECKPOINT_FILE)
+    assert fetcher.load_checkpoint()["total_records"] == 5
+    assert not [name for name in os.listdir() if name.endswith(".tmp")]
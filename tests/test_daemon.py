@@ -0,0 +1,52 @@
+from datetime import datetime
+
+class RunningFetch:
+    """Stands in for the FetchRunner a daemon run is using."""
+    
+    plan = None
+    
+    def __init__(self):
+        self.stopped = False
+    
+    def stop(self):
+        self.stopped = True
+
+def test_refresh(fetcher):
+    daemon = fetcher.FetchDaemon("key")
+    assert daemon.handle_command("refresh\n") == {"ok": True, "message": "Refresh started"}
+    assert daemon.wake_event.is_set() and not daemon.refresh_all
+    daemon.runner = RunningFetch()
+    reply = daemon.handle_command("  Refresh   ALL ")
+    assert reply["message"] == "Refresh queued after the current run"
+    assert daemon.refresh_all
+
+def test_stop_cancels_the_current_run(fetcher):
+    daemon = fetcher.FetchDaemon("key")
+    daemon.runner = runner = RunningFetch()
+    assert daemon.handle_command("stop") == {"ok": True, "message": "Stopping"}
+    assert daemon.stopping and runner.stopped and daemon.wake_event.is_set()
+
+def test_status_and_unknown_commands(fetcher):
+    daemon = fetcher.FetchDaemon("key", release_dates=[datetime(2000, 1, 1, 11, 30), datetime(2999, 1, 1, 11, 30)])
+    status = daemon.handle_command("status")
+    assert status["state"] == "idle" and status["runs"] == 0
+    assert status["latest_release"] == "2000-01-01T11:30:00"
+    assert status["next_release"] == "2999-01-01T11:30:00"
+    
+    reply = daemon.handle_command("reboot")
+    assert not reply["ok"] and reply["commands"] == list(fetcher.FetchDaemon.COMMANDS)
+
+def test_control_socket(fetcher):
+    daemon = fetcher.FetchDaemon("key", control_port=0)
+    server = daemon.start_control_server()
+    try:
+        reply = fetcher.send_control_command("status", port=server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert reply["ok"] and reply["state"] == "idle"
+
+def test_load_release_dates(fetcher, tmp_path):
+    path = tmp_path / "releases.txt"
+    path.write_text("# 2025 releases\n2025-02-20\n\n2025-01-16  # January\n")
+    assert fetcher.load_release_dates(str(path)) == [datetime(2025, 1, 16, 11, 30), datetime(2025, 2, 20, 11, 30)]
@@ -0,0 +1,50 @@
+import os
+import sys
+import subprocess
+from datetime import datetime, timedelta
+
+def completed(days_ago):
+    return {"status": "completed", "records": 1, "fetched_at": (datetime.now() - timedelta(days=days_ago)).isoformat()}
+
+def checkpoint_with(fetcher, entries):
+    checkpoint = fetcher.empty_checkpoint()
+    keys = [entry[-1] for entry in fetcher.iter_combinations()]
+    for key, entry in zip(keys, entries):
+        if entry is not None:
+            fetcher.set_combination_status(checkpoint, key, entry)
+    return checkpoint, keys
+
+def test_plan_classifies_every_combination(fetcher):
+    checkpoint, keys = checkpoint_with(fetcher, [completed(1), completed(30), {"status": "failed"}, None])
+    checkpoint["completed_combinations"]["extra"] = {"status": "not_available"}
+    plan = fetcher.FetchPlan(checkpoint, freshness_days=7)
+    assert plan.total == 4
+    assert plan.counts == {"new": 1, "stale": 1, "retry": 1, "fresh": 1, "not_available": 0}
+    assert [entry[-1] for entry in plan.to_fetch] == keys[1:]
+    assert plan.skip_count == 1
+
+def test_not_available_is_never_refetched(fetcher):
+    checkpoint, keys = checkpoint_with(fetcher, [{"status": "not_available"}])
+    assert fetcher.is_combination_fresh(checkpoint, keys[0], freshness_days=0)
+    assert keys[0] not in [entry[-1] for entry in fetcher.FetchPlan(checkpoint, freshness_days=0).to_fetch]
+
+def test_fresh_after_moves_the_cutoff(fetcher):
+    checkpoint, keys = checkpoint_with(fetcher, [completed(2)] * 4)
+    assert fetcher.FetchPlan(checkpoint, freshness_days=7).to_fetch == []
+    release = datetime.now() - timedelta(days=1)
+    assert len(fetcher.FetchPlan(checkpoint, freshness_days=7, fresh_after=release).to_fetch) == 4
+
+def test_freshness_days_default_is_read_when_called(fetcher, monkeypatch):
+    checkpoint, keys = checkpoint_with(fetcher, [completed(3)])
+    assert fetcher.is_combination_fresh(checkpoint, keys[0])
+    monkeypatch.setattr(fetcher, "DATA_FRESHNESS_DAYS", 2)
+    assert not fetcher.is_combination_fresh(checkpoint, keys[0])
+    assert fetcher.FetchPlan(checkpoint).counts["stale"] == 1
+
+def test_import_is_cheap():
+    # requests, numpy and the JSON libraries are imported on first use
+    code = ("import sys, fetch_abs_data_auto; "
+            "print(','.join(m for m in ('requests', 'numpy', 'orjson', 'msgspec') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == ""
@@ -0,0 +1,34 @@
+from abs_data_store import SERIES_FIELDS
+
+def record(month, value, region="Australia"):
+    return dict(zip(SERIES_FIELDS, (region, "Employed persons", "15 and over", "Persons", "Original")),
+                observation_month=month, observation_value=value)
+
+def test_first_value_wins_without_revisions(fetcher):
+    data = [record("2024-01", "10")]
+    added = fetcher.merge_new_records(data, [record("2024-01", "11"), record("2024-02", "12")], "combo")
+    assert added == 1
+    assert [r["observation_value"] for r in data] == ["10", "12"]
+
+def test_revisions_update_in_place(fetcher):
+    data = [record("2024-01", "10"), record("2024-02", "20")]
+    keys = {fetcher.record_key(r): r for r in data}
+    revisions = []
+    
+    added = fetcher.merge_new_records(data, [record("2024-01", "10"), record("2024-02", "21"), record("2024-03", "30")],
+                                      "combo", keys, revisions)
+    assert added == 1
+    assert [r["observation_value"] for r in data] == ["10", "21", "30"]
+    assert revisions == [(data[1], "20")]
+    
+    # The key index is kept up to date across calls, including records added by earlier ones
+    fetcher.merge_new_records(data, [record("2024-03", "31")], "combo", keys, revisions)
+    assert len(data) == 3 and data[2]["observation_value"] == "31"
+    assert revisions[-1] == (data[2], "30")
+
+def test_later_duplicates_in_one_response_win(fetcher):
+    data = []
+    revisions = []
+    fetcher.merge_new_records(data, [record("2024-01", "1"), record("2024-01", "2")], "combo", {}, revisions)
+    assert [r["observation_value"] for r in data] == ["2"]
+    assert revisions == [(data[0], "1")]
@@ -0,0 +1,60 @@
+import os
+import csv
+import json
+import pytest
+from abs_data_store import SERIES_FIELDS
+
+def test_parse_shard(fetcher):
+    assert fetcher.parse_shard("2/3") == (2, 3)
+    for text in ("0/3", "4/3", "2", "a/b"):
+        with pytest.raises(ValueError):
+            fetcher.parse_shard(text)
+
+def test_shards_partition_the_grid(fetcher, monkeypatch):
+    monkeypatch.setattr(fetcher, "REGIONS", [f"REGION_{n}" for n in range(20)])
+    everything = [entry[-1] for entry in fetcher.iter_combinations()]
+    shards = [[entry[-1] for entry in fetcher.iter_combinations(shard=(i, 3))] for i in (1, 2, 3)]
+    assert sorted(key for shard in shards for key in shard) == sorted(everything)
+    assert all(shards)
+    # crc32, not hash(): the same split on every machine
+    assert fetcher.in_shard("AUSTRALIA_EMPLOYED_PERSONS_15_AND_OVER_PERSONS_ORIGINAL", None)
+    assert [fetcher.in_shard(key, (1, 3)) for key in everything[:4]] == [key in shards[0] for key in everything[:4]]
+
+def record(region, month, value):
+    return dict(zip(SERIES_FIELDS, (region, "Employed persons", "15 and over", "Persons", "Original")),
+                observation_month=month, observation_value=value)
+
+def write_shard(fetcher, name, entries, records, mtime):
+    with open(f"abs_fetch_checkpoint_{name}.json", 'w') as f:
+        json.dump(dict(fetcher.empty_checkpoint(), completed_combinations=entries), f)
+    path = f"abs_labour_force_{name}_20250101_000000_FIXED.csv"
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(SERIES_FIELDS) + ["observation_month", "observation_value"])
+        writer.writeheader()
+        writer.writerows(records)
+    os.utime(path, (mtime, mtime))
+
+def test_merge_shards(fetcher):
+    write_shard(fetcher, "shard1of2",
+                {"A": {"status": "completed", "fetched_at": "2025-01-01T00:00:00"},
+                 "B": {"status": "completed", "fetched_at": "2025-02-01T00:00:00"}},
+                [record("Australia", "2024-01", "1"), record("Australia", "2024-02", "2")], 1000)
+    write_shard(fetcher, "shard2of2",
+                {"B": {"status": "completed", "fetched_at": "2025-01-15T00:00:00"},
+                 "C": {"status": "failed", "fetched_at": "2025-03-01T00:00:00"}},
+                [record("Australia", "2024-02", "2.5"), record("Victoria", "2024-01", "3")], 2000)
+    
+    merged_file = fetcher.merge_shards()
+    
+    checkpoint = fetcher.load_checkpoint()
+    assert checkpoint["completed_combinations"]["B"]["fetched_at"] == "2025-02-01T00:00:00"
+    assert set(checkpoint["completed_combinations"]) == {"A", "B", "C"}
+    assert checkpoint["total_records"] == 3
+    with open(merged_file, newline='') as f:
+        values = {(r["region_description"], r["observation_month"]): r["observation_value"] for r in csv.DictReader(f)}
+    # The newest data file wins for a record in both
+    assert values == {("Australia", "2024-01"): "1", ("Australia", "2024-02"): "2.5", ("Victoria", "2024-01"): "3"}
+    assert fetcher.find_latest_dataset(fetcher.DATA_FILE_PREFIX)
+
+def test_merge_shards_without_shards(fetcher):
+    assert fetcher.merge_shards() is None
@@ -0,0 +1,60 @@
+import csv
+import pytest
+from abs_data_store import SERIES_FIELDS
+from abs_io import open_data_file
+from abs_revisions import RevisionStore, append_vintage
+
+def record(month, value, region="Australia"):
+    return dict(zip(SERIES_FIELDS, (region, "Employed persons", "15 and over", "Persons", "Original")),
+                observation_month=month, observation_value=value)
+
+EXISTING = [record("2024-01", "10"), record("2024-02", "20")]
+# Two responses covering the same months, so 2024-02 and 2024-03 are fetched twice
+FETCHED = [[record("2024-02", "21"), record("2024-03", "30")],
+           [record("2024-02", "22"), record("2024-03", "31"), record("2024-04", "40")]]
+
+def values(records):
+    return {r["observation_month"]: r["observation_value"] for r in records}
+
+def run(fetcher, runner_class):
+    """Merge FETCHED into EXISTING with runner_class. Returns (dataset, new records, revision log as of now)."""
+    fetcher.save_to_csv([dict(r) for r in EXISTING], "abs_labour_force_ALL_DATA_20240101_000000_FIXED.csv")
+    if fetcher.TRACK_REVISIONS:
+        append_vintage(EXISTING, fetcher.REVISION_FILE, baseline=True)
+    runner = runner_class()
+    runner.checkpoint = {}
+    runner.data_loaded = True
+    runner.load_data()
+    for batch in FETCHED:
+        runner.merge_records([dict(r) for r in batch], "combo")
+    if runner_class is fetcher.StreamingFetchRunner:
+        runner.merge_runs()
+        with open_data_file(runner.stream_file, 'r', newline='') as f:
+            dataset = list(csv.DictReader(f))
+        added = runner.new_records_added
+    else:
+        dataset = runner.all_data
+        added = len(runner.added_records)
+    runner.record_revisions()
+    store = RevisionStore.load(fetcher.REVISION_FILE)
+    return dataset, added, store
+
+@pytest.mark.parametrize("track_revisions, expected", [
+    (True, {"2024-01": "10", "2024-02": "22", "2024-03": "31", "2024-04": "40"}),
+    (False, {"2024-01": "10", "2024-02": "20", "2024-03": "30", "2024-04": "40"})
+])
+def test_streaming_matches_in_memory(fetcher, monkeypatch, tmp_path, track_revisions, expected):
+    monkeypatch.setattr(fetcher, "TRACK_REVISIONS", track_revisions)
+    results = []
+    for runner_class in (fetcher.FetchRunner, fetcher.StreamingFetchRunner):
+        folder = tmp_path / runner_class.__name__
+        folder.mkdir()
+        monkeypatch.chdir(folder)
+        results.append(run(fetcher, runner_class))
+    (memory, memory_added, memory_log), (streamed, streamed_added, streamed_log) = results
+    
+    assert values(memory) == values(streamed) == expected
+    assert len(streamed) == len(expected)
+    assert memory_added == streamed_added == 2
+    assert values(memory_log.as_of("9999")) == values(streamed_log.as_of("9999")) == (expected if track_revisions else {})
+    assert memory_log.revision_count() == streamed_log.revision_count()